@@ -0,0 +1,166 @@
+"""
+Сравнение расписания с базовым планом (baseline).
+
+Две версии расписания (результаты build_schedule или сохраненные пакетной
+обработкой *_schedule.csv) сопоставляются по названию задачи через общий
+factorize: каждая задача получает целочисленный код, позиции строк обеих
+версий — массивы по этим кодам, без merge по строкам. Совпавшие задачи
+сначала сравниваются по хэшу строки (начало, окончание, резерв,
+критичность) — отклонения считаются только для изменившихся.
+
+    python gantt_baseline.py base_schedule.csv current_schedule.csv -o diff.csv --png diff.png
+"""
+import argparse
+import sys
+
+import numpy as np
+import pandas as pd
+
+from gantt_core import say, MAX_PRINTED_ITEMS
+
+# Колонки, по которым строка считается изменившейся
+COMPARED_COLUMNS = ('Start', 'End', 'Total_Float', 'Is_Critical')
+DIFF_COLUMNS = ['Task', 'Status',
+                'Baseline_Start', 'Start', 'Start_Variance',
+                'Baseline_End', 'End', 'Finish_Variance',
+                'Baseline_Float', 'Total_Float', 'Float_Variance',
+                'Baseline_Critical', 'Is_Critical', 'Became_Critical', 'Left_Critical']
+
+# ========== СОПОСТАВЛЕНИЕ ВЕРСИЙ ==========
+
+def _normalized(df):
+    """Сравниваемые колонки в единых типах (даты из CSV — строками)"""
+    return pd.DataFrame({
+        'Start': pd.to_datetime(df['Start']).to_numpy(dtype='datetime64[ns]'),
+        'End': pd.to_datetime(df['End']).to_numpy(dtype='datetime64[ns]'),
+        'Total_Float': (pd.to_numeric(df['Total_Float'], errors='coerce').to_numpy(dtype=np.float64)
+                        if 'Total_Float' in df.columns else np.zeros(len(df))),
+        'Is_Critical': df['Is_Critical'].to_numpy(dtype=bool),
+    })
+
+
+def _days(later, earlier):
+    return (later - earlier) / np.timedelta64(1, 'D')
+
+
+def compare_schedules(baseline, current, tolerance_days=0.0, changed_only=True):
+    """
+    Отклонения текущего расписания от базового по задачам.
+
+    Возвращает DataFrame (колонки DIFF_COLUMNS): Status — 'changed', 'added'
+    (нет в базовом плане) или 'removed' (нет в текущем); отклонения начала,
+    окончания и резерва — в днях (положительные — задача сдвинулась позже
+    или резерв вырос). Became_Critical / Left_Critical — задача вошла
+    в критический путь или вышла из него. Сдвиги не больше tolerance_days
+    не считаются изменением; changed_only=False оставляет и неизменившиеся
+    задачи (Status 'unchanged'). Строки упорядочены по убыванию сдвига окончания.
+    """
+    base, cur = _normalized(baseline), _normalized(current)
+
+    # Общие коды задач: позиции строк обеих версий по коду
+    codes, tasks = pd.factorize(pd.concat([baseline['Task'], current['Task']], ignore_index=True).astype(str))
+    base_codes, cur_codes = codes[:len(base)], codes[len(base):]
+    base_pos = np.full(len(tasks), -1, dtype=np.int64)
+    cur_pos = np.full(len(tasks), -1, dtype=np.int64)
+    base_pos[base_codes] = np.arange(len(base))
+    cur_pos[cur_codes] = np.arange(len(cur))
+
+    matched = np.flatnonzero((base_pos >= 0) & (cur_pos >= 0))
+    added = np.flatnonzero(base_pos < 0)
+    removed = np.flatnonzero(cur_pos < 0)
+
+    # Быстрый отсев: одинаковый хэш строки — задача не изменилась
+    base_hash = pd.util.hash_pandas_object(base, index=False).to_numpy()
+    cur_hash = pd.util.hash_pandas_object(cur, index=False).to_numpy()
+    differs = base_hash[base_pos[matched]] != cur_hash[cur_pos[matched]]
+    candidates = matched[differs]
+
+    b, c = base_pos[candidates], cur_pos[candidates]
+    start_variance = _days(cur['Start'].to_numpy()[c], base['Start'].to_numpy()[b])
+    finish_variance = _days(cur['End'].to_numpy()[c], base['End'].to_numpy()[b])
+    float_variance = cur['Total_Float'].to_numpy()[c] - base['Total_Float'].to_numpy()[b]
+    critical_changed = cur['Is_Critical'].to_numpy()[c] != base['Is_Critical'].to_numpy()[b]
+    changed = (critical_changed
+               | (np.abs(start_variance) > tolerance_days)
+               | (np.abs(finish_variance) > tolerance_days)
+               | (np.abs(np.nan_to_num(float_variance)) > tolerance_days))
+
+    if changed_only:
+        kept = [(candidates[changed], 'changed')]
+    else:
+        status = np.where(np.isin(matched, candidates[changed]), 'changed', 'unchanged')
+        kept = [(matched[status == 'changed'], 'changed'), (matched[status == 'unchanged'], 'unchanged')]
+    kept += [(added, 'added'), (removed, 'removed')]
+
+    task_codes = np.concatenate([part for part, _ in kept])
+    b, c = base_pos[task_codes], cur_pos[task_codes]
+
+    def column(frame, name, positions):
+        values = frame[name].to_numpy()[np.maximum(positions, 0)]
+        if values.dtype == bool:
+            return np.where(positions >= 0, values, False)
+        missing = np.datetime64('NaT') if values.dtype.kind == 'M' else np.nan
+        return np.where(positions >= 0, values, missing)
+
+    diff = pd.DataFrame({
+        'Task': tasks[task_codes],
+        'Status': np.repeat([status for _, status in kept], [len(part) for part, _ in kept]),
+        'Baseline_Start': column(base, 'Start', b),
+        'Start': column(cur, 'Start', c),
+        'Baseline_End': column(base, 'End', b),
+        'End': column(cur, 'End', c),
+        'Baseline_Float': column(base, 'Total_Float', b),
+        'Total_Float': column(cur, 'Total_Float', c),
+        'Baseline_Critical': column(base, 'Is_Critical', b),
+        'Is_Critical': column(cur, 'Is_Critical', c),
+    })
+    diff['Start_Variance'] = _days(diff['Start'], diff['Baseline_Start'])
+    diff['Finish_Variance'] = _days(diff['End'], diff['Baseline_End'])
+    diff['Float_Variance'] = diff['Total_Float'] - diff['Baseline_Float']
+    both = (b >= 0) & (c >= 0)
+    diff['Became_Critical'] = both & diff['Is_Critical'].to_numpy() & ~diff['Baseline_Critical'].to_numpy()
+    diff['Left_Critical'] = both & ~diff['Is_Critical'].to_numpy() & diff['Baseline_Critical'].to_numpy()
+
+    diff = diff[DIFF_COLUMNS].sort_values('Finish_Variance', ascending=False, na_position='last',
+                                          kind='stable', ignore_index=True)
+
+    end_variance = _days(cur['End'].max(), base['End'].max()) if len(cur) and len(base) else np.nan
+    _report(diff, len(matched), end_variance)
+    return diff
+
+
+def _report(diff, matched, end_variance):
+    """Короткая сводка сравнения"""
+    counts = diff['Status'].value_counts()
+    slipped = diff[diff['Finish_Variance'] > 0]
+    say(f"📐 СРАВНЕНИЕ С БАЗОВЫМ ПЛАНОМ: сопоставлено задач {matched:,}, изменилось {counts.get('changed', 0):,}, "
+        f"добавлено {counts.get('added', 0):,}, удалено {counts.get('removed', 0):,}")
+    say(f"   • Окончание проекта: {end_variance:+g} дн.; задач сдвинулось позже: {len(slipped):,}")
+    say(f"   • Вошли в критический путь: {int(diff['Became_Critical'].sum()):,}, "
+        f"вышли из него: {int(diff['Left_Critical'].sum()):,}")
+    for task in slipped.head(MAX_PRINTED_ITEMS // 3).itertuples():
+        say(f"   🔺 {task.Task}: окончание {task.Finish_Variance:+g} дн.")
+
+# ========== КОМАНДНАЯ СТРОКА ==========
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Сравнение расписания с базовым планом')
+    parser.add_argument('baseline', help='базовое расписание (*_schedule.csv пакетной обработки)')
+    parser.add_argument('current', help='текущее расписание')
+    parser.add_argument('-o', '--out', help='сохранить отклонения в CSV')
+    parser.add_argument('--png', help='диаграмма отклонений (базовый план против текущего)')
+    parser.add_argument('--tolerance', type=float, default=0.0, help='сдвиги не больше стольких дней не считаются')
+    args = parser.parse_args(argv)
+
+    diff = compare_schedules(pd.read_csv(args.baseline), pd.read_csv(args.current), tolerance_days=args.tolerance)
+    if args.out:
+        diff.to_csv(args.out, index=False)
+        say(f"💾 Отклонения: {args.out}")
+    if args.png:
+        from gantt_render import save_variance_chart
+        save_variance_chart(diff, args.png)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
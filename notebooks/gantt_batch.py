@@ -0,0 +1,174 @@
+"""
+Пакетная обработка каталогов с файлами проектов из командной строки.
+"""
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from collections import defaultdict
+import argparse
+import glob
+import os
+import time
+
+import pandas as pd
+
+from gantt_core import (build_schedule, read_project_file, say, verbosity, set_verbosity, QUIET, WorkCalendar,
+                        wbs_outline)
+from gantt_cache import ScheduleCache, DEFAULT_CACHE_DIR
+from gantt_render import save_chart_files
+from gantt_html import export_html
+
+# ========== ПАКЕТНАЯ ОБРАБОТКА (КОМАНДНАЯ СТРОКА) ==========
+
+BATCH_EXTENSIONS = ('.csv', '.xlsx', '.xls', '.parquet', '.feather', '.arrow')
+MANIFEST_COLUMNS = ['file', 'status', 'tasks', 'critical', 'start', 'end', 'duration_days',
+                    'png', 'pdf', 'html', 'schedule', 'cached', 'error', 'seconds']
+
+def collect_project_files(inputs):
+    """Раскрывает каталоги и glob-шаблоны в отсортированный список файлов проектов"""
+    found = []
+    for item in inputs:
+        if os.path.isdir(item):
+            candidates = [os.path.join(item, name) for name in os.listdir(item)]
+        else:
+            candidates = glob.glob(item) or [item]
+        found.extend(path for path in candidates
+                     if not os.path.isdir(path) and path.lower().endswith(BATCH_EXTENSIONS))
+    return sorted(set(found))
+
+
+def _output_stems(paths):
+    """Уникальные имена результатов: одинаковые имена файлов из разных каталогов получают суффикс"""
+    stems, seen = [], defaultdict(int)
+    for path in paths:
+        stem = os.path.splitext(os.path.basename(path))[0]
+        seen[stem] += 1
+        stems.append(stem if seen[stem] == 1 else f"{stem}_{seen[stem]}")
+    return stems
+
+
+def process_project_file(path, out_dir, stem=None, save_pdf=True, cache_dir=None, calendar=None, save_html=False,
+                         wbs_level=None, sheet=None):
+    """
+    Полная обработка одного файла без интерактива: расписание (CSV), PNG, PDF
+    и, при save_html, автономный HTML-просмотрщик.
+    С cache_dir неизменившиеся файлы берутся из кэша (см. gantt_cache);
+    calendar — WorkCalendar для расчета в рабочих днях; wbs_level — PNG и PDF
+    по суммарным задачам WBS до этой глубины (если в файле есть колонка WBS);
+    sheet — лист книги Excel (имя или шаблон, по умолчанию первый).
+    Никогда не выбрасывает исключение — возвращает строку манифеста со статусом.
+    """
+    stem = stem or os.path.splitext(os.path.basename(path))[0]
+    record = dict.fromkeys(MANIFEST_COLUMNS)
+    record.update(file=path, status='error', tasks=0, critical=0, error='', cached=False)
+    started = time.perf_counter()
+    try:
+        with verbosity(QUIET):
+            cache = ScheduleCache(cache_dir) if cache_dir else None
+            cache_key = cache.key_for_file(path, calendar=calendar, sheet=sheet) if cache is not None else None
+            cached = cache.get(cache_key) if cache is not None else None
+            
+            if cached is not None:
+                (df_with_critical, df_sorted), errors = cached, []
+            else:
+                df_with_critical, df_sorted, errors = build_schedule(read_project_file(path, sheet=sheet), calendar=calendar)
+                if df_with_critical is not None and cache is not None:
+                    cache.put(cache_key, df_with_critical, df_sorted)
+            
+            if df_with_critical is None:
+                record['status'] = 'invalid'
+                record['error'] = '; '.join(str(error) for error in errors)
+            else:
+                record['schedule'] = os.path.join(out_dir, f"{stem}_schedule.csv")
+                df_with_critical.to_csv(record['schedule'], index=False)
+                
+                # Фигура без pyplot (не копится в памяти процесса); готовые файлы — из кэша
+                record['png'] = os.path.join(out_dir, f"{stem}.png")
+                record['pdf'] = os.path.join(out_dir, f"{stem}.pdf") if save_pdf else None
+                df_chart, variant = df_sorted, None
+                if wbs_level is not None and 'WBS' in df_with_critical.columns:
+                    df_chart, variant = wbs_outline(df_with_critical, wbs_level), f"wbs{wbs_level}"
+                save_chart_files(df_chart, record['png'], record['pdf'], cache, cache_key, variant=variant)
+                if save_html:
+                    record['html'] = export_html(df_sorted, os.path.join(out_dir, f"{stem}.html"), title=stem)
+                
+                record.update(status='ok', tasks=len(df_with_critical), cached=cached is not None,
+                              critical=int(df_with_critical['Is_Critical'].sum()),
+                              start=df_with_critical['Start'].min().strftime('%Y-%m-%d'),
+                              end=df_with_critical['End'].max().strftime('%Y-%m-%d'),
+                              duration_days=(df_with_critical['End'].max() - df_with_critical['Start'].min()).days)
+    except Exception as e:
+        record['error'] = f"{type(e).__name__}: {e}"
+    record['seconds'] = round(time.perf_counter() - started, 3)
+    return record
+
+
+def run_batch(inputs, out_dir, workers=None, save_pdf=True, cache_dir=None, calendar=None, save_html=False,
+              wbs_level=None, sheet=None):
+    """
+    Обрабатывает все файлы проектов в пуле процессов и пишет manifest.csv.
+    Ошибка в одном файле (и даже падение процесса) не прерывает пакет.
+    """
+    paths = collect_project_files(inputs)
+    os.makedirs(out_dir, exist_ok=True)
+    workers = min(workers or os.cpu_count() or 1, max(len(paths), 1))
+    say(f"📂 ФАЙЛОВ: {len(paths)}, ПРОЦЕССОВ: {workers}")
+    
+    jobs = list(zip(paths, _output_stems(paths)))
+    records = []
+    if workers == 1:
+        for path, stem in jobs:
+            records.append(process_project_file(path, out_dir, stem, save_pdf, cache_dir, calendar,
+                                                save_html, wbs_level, sheet))
+            say(f"   {'✅' if records[-1]['status'] == 'ok' else '❌'} {path}")
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(process_project_file, path, out_dir, stem, save_pdf, cache_dir,
+                                       calendar, save_html, wbs_level, sheet): path
+                       for path, stem in jobs}
+            for future in as_completed(futures):
+                try:
+                    record = future.result()
+                except Exception as e:
+                    record = {'file': futures[future], 'status': 'error', 'error': f"{type(e).__name__}: {e}"}
+                records.append(record)
+                say(f"   {'✅' if record['status'] == 'ok' else '❌'} {record['file']}")
+    
+    manifest = pd.DataFrame(records, columns=MANIFEST_COLUMNS)
+    manifest = manifest.astype({'tasks': 'Int64', 'critical': 'Int64', 'duration_days': 'Int64'})
+    manifest = manifest.sort_values('file', ignore_index=True)
+    manifest_path = os.path.join(out_dir, 'manifest.csv')
+    manifest.to_csv(manifest_path, index=False)
+    
+    failed = int((manifest['status'] != 'ok').sum())
+    say(f"📋 ГОТОВО: {len(manifest) - failed} успешно, {failed} с ошибками. Манифест: {manifest_path}")
+    return manifest
+
+
+def main(argv=None):
+    """Точка входа командной строки: python gantt.py data/ -o figs/ -j 8"""
+    parser = argparse.ArgumentParser(description='Пакетное построение диаграмм Ганта с критическим путем')
+    parser.add_argument('inputs', nargs='+', help='файлы, каталоги или glob-шаблоны (*.csv, *.xlsx, *.parquet)')
+    parser.add_argument('-o', '--out', default='../figs', help='каталог для результатов')
+    parser.add_argument('-j', '--workers', type=int, default=None, help='число процессов (по умолчанию — число ядер)')
+    parser.add_argument('--no-pdf', action='store_true', help='не создавать PDF отчеты')
+    parser.add_argument('--html', action='store_true', help='автономный HTML-просмотрщик для каждого файла')
+    parser.add_argument('--wbs-level', type=int, default=None, metavar='N',
+                        help='диаграмма по суммарным задачам WBS до уровня N (для больших проектов)')
+    parser.add_argument('--sheet', default=None, metavar='NAME',
+                        help="лист книги Excel: имя или шаблон 'План*' (по умолчанию первый)")
+    parser.add_argument('-q', '--quiet', action='store_true', help='без вывода прогресса (код возврата и манифест остаются)')
+    parser.add_argument('--cache', nargs='?', const=DEFAULT_CACHE_DIR, default=None, metavar='DIR',
+                        help=f'кэш расписаний и диаграмм для неизменившихся файлов (по умолчанию {DEFAULT_CACHE_DIR})')
+    parser.add_argument('--workdays', default=None, metavar='MASK',
+                        help="рабочие дни недели: '1111100' или 'Mon Tue Wed Thu Fri' (по умолчанию все дни)")
+    parser.add_argument('--holidays', default='', metavar='DATES',
+                        help='праздничные дни через запятую: 2025-01-01,2025-01-02')
+    args = parser.parse_args(argv)
+    if args.quiet:
+        set_verbosity(QUIET)
+    
+    holidays = [day.strip() for day in args.holidays.split(',') if day.strip()]
+    calendar = WorkCalendar(args.workdays or '1111111', holidays) if args.workdays or holidays else None
+    manifest = run_batch(args.inputs, args.out, workers=args.workers, save_pdf=not args.no_pdf,
+                         cache_dir=args.cache, calendar=calendar, save_html=args.html,
+                         wbs_level=args.wbs_level, sheet=args.sheet)
+    return 0 if (manifest['status'] == 'ok').all() else 1
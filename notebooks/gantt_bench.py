@@ -0,0 +1,257 @@
+"""
+Бенчмарки конвейера на синтетических проектах.
+
+Генераторы строят проекты заданной формы и размера (от 1e2 до 1e6 задач):
+
+    chain     — одна длинная цепочка
+    fan       — веер: корень → n-2 параллельных задач → общий финиш
+    layered   — случайный многоуровневый DAG (у задачи до 3 предшественников из прошлого уровня)
+    sp        — последовательно-параллельный граф (вложенные развилки и цепочки)
+
+Каждый случай выполняется в отдельном процессе, поэтому пик памяти (max RSS)
+относится только к нему. Замеряются этапы validate_and_map_data,
+find_cyclic_dependencies, calculate_realistic_dates,
+calculate_critical_path_with_dependencies и отрисовка (render + savefig).
+
+    python gantt_bench.py --sizes 1e2,1e4,1e6 --out bench.csv
+    python gantt_bench.py --baseline bench.csv --tolerance 1.3   # код 1 при регрессии
+"""
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import multiprocessing
+import os
+import resource
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+SHAPES = ('chain', 'fan', 'layered', 'sp')
+DEFAULT_SIZES = (100, 1_000, 10_000, 100_000)
+# Отрисовка больших проектов занимает минуты — по умолчанию только до этого размера
+RENDER_MAX_TASKS = 100_000
+STAGES = ('generate', 'validate', 'cycles', 'dates', 'cpm', 'render')
+RESULT_COLUMNS = ['shape', 'tasks', 'edges', 'stage', 'seconds', 'rss_mb']
+
+# ========== ГЕНЕРАТОРЫ ПРОЕКТОВ ==========
+
+def _edges_to_frame(n, src, dst, rng):
+    """Таблица проекта из списка связей src → dst (номера задач)"""
+    names = [f'T{i}' for i in range(n)]
+    order = np.argsort(dst, kind='stable')
+    dst, src_names = dst[order], [names[i] for i in src[order].tolist()]
+    # Границы групп связей с одной и той же задачей-получателем
+    starts = np.flatnonzero(np.diff(dst, prepend=-1)).tolist()
+    ends = starts[1:] + [len(dst)]
+    deps = np.full(n, np.nan, dtype=object)
+    deps[dst[starts]] = [','.join(src_names[start:end]) for start, end in zip(starts, ends)]
+    return pd.DataFrame({
+        'Task': pd.Series(names, dtype='str'),
+        'Duration': rng.integers(1, 10, n),
+        'Dependencies': pd.Series(deps, dtype='str'),
+        'Workers': rng.integers(1, 5, n),
+    })
+
+
+def _chain_edges(n, rng):
+    return np.arange(n - 1), np.arange(1, n)
+
+
+def _fan_edges(n, rng):
+    middle = np.arange(1, n - 1)
+    src = np.concatenate([np.zeros(len(middle), dtype=np.int64), middle])
+    dst = np.concatenate([middle, np.full(len(middle), n - 1)])
+    return src, dst
+
+
+def _layered_edges(n, rng, max_preds=3):
+    # Ширина уровня ~ sqrt(n): глубина и ширина растут одинаково
+    width = max(int(np.sqrt(n)), 1)
+    level = np.arange(n) // width
+    first = level * width
+    nodes = np.flatnonzero(level > 0)
+    counts = rng.integers(1, max_preds + 1, len(nodes))
+    dst = np.repeat(nodes, counts)
+    # Предшественники — случайные задачи предыдущего уровня
+    prev_first = first[dst] - width
+    src = prev_first + rng.integers(0, width, len(dst))
+    pairs = np.unique(np.stack([src, dst], axis=1), axis=0)
+    return pairs[:, 0], pairs[:, 1]
+
+
+def _sp_edges(n, rng):
+    """Последовательно-параллельный граф с одним входом и одним выходом у каждого блока"""
+    src, dst = [], []
+    next_id = 0
+
+    def new_node():
+        nonlocal next_id
+        next_id += 1
+        return next_id - 1
+
+    def block(size):
+        # Возвращает (вход, выход) блока из size задач
+        if size <= 2:
+            entry = new_node()
+            if size == 1:
+                return entry, entry
+            exit_ = new_node()
+            src.append(entry), dst.append(exit_)
+            return entry, exit_
+        if rng.random() < 0.5:
+            # Последовательно: два блока один за другим
+            left = int(size * rng.uniform(0.25, 0.75)) or 1
+            first_entry, first_exit = block(left)
+            second_entry, second_exit = block(size - left)
+            src.append(first_exit), dst.append(second_entry)
+            return first_entry, second_exit
+        # Параллельно: развилка, 2-4 ветки, слияние
+        entry = new_node()
+        branches = min(int(rng.integers(2, 5)), size - 2)
+        inner = size - 2
+        cuts = np.sort(rng.choice(np.arange(1, inner), branches - 1, replace=False)) if branches > 1 else []
+        exits = []
+        for part in np.diff(np.concatenate([[0], cuts, [inner]])).astype(int):
+            branch_entry, branch_exit = block(int(part))
+            src.append(entry), dst.append(branch_entry)
+            exits.append(branch_exit)
+        exit_ = new_node()
+        for branch_exit in exits:
+            src.append(branch_exit), dst.append(exit_)
+        return entry, exit_
+
+    block(n)
+    return np.asarray(src, dtype=np.int64), np.asarray(dst, dtype=np.int64)
+
+
+_GENERATORS = {'chain': _chain_edges, 'fan': _fan_edges, 'layered': _layered_edges, 'sp': _sp_edges}
+
+
+def generate_project(shape, n, seed=0):
+    """Синтетический проект формы shape (см. SHAPES) из n задач в формате data/tasks.csv"""
+    if shape not in _GENERATORS:
+        raise ValueError(f"Неизвестная форма проекта: {shape}. Доступны: {', '.join(SHAPES)}")
+    n = max(int(n), 3)
+    rng = np.random.default_rng(seed)
+    src, dst = _GENERATORS[shape](n, rng)
+    return _edges_to_frame(n, np.asarray(src), np.asarray(dst), rng)
+
+# ========== ЗАПУСК ЗАМЕРОВ ==========
+
+def _rss_mb():
+    """Пик резидентной памяти текущего процесса, МБ"""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_case(shape, n, seed=0, render=True):
+    """Один случай в текущем процессе: [{stage, seconds, rss_mb, ...}] по этапам"""
+    import gantt_core as core
+
+    records = []
+
+    def timed(stage, function):
+        started = time.perf_counter()
+        result = function()
+        records.append({'stage': stage, 'seconds': time.perf_counter() - started, 'rss_mb': _rss_mb()})
+        return result
+
+    with core.verbosity(core.QUIET):
+        df = timed('generate', lambda: generate_project(shape, n, seed))
+        is_valid, report, df_valid, _, project = timed(
+            'validate', lambda: core.validate_and_map_data(df, return_project=True))
+        if not is_valid:
+            raise RuntimeError(f"Сгенерированный проект не прошел валидацию: {list(report)[:3]}")
+        timed('cycles', lambda: core.find_cyclic_dependencies(df_valid, project=project))
+        df_dates = timed('dates', lambda: core.calculate_realistic_dates(df_valid, project=project))
+        df_critical = timed('cpm', lambda: core.calculate_critical_path_with_dependencies(df_dates, project=project))
+
+        if render:
+            import matplotlib
+            matplotlib.use('Agg')
+            from matplotlib.figure import Figure
+            import gantt_render
+
+            def draw():
+                fig = Figure(figsize=(16, 10))
+                gantt_render.render_gantt_figure(fig, df_critical)
+                fig.savefig(os.devnull, format='png', dpi=100)
+            timed('render', draw)
+
+    edges = len(project.edge_rows)
+    return [{'shape': shape, 'tasks': len(df), 'edges': edges, **record} for record in records]
+
+
+def run_benchmarks(shapes=SHAPES, sizes=DEFAULT_SIZES, seed=0, render_max=RENDER_MAX_TASKS, isolate=True):
+    """
+    Прогоняет все сочетания форм и размеров. При isolate каждый случай идет
+    в свежем процессе, и rss_mb — пик памяти именно этого случая.
+    """
+    rows = []
+    for shape in shapes:
+        for n in sizes:
+            args = (shape, int(n), seed, int(n) <= render_max)
+            if isolate:
+                context = multiprocessing.get_context('spawn')
+                with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                    case = executor.submit(run_case, *args).result()
+            else:
+                case = run_case(*args)
+            rows.extend(case)
+            total = sum(record['seconds'] for record in case if record['stage'] != 'generate')
+            print(f"   {shape:<8} {int(n):>9,} задач: {total:8.3f} с, пик {max(r['rss_mb'] for r in case):8.1f} МБ")
+    return pd.DataFrame(rows, columns=RESULT_COLUMNS)
+
+
+def compare_with_baseline(results, baseline, tolerance=1.25, min_seconds=0.05):
+    """
+    Сравнивает время этапов с сохраненным прогоном. Регрессия — этап стал
+    медленнее в tolerance раз (этапы быстрее min_seconds не учитываются: шум).
+    """
+    keys = ['shape', 'tasks', 'stage']
+    merged = results.merge(baseline[keys + ['seconds']], on=keys, suffixes=('', '_baseline'))
+    merged['ratio'] = merged['seconds'] / merged['seconds_baseline']
+    significant = merged[['seconds', 'seconds_baseline']].max(axis=1) >= min_seconds
+    merged['regression'] = significant & (merged['ratio'] > tolerance) & (merged['stage'] != 'generate')
+    return merged
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Бенчмарки расчета и отрисовки диаграмм Ганта')
+    parser.add_argument('--shapes', default=','.join(SHAPES), help=f"формы через запятую ({', '.join(SHAPES)})")
+    parser.add_argument('--sizes', default=','.join(str(n) for n in DEFAULT_SIZES),
+                        help='размеры через запятую, можно 1e5')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--render-max', type=float, default=RENDER_MAX_TASKS,
+                        help='не отрисовывать проекты больше этого размера')
+    parser.add_argument('--out', help='сохранить результаты в CSV')
+    parser.add_argument('--baseline', help='CSV прошлого прогона для поиска регрессий')
+    parser.add_argument('--tolerance', type=float, default=1.25, help='допустимое замедление этапа (во сколько раз)')
+    args = parser.parse_args(argv)
+
+    shapes = [shape.strip() for shape in args.shapes.split(',') if shape.strip()]
+    sizes = [int(float(size)) for size in args.sizes.split(',') if size.strip()]
+    print(f"⏱️  БЕНЧМАРК: формы {', '.join(shapes)}; размеры {', '.join(f'{n:,}' for n in sizes)}")
+    results = run_benchmarks(shapes, sizes, seed=args.seed, render_max=args.render_max)
+
+    table = results.pivot_table(index=['shape', 'tasks'], columns='stage', values='seconds', sort=False)
+    table['peak_mb'] = results.groupby(['shape', 'tasks'], sort=False)['rss_mb'].max()
+    print(table.reindex(columns=[stage for stage in STAGES if stage in table.columns] + ['peak_mb']).round(3).to_string())
+
+    if args.out:
+        results.to_csv(args.out, index=False)
+        print(f"💾 Результаты: {args.out}")
+
+    if args.baseline:
+        compared = compare_with_baseline(results, pd.read_csv(args.baseline), args.tolerance)
+        regressions = compared[compared['regression']]
+        if len(regressions):
+            print(f"❌ РЕГРЕССИИ (медленнее в {args.tolerance}+ раз):")
+            print(regressions[['shape', 'tasks', 'stage', 'seconds_baseline', 'seconds', 'ratio']].round(3).to_string(index=False))
+            return 1
+        print(f"✅ Регрессий нет ({len(compared)} этапов сравнено)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
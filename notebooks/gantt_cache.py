@@ -0,0 +1,205 @@
+"""
+Кэш рассчитанных расписаний на диске с адресацией по содержимому.
+
+Ключ — хэш входных данных (байтов файла или содержимого таблицы), правил
+определения полей и параметров расчета, включая дату отсчета. Запись — каталог
+с расписанием в Parquet и, по желанию, готовыми PNG/PDF. Других форматов
+нет: каталог кэша может быть общим, а pickle из него выполнял бы чужой код
+при чтении. Без pyarrow кэш выключен — get() всегда промах, put() ничего
+не пишет. Старые записи вытесняются по LRU при
+превышении лимита размера или количества.
+"""
+import hashlib
+import importlib.util
+import json
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from gantt_core import SmartFieldMapper
+
+# Меняется при изменении формата записей или логики расчета
+CACHE_VERSION = 4
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'gantt')
+DEFAULT_CACHE_BYTES = 512 * 2 ** 20
+
+_ORDER_COLUMN = '__sort_position'
+_SCHEDULE_FILE = 'schedule.parquet'
+_HASH_BLOCK = 2 ** 20
+
+
+def _row_positions(df, df_sorted):
+    """
+    Позиции строк df_sorted в df (df_sorted — перестановка строк df).
+    При неуникальном индексе метки не определяют строку, поэтому строки
+    сопоставляются по хэшу метки вместе с содержимым: совпадающие по хэшу
+    строки одинаковы, и их взаимный порядок на результат не влияет.
+    """
+    if df.index.is_unique:
+        return df.index.get_indexer(df_sorted.index)
+    hashes = pd.util.hash_pandas_object(df, index=True).to_numpy()
+    sorted_hashes = pd.util.hash_pandas_object(df_sorted, index=True).to_numpy()
+    positions = np.empty(len(df), dtype=np.int64)
+    positions[np.argsort(sorted_hashes, kind='stable')] = np.argsort(hashes, kind='stable')
+    return positions
+
+
+def default_cache():
+    """Кэш в GANTT_CACHE_DIR (или ~/.cache/gantt) с лимитом по умолчанию"""
+    return ScheduleCache(os.environ.get('GANTT_CACHE_DIR', DEFAULT_CACHE_DIR))
+
+
+class ScheduleCache:
+    """Дисковый LRU-кэш расписаний и отрисованных файлов"""
+
+    def __init__(self, root=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_CACHE_BYTES, max_entries=None,
+                 store_artifacts=True):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.store_artifacts = store_artifacts
+        self.enabled = importlib.util.find_spec('pyarrow') is not None
+        os.makedirs(root, exist_ok=True)
+
+    # ---------- ключи ----------
+
+    @staticmethod
+    def _hasher(options):
+        """Хэш, уже учитывающий версию, дату отсчета, правила маппинга и параметры"""
+        hasher = hashlib.sha256()
+        header = {
+            'version': CACHE_VERSION,
+            # Расписание без дат начала строится от сегодняшнего дня
+            'origin': pd.Timestamp.today().normalize().isoformat(),
+            'aliases': SmartFieldMapper.FIELD_ALIASES,
+            'options': options,
+        }
+        hasher.update(json.dumps(header, sort_keys=True, ensure_ascii=False, default=str).encode())
+        return hasher
+
+    def key_for_frame(self, df, **options):
+        """Ключ по содержимому таблицы: имена и типы колонок плюс хэши строк"""
+        hasher = self._hasher(options)
+        hasher.update(json.dumps([[str(column), str(dtype)] for column, dtype in df.dtypes.items()],
+                                 ensure_ascii=False).encode())
+        hasher.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+        return hasher.hexdigest()
+
+    def key_for_bytes(self, content, **options):
+        """Ключ по байтам загруженного файла"""
+        hasher = self._hasher(options)
+        hasher.update(content)
+        return hasher.hexdigest()
+
+    def key_for_file(self, path, **options):
+        """Ключ по байтам файла на диске (читается блоками)"""
+        hasher = self._hasher(options)
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(_HASH_BLOCK), b''):
+                hasher.update(block)
+        return hasher.hexdigest()
+
+    # ---------- чтение и запись ----------
+
+    def _entry(self, key):
+        return os.path.join(self.root, key)
+
+    def __contains__(self, key):
+        entry = self._entry(key)
+        return os.path.isfile(os.path.join(entry, 'meta.json')) and os.path.isfile(os.path.join(entry, _SCHEDULE_FILE))
+
+    def get(self, key):
+        """(df_with_critical, df_sorted) или None; попадание обновляет LRU-время"""
+        entry = self._entry(key)
+        if not self.enabled or key not in self:
+            return None
+        try:
+            df = pd.read_parquet(os.path.join(entry, _SCHEDULE_FILE))
+            os.utime(entry)
+        except (OSError, ValueError):
+            # Запись удалена или повреждена параллельным процессом — считаем промахом
+            return None
+        order = df.pop(_ORDER_COLUMN).to_numpy()
+        return df, df.iloc[np.argsort(order, kind='stable')]
+
+    def put(self, key, df_with_critical, df_sorted):
+        """Сохраняет расписание; запись появляется атомарно (через переименование каталога)"""
+        if not self.enabled:
+            return
+        if key in self:
+            os.utime(self._entry(key))
+            return
+        staging = None
+        try:
+            df = df_with_critical.copy()
+            # Позиция строки в отсортированном для диаграммы порядке
+            order = np.empty(len(df), dtype=np.int64)
+            order[_row_positions(df_with_critical, df_sorted)] = np.arange(len(df))
+            df[_ORDER_COLUMN] = order
+
+            staging = tempfile.mkdtemp(dir=self.root, prefix='.tmp-')
+            df.to_parquet(os.path.join(staging, _SCHEDULE_FILE))
+            with open(os.path.join(staging, 'meta.json'), 'w') as f:
+                json.dump({'tasks': len(df), 'created': time.time()}, f)
+            os.replace(staging, self._entry(key))
+        except (OSError, ValueError, TypeError, NotImplementedError):
+            # Ту же запись уже сохранил другой процесс, нет места на диске или колонку
+            # не записать в Parquet (ошибки Arrow наследуют эти типы) — расчет идет без кэша
+            if staging is not None:
+                shutil.rmtree(staging, ignore_errors=True)
+            return
+        self._evict()
+
+    def artifact(self, key, name):
+        """Путь к сохраненному файлу (например 'chart.png') или None"""
+        path = os.path.join(self._entry(key), name)
+        return path if self.store_artifacts and os.path.isfile(path) else None
+
+    def store_artifact(self, key, name, source_path):
+        """Копирует готовый PNG/PDF в запись кэша"""
+        if not self.store_artifacts or key not in self:
+            return
+        target = os.path.join(self._entry(key), name)
+        staging = f"{target}.{os.getpid()}.tmp"
+        shutil.copyfile(source_path, staging)
+        os.replace(staging, target)
+        self._evict()
+
+    # ---------- вытеснение ----------
+
+    def _entries(self):
+        """[(время последнего доступа, размер, путь)] по всем записям"""
+        entries = []
+        for name in os.listdir(self.root):
+            path = os.path.join(self.root, name)
+            if name.startswith('.') or not os.path.isdir(path):
+                continue
+            try:
+                size = sum(entry.stat().st_size for entry in os.scandir(path) if entry.is_file())
+                entries.append((os.stat(path).st_mtime, size, path))
+            except OSError:
+                continue
+        return entries
+
+    def _evict(self):
+        """Удаляет самые давно использованные записи сверх лимитов"""
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        while entries and (total > self.max_bytes
+                           or (self.max_entries is not None and len(entries) > self.max_entries)):
+            _, size, path = entries.pop(0)
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
+
+    def size(self):
+        """Занятое место в байтах"""
+        return sum(size for _, size, _ in self._entries())
+
+    def clear(self):
+        """Удаляет все записи"""
+        for _, _, path in self._entries():
+            shutil.rmtree(path, ignore_errors=True)
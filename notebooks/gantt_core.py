@@ -0,0 +1,2669 @@
+"""
+Вычислительное ядро: распознавание структуры, валидация, граф зависимостей,
+CPM, инкрементальный пересчет, анализ рисков и ресурсное выравнивание.
+
+Импортирует только pandas и NumPy — без matplotlib и виджетов, поэтому
+подходит для рабочих процессов и скриптов.
+"""
+import pandas as pd
+import numpy as np
+import re
+from collections import deque
+import heapq
+import itertools
+import bisect
+import os
+import contextlib
+import logging
+import threading
+import time
+import tracemalloc
+import fnmatch
+import operator
+import datetime
+import importlib.util
+from io import BytesIO
+
+# ========== ВЫВОД И ИНСТРУМЕНТАЦИЯ ==========
+
+# Уровни подробности вывода
+QUIET, NORMAL, DEBUG = 0, 1, 2
+_verbosity = int(os.environ.get('GANTT_VERBOSITY', NORMAL))
+# Уровень внутри блока verbosity(...) действует только в своем потоке:
+# фоновый расчет в ноутбуке не глушит и не засоряет вывод остальных ячеек
+_thread_verbosity = threading.local()
+# Сколько элементов длинных списков (задачи, цепочки) выводить на экран
+MAX_PRINTED_ITEMS = 30
+
+
+def set_verbosity(level):
+    """Задает уровень вывода: QUIET — молча, NORMAL — как обычно, DEBUG — подробно. Возвращает прежний"""
+    global _verbosity
+    previous, _verbosity = _verbosity, level
+    return previous
+
+
+def get_verbosity():
+    return getattr(_thread_verbosity, 'level', _verbosity)
+
+
+@contextlib.contextmanager
+def verbosity(level):
+    """Временно меняет уровень вывода в текущем потоке: with verbosity(QUIET): ..."""
+    previous = getattr(_thread_verbosity, 'level', None)
+    _thread_verbosity.level = level
+    try:
+        yield
+    finally:
+        if previous is None:
+            del _thread_verbosity.level
+        else:
+            _thread_verbosity.level = previous
+
+
+def say(*args, level=NORMAL, **kwargs):
+    """print, который молчит, если уровень вывода ниже level"""
+    if get_verbosity() >= level:
+        print(*args, **kwargs)
+
+
+class PipelineProfile:
+    """
+    Замеры по этапам конвейера: время, пик памяти (через tracemalloc),
+    число строк и связей. Каждая запись передается в callback, если он задан:
+
+        profile = PipelineProfile(callback=log_stage)
+        create_gantt_chart(df, profile=profile)
+        profile.to_frame()
+    """
+    
+    def __init__(self, callback=None, trace_memory=True):
+        self.callback = callback
+        self.trace_memory = trace_memory
+        self.records = []
+    
+    @contextlib.contextmanager
+    def stage(self, name, rows=None, edges=None):
+        """Замеряет блок кода; в выданный словарь можно дописать rows/edges по ходу"""
+        record = {'stage': name, 'seconds': None, 'peak_mb': None, 'rows': rows, 'edges': edges}
+        tracing = self.trace_memory
+        started_tracing = tracing and not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        if tracing:
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+        started = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record['seconds'] = time.perf_counter() - started
+            if tracing:
+                record['peak_mb'] = (tracemalloc.get_traced_memory()[1] - baseline) / 2 ** 20
+                if started_tracing:
+                    tracemalloc.stop()
+            self.records.append(record)
+            if self.callback is not None:
+                self.callback(record)
+    
+    def to_frame(self):
+        return pd.DataFrame(self.records, columns=['stage', 'seconds', 'peak_mb', 'rows', 'edges'])
+    
+    def __str__(self):
+        lines = ["⏱️  ЭТАПЫ:"]
+        for record in self.records:
+            memory = f", пик {record['peak_mb']:.1f} МБ" if record['peak_mb'] is not None else ""
+            counts = ''.join(f", {key}: {record[key]}" for key in ('rows', 'edges') if record[key] is not None)
+            lines.append(f"   • {record['stage']}: {record['seconds']:.3f} с{memory}{counts}")
+        return '\n'.join(lines)
+
+
+def log_stage(record):
+    """Callback для PipelineProfile: пишет запись в logging (логгер 'gantt')"""
+    logging.getLogger('gantt').info(
+        "stage=%s seconds=%.3f peak_mb=%s rows=%s edges=%s", record['stage'], record['seconds'],
+        None if record['peak_mb'] is None else round(record['peak_mb'], 1), record['rows'], record['edges'])
+
+
+def timed_stage(profile, name, rows=None, edges=None):
+    """Этап профиля или пустой контекст, если профилирование не включено"""
+    if profile is None:
+        return contextlib.nullcontext({})
+    return profile.stage(name, rows=rows, edges=edges)
+
+# ========== ОПРЕДЕЛЕНИЕ СТРУКТУРЫ ==========
+
+# Определение структуры смотрит только на начало таблицы
+DETECTION_SAMPLE_ROWS = 10_000
+# Жесткий предел строк, которые определение структуры просматривает в одной колонке
+DETECTION_MAX_ROWS = 100_000
+DEPENDENCY_SAMPLE_VALUES = 20
+
+
+def _leading_values(column, count):
+    """
+    Первые count непустых значений колонки: окна по DETECTION_SAMPLE_ROWS
+    строк, не дальше DETECTION_MAX_ROWS. В редкой колонке может вернуть
+    меньше count значений — этого достаточно для оценки.
+    """
+    values = column.iloc[:DETECTION_SAMPLE_ROWS].dropna()
+    for start in range(DETECTION_SAMPLE_ROWS, min(len(column), DETECTION_MAX_ROWS), DETECTION_SAMPLE_ROWS):
+        if len(values) >= count:
+            break
+        values = pd.concat([values, column.iloc[start:start + DETECTION_SAMPLE_ROWS].dropna()])
+    return values.head(count)
+
+
+class TaskNameMatcher:
+    """
+    Проверяет, встречается ли в строке имя какой-либо задачи (длиннее
+    min_length - 1 символов). Вместо перебора всех имен для каждой строки
+    ищет в множестве имен подстроки строки — только тех длин, что есть у имен.
+    """
+    
+    def __init__(self, task_names, min_length=3):
+        # Проверяемые значения берутся не дальше DETECTION_MAX_ROWS строк, а ссылаются
+        # они обычно на более ранние задачи — имен из той же части колонки достаточно
+        sample = task_names.iloc[:DETECTION_MAX_ROWS].dropna()
+        self.names = {str(name) for name in pd.unique(sample) if len(str(name)) >= min_length}
+        self.lengths = sorted({len(name) for name in self.names})
+    
+    def found_in(self, text):
+        names = self.names
+        for length in self.lengths:
+            if length > len(text):
+                break
+            for start in range(len(text) - length + 1):
+                if text[start:start + length] in names:
+                    return True
+        return False
+
+
+class ProjectStructureAnalyzer:
+    """Анализатор логической структуры проекта для определения зависимостей"""
+    
+    @staticmethod
+    def detect_dependency_columns(df, task_column, exclude=()):
+        """
+        Определяет колонки зависимостей по логике проекта.
+        exclude — колонки, уже опознанные как другие поля (например, WBS:
+        в ней тоже встречаются названия задач).
+        """
+        say("🔍 АНАЛИЗ ЛОГИЧЕСКОЙ СТРУКТУРЫ ПРОЕКТА...")
+        
+        dependency_candidates = {
+            'predecessors': None,
+            'successors': None
+        }
+        
+        # Имена задач индексируются один раз на все колонки
+        task_matcher = TaskNameMatcher(df[task_column])
+        
+        # 1. Анализ по формату данных в колонках (только первые значения)
+        for col in df.columns:
+            if col == task_column or col in exclude:
+                continue
+                
+            col_data = _leading_values(df[col], DEPENDENCY_SAMPLE_VALUES)
+            if len(col_data) == 0:
+                continue
+            
+            # Анализируем содержимое колонки
+            dependency_score = ProjectStructureAnalyzer.analyze_column_dependency_pattern(col_data, task_matcher)
+            
+            if dependency_score > 0.7:  # Высокая вероятность что это зависимости
+                if dependency_score > dependency_candidates.get('predecessors_score', 0):
+                    dependency_candidates['predecessors'] = col
+                    dependency_candidates['predecessors_score'] = dependency_score
+        
+        say(f"✅ Обнаружены зависимости: {dependency_candidates['predecessors']}")
+        return dependency_candidates
+    
+    @staticmethod
+    def analyze_column_dependency_pattern(column_data, task_names):
+        """
+        Анализирует паттерны данных в колонке для определения зависимостей.
+        task_names — колонка задач или готовый TaskNameMatcher.
+        """
+        score = 0
+        total_values = len(column_data)
+        task_matcher = task_names if isinstance(task_names, TaskNameMatcher) else TaskNameMatcher(task_names)
+        
+        if total_values == 0:
+            return 0
+        
+        # Признаки колонки с зависимостями
+        patterns_found = 0
+        
+        for value in column_data.head(20):  # Анализируем первые 20 значений
+            value_str = str(value)
+            
+            # 1. Проверка на пустые значения (первые задачи могут не иметь зависимостей)
+            if pd.isna(value) or value_str in ['', 'nan', 'None']:
+                patterns_found += 0.2  # Слабый признак
+                continue
+            
+            # 2. Проверка на наличие названий задач из колонки задач
+            if task_matcher.found_in(value_str):
+                patterns_found += 1.0  # Сильный признак
+            
+            # 3. Проверка на разделители (запятые, точки с запятой)
+            if re.search(r'[,;]', value_str):
+                patterns_found += 0.8  # Средний признак
+            
+            # 4. Проверка на числовые коды (ID задач)
+            if re.match(r'^[A-Za-z]?\d+([,;]\s*[A-Za-z]?\d+)*$', value_str.strip()):
+                patterns_found += 0.6  # Средний признак
+        
+        score = patterns_found / min(20, total_values)
+        return score
+
+class SmartFieldMapper:
+    """Умный маппер полей с анализом логики проекта"""
+    
+    FIELD_ALIASES = {
+        'Task': ['task', 'задача', 'activity', 'work', 'name', 'название', 'id', 'код'],
+        # Трехточечные оценки длительности (PERT) — до Duration, чтобы "Optimistic duration"
+        # не перехватывалась им; сопоставляются только целыми словами (см. WHOLE_WORD_FIELDS)
+        'Optimistic': ['optimistic', 'оптимист', 'best case', 'min_dur', 'min dur'],
+        'MostLikely': ['most likely', 'most_likely', 'mostlikely', 'наиболее вероятн'],
+        'Pessimistic': ['pessimistic', 'пессимист', 'worst case', 'max_dur', 'max dur'],
+        'Duration': ['duration', 'длительность', 'days', 'дней', 'time', 'продолжительность'],
+        'Start': ['start', 'start_date', 'начало', 'дата начала', 'startdate'],
+        'Workers': ['workers', 'workforce', 'трудозатраты', 'ресурсы', 'labor', 'рабочая сила', 'team'],
+        'Dependencies': ['dependencies', 'predecessors', 'зависимости', 'предшественники', 'dep', 'pred'],
+        # Родительская группа задачи в иерархии работ (WBS)
+        'WBS': ['wbs', 'parent', 'родител', 'иср', 'outline', 'summary', 'этап', 'phase']
+    }
+    
+    # Поля, псевдонимы которых ищутся в заголовке только целым словом: иначе короткий
+    # заголовок вроде 'Dur' или 'min' входил бы в 'min_dur' и уходил от Duration
+    WHOLE_WORD_FIELDS = ('Optimistic', 'MostLikely', 'Pessimistic')
+    
+    # Найденные маппинги по сигнатуре заголовков (имена и типы колонок)
+    _layout_memo = {}
+    LAYOUT_MEMO_SIZE = 256
+    
+    @staticmethod
+    def layout_signature(df):
+        """Сигнатура раскладки таблицы: имена и типы колонок по порядку"""
+        return tuple((str(column), str(dtype)) for column, dtype in df.dtypes.items())
+    
+    @staticmethod
+    def detect_fields_with_logic(df, use_memo=True):
+        """
+        Определяет поля с учетом логики проекта.
+        Файл с уже встречавшейся раскладкой колонок не анализируется повторно.
+        """
+        signature = SmartFieldMapper.layout_signature(df)
+        memo = SmartFieldMapper._layout_memo
+        if use_memo and signature in memo:
+            say("🎯 СТРУКТУРА ПРОЕКТА УЖЕ ИЗВЕСТНА ПО ЗАГОЛОВКАМ")
+            return SmartFieldMapper._validate_mapping(df, dict(memo[signature]))
+        
+        say("🎯 УМНОЕ ОПРЕДЕЛЕНИЕ СТРУКТУРЫ ПРОЕКТА...")
+        
+        # 1. Сначала находим колонку с задачами по названию
+        task_column = SmartFieldMapper._find_task_column(df)
+        if not task_column:
+            return None
+        
+        say(f"   📝 Колонка задач: '{task_column}'")
+        
+        # 2. Находим остальные поля по названиям
+        other_fields = SmartFieldMapper._find_other_fields(df, task_column)
+        
+        # 3. Анализируем логику проекта для определения зависимостей (колонка WBS — не зависимости)
+        analyzer = ProjectStructureAnalyzer()
+        dependencies = analyzer.detect_dependency_columns(df, task_column, exclude=[other_fields.get('WBS')])
+        
+        # 4. Объединяем результаты
+        field_mapping = {
+            'Task': task_column,
+            **other_fields
+        }
+        
+        # 5. Если зависимости найдены анализатором, добавляем их
+        if dependencies['predecessors']:
+            field_mapping['Dependencies'] = dependencies['predecessors']
+        
+        # 6. Валидируем маппинг
+        field_mapping = SmartFieldMapper._validate_mapping(df, field_mapping)
+        
+        # 7. Запоминаем для файлов с той же раскладкой
+        if use_memo and field_mapping:
+            if len(memo) >= SmartFieldMapper.LAYOUT_MEMO_SIZE:
+                memo.pop(next(iter(memo)))
+            memo[signature] = dict(field_mapping)
+        return field_mapping
+    
+    @staticmethod
+    def _find_task_column(df):
+        """Находит колонку с названиями задач"""
+        for col in df.columns:
+            col_lower = str(col).lower()
+            
+            # Проверяем по названию
+            for alias in SmartFieldMapper.FIELD_ALIASES['Task']:
+                if alias in col_lower or col_lower in alias:
+                    return col
+            
+            # Проверяем по содержимому (уникальные строковые значения)
+            if SmartFieldMapper._looks_like_task_column(df[col]):
+                return col
+        
+        # Если не нашли по названию, берем первую нечисловую колонку
+        for col in df.columns:
+            if not pd.api.types.is_numeric_dtype(df[col]):
+                return col
+        
+        return df.columns[0]  # Последний вариант - первая колонка
+    
+    @staticmethod
+    def _looks_like_task_column(column):
+        """Определяет похожа ли колонка на колонку с задачами"""
+        if len(column) == 0:
+            return False
+        
+        # Доля уникальных — по началу колонки, а не по всем строкам
+        sample = column.iloc[:DETECTION_SAMPLE_ROWS]
+        unique_ratio = sample.nunique() / len(sample)
+        
+        # Признаки колонки с задачами:
+        # - Высокий процент уникальных значений
+        # - Строковые значения
+        # - Не даты и не числа
+        
+        if unique_ratio > 0.8 and not pd.api.types.is_numeric_dtype(column):
+            return True
+        
+        return False
+    
+    @staticmethod
+    def _find_other_fields(df, task_column):
+        """Находит остальные поля по названиям"""
+        other_fields = {}
+        
+        for field_type, aliases in SmartFieldMapper.FIELD_ALIASES.items():
+            if field_type == 'Task':
+                continue
+                
+            for col in df.columns:
+                if col == task_column or col in other_fields.values():
+                    continue
+                    
+                col_lower = str(col).lower()
+                for alias in aliases:
+                    if field_type in SmartFieldMapper.WHOLE_WORD_FIELDS:
+                        matched = re.search(rf'(?<![^\W_]){re.escape(alias)}(?![^\W_])', col_lower)
+                    else:
+                        matched = alias in col_lower or col_lower in alias
+                    if matched:
+                        other_fields[field_type] = col
+                        break
+                if field_type in other_fields:
+                    break
+        
+        return other_fields
+    
+    @staticmethod
+    def _validate_mapping(df, field_mapping):
+        """Валидирует правильность маппинга"""
+        # Проверяем что колонка задач существует и имеет данные
+        if field_mapping['Task'] not in df.columns:
+            return None
+        
+        task_col = field_mapping['Task']
+        if df[task_col].isna().all() or len(df[task_col].dropna()) == 0:
+            return None
+        
+        # Проверяем зависимости если они найдены
+        if field_mapping.get('Dependencies') and field_mapping['Dependencies'] not in df.columns:
+            field_mapping['Dependencies'] = None
+        
+        return field_mapping
+
+class FieldMapper:
+    """Маппер полей"""
+    @staticmethod
+    def map_dataframe(df, field_mapping):
+        rename_dict = {}
+        inverse_mapping = {}
+        
+        for standard_field, user_field in field_mapping.items():
+            if user_field and user_field in df.columns:
+                rename_dict[user_field] = standard_field
+                inverse_mapping[standard_field] = user_field
+        
+        df_mapped = df.rename(columns=rename_dict)
+        return df_mapped, inverse_mapping
+
+def validate_and_map_data(df, max_items=20, fail_fast=False, profile=None, return_project=False):
+    """
+    Продвинутая валидация с анализом логики проекта.
+    Возвращает (is_valid, report, df, inverse_mapping).
+    profile — PipelineProfile для замеров этапов mapping, parse и validation.
+    return_project=True добавляет пятым элементом разобранный ParsedProject
+    (None, если структура не определена) — его переиспользуют CPM и отрисовка.
+    """
+    say("=" * 60)
+    say("🔍 АВТОМАТИЧЕСКИЙ АНАЛИЗ СТРУКТУРЫ ПРОЕКТА")
+    say("=" * 60)
+    
+    # 1. Умное определение полей с анализом логики и 2. маппинг DataFrame
+    with timed_stage(profile, 'mapping', rows=len(df)):
+        field_mapping = SmartFieldMapper.detect_fields_with_logic(df)
+        if field_mapping:
+            df_mapped, inverse_mapping = FieldMapper.map_dataframe(df, field_mapping)
+    
+    if not field_mapping:
+        say("❌ Не удалось определить структуру проекта")
+        report = ValidationReport(max_items=max_items, fail_fast=fail_fast)
+        report.error('unknown_structure', "Не удалось автоматически определить структуру данных")
+        return (False, report, df, {}, None) if return_project else (False, report, df, {})
+    
+    say("✅ СТРУКТУРА ПРОЕКТА ОПРЕДЕЛЕНА:")
+    for field_type, user_field in field_mapping.items():
+        if user_field:
+            say(f"   • {field_type.upper()}: '{user_field}'")
+    
+    # 3. Без отдельной длительности берем наиболее вероятную оценку PERT
+    if 'Duration' not in df_mapped.columns and 'MostLikely' in df_mapped.columns:
+        df_mapped['Duration'] = df_mapped['MostLikely']
+        say("   • DURATION: взята из наиболее вероятной оценки")
+    
+    # 4. Если колонка Dependencies не найдена, создаем пустую
+    if 'Dependencies' not in df_mapped.columns:
+        df_mapped['Dependencies'] = ''
+        say("   • DEPENDENCIES: создана пустая колонка")
+    
+    # 5. Разбираем зависимости один раз — результат используют все этапы
+    with timed_stage(profile, 'parse', rows=len(df_mapped)) as stage:
+        project = ParsedProject.from_dataframe(df_mapped)
+        stage['edges'] = len(project.edge_rows)
+    
+    # 6. Стандартная валидация данных
+    with timed_stage(profile, 'validation', rows=len(df_mapped), edges=len(project.edge_rows)):
+        is_valid, errors, df_validated = standard_data_validation(
+            df_mapped, project=project, max_items=max_items, fail_fast=fail_fast
+        )
+    
+    if return_project:
+        return is_valid, errors, df_validated, inverse_mapping, project
+    return is_valid, errors, df_validated, inverse_mapping
+
+def topological_sort(df, project=None):
+    """Топологическая сортировка задач по зависимостям (итеративная, без рекурсии)"""
+    if project is None:
+        project = ParsedProject.from_dataframe(df)
+    graph = project.graph
+    order, _ = _wavefront_sort(graph.succ_ptr, graph.succ_idx, graph.in_degree)
+    
+    # Задачи на циклах добавляем в конец в порядке файла
+    if order.size < graph.n:
+        placed = np.zeros(graph.n, dtype=bool)
+        placed[order] = True
+        order = np.concatenate([order, np.flatnonzero(~placed)])
+    
+    return graph.tasks[order].tolist()
+
+def topological_levels(df, project=None):
+    """Номер фронта (уровня) каждой задачи: 0 — задачи без предшественников"""
+    if project is None:
+        project = ParsedProject.from_dataframe(df)
+    graph = project.graph
+    return pd.Series(graph.layering().level[graph.row_codes], index=df.index, name='Level')
+
+def calculate_realistic_dates(df, project=None, calendar=None):
+    """
+    Правильно рассчитывает даты выполнения задач с учетом зависимостей.
+    calendar — WorkCalendar; длительности тогда в рабочих днях.
+    """
+    if project is None:
+        project = ParsedProject.from_dataframe(df)
+    graph = project.graph
+    calendar = calendar or CALENDAR_DAYS
+    
+    # Начинаем с текущей даты: прямой проход по фронтам в рабочих днях от неё
+    current_date = calendar.origin(pd.Timestamp.now().normalize())
+    durations, release = _as_offsets(graph.task_values(df['Duration']))
+    early_start, early_finish = _forward_pass(graph, durations, release)
+    
+    rows = graph.row_codes
+    return df.assign(
+        Start=calendar.to_dates(early_start[rows], current_date),
+        End=calendar.to_finish_dates(early_finish[rows], current_date, early_start[rows]),
+    )
+
+class ValidationIssue:
+    """Одна проблема валидации: код, уровень, описание и затронутые задачи"""
+
+    def __init__(self, code, severity, title, items, count=None, max_items=None, tasks=None):
+        items = list(items)
+        tasks = items if tasks is None else list(tasks)
+        self.code = code
+        self.severity = severity
+        self.title = title
+        self.count = len(items) if count is None else count
+        # Храним не больше max_items примеров, общее количество — в count
+        self.items = items[:max_items]
+        self.tasks = tasks[:max_items]
+
+    def __str__(self):
+        if not self.items:
+            return self.title
+        text = f"{self.title}: {', '.join(map(str, self.items))}"
+        hidden = self.count - len(self.items)
+        if hidden > 0:
+            text += f" … и ещё {hidden}"
+        return text
+
+    def __repr__(self):
+        return f"ValidationIssue({self.code!r}, {self.severity!r}, count={self.count})"
+
+
+class ValidationReport:
+    """
+    Структурированный отчет валидации.
+
+    max_items ограничивает количество примеров на каждый тип ошибки,
+    fail_fast останавливает проверку после первой найденной ошибки.
+    Итерация по отчету дает тексты ошибок (как прежний список строк).
+    """
+
+    def __init__(self, max_items=20, fail_fast=False):
+        self.max_items = max_items
+        self.fail_fast = fail_fast
+        self.issues = []
+
+    def add(self, code, severity, title, items=(), count=None, tasks=None):
+        self.issues.append(ValidationIssue(code, severity, title, items, count, self.max_items, tasks))
+
+    def error(self, code, title, items=(), count=None, tasks=None):
+        self.add(code, 'error', title, items, count, tasks)
+
+    def warning(self, code, title, items=(), count=None, tasks=None):
+        self.add(code, 'warning', title, items, count, tasks)
+
+    @property
+    def errors(self):
+        return [issue for issue in self.issues if issue.severity == 'error']
+
+    @property
+    def warnings(self):
+        return [issue for issue in self.issues if issue.severity == 'warning']
+
+    @property
+    def is_valid(self):
+        return not self.errors
+
+    @property
+    def stopped(self):
+        """Нужно ли прекратить проверку (режим fail_fast и уже есть ошибка)"""
+        return self.fail_fast and not self.is_valid
+
+    def to_frame(self):
+        """Сводная таблица: код, уровень, количество и задачи (не больше max_items)"""
+        return pd.DataFrame(
+            [(issue.code, issue.severity, issue.count, issue.tasks) for issue in self.issues],
+            columns=['code', 'severity', 'count', 'tasks']
+        )
+
+    def __iter__(self):
+        return iter([str(issue) for issue in self.errors])
+
+    def __len__(self):
+        return len(self.errors)
+
+    def __bool__(self):
+        return not self.is_valid
+
+
+def _quoted(values):
+    """Имена задач в кавычках для текста отчета"""
+    return [f"'{value}'" for value in values]
+
+
+def standard_data_validation(df, project=None, max_items=20, fail_fast=False):
+    """Стандартная валидация данных (колоночные проверки, отчет с ограничением примеров)"""
+    report = ValidationReport(max_items=max_items, fail_fast=fail_fast)
+    
+    say("🔍 ВАЛИДАЦИЯ ДАННЫХ...")
+    say("=" * 50)
+    
+    # 1. Проверка структуры файла
+    if df.empty:
+        report.error('empty_file', "Файл пустой")
+        return False, report, df
+    
+    # 2. Проверка обязательных колонок
+    required_columns = ['Task', 'Duration']
+    for col in required_columns:
+        if col not in df.columns:
+            report.error('missing_column', f"Отсутствует обязательная колонка: '{col}'")
+    
+    if report.errors:
+        return False, report, df
+    
+    tasks = df['Task']
+    
+    # 3. Проверка уникальности названий задач
+    duplicated = tasks.duplicated(keep=False)
+    if duplicated.any():
+        duplicate_names = tasks[duplicated].unique()
+        report.error('duplicate_task', "Дублирующиеся названия задач",
+                     duplicate_names[:max_items], count=len(duplicate_names))
+    
+    # 4. Проверка длительностей
+    df['Duration'] = pd.to_numeric(df['Duration'], errors='coerce')
+    invalid_durations = df['Duration'].isna() | (df['Duration'] <= 0)
+    if invalid_durations.any():
+        report.error('invalid_duration', "Некорректные длительности",
+                     tasks[invalid_durations].head(max_items), count=int(invalid_durations.sum()))
+    
+    # 5. Проверка дат (если есть)
+    if 'Start' in df.columns:
+        df['Start'] = pd.to_datetime(df['Start'], errors='coerce', format='%Y-%m-%d')
+        invalid_dates = df['Start'].isna()
+        if invalid_dates.any():
+            report.warning('invalid_start', "Некорректные даты начала",
+                           tasks[invalid_dates].head(max_items), count=int(invalid_dates.sum()))
+    else:
+        df['Start'] = pd.Timestamp.now().normalize()
+    
+    # 6. ПРОВЕРКА ЗАВИСИМОСТЕЙ
+    if 'Dependencies' in df.columns and not report.stopped:
+        _validate_dependencies(df, project, report)
+    
+    # 7. Проверка числовых колонок
+    numeric_columns = ['Workers', 'Priority', 'Cost', 'Optimistic', 'MostLikely', 'Pessimistic']
+    for col in numeric_columns:
+        if col in df.columns and not report.stopped:
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+            invalid_values = df[col].isna()
+            if invalid_values.any():
+                report.warning('invalid_number', f"Некорректные значения в '{col}'",
+                               tasks[invalid_values].head(max_items), count=int(invalid_values.sum()))
+            
+            # Проверка отрицательных значений
+            if col in ['Workers', 'Optimistic', 'MostLikely', 'Pessimistic']:
+                negative_values = df[col] < 0
+                if negative_values.any():
+                    report.error('negative_value', f"Отрицательные значения в '{col}'",
+                                 tasks[negative_values].head(max_items), count=int(negative_values.sum()))
+    
+    # 8. Проверка формата названий задач
+    if not report.stopped:
+        if pd.api.types.is_string_dtype(tasks) and not pd.api.types.is_object_dtype(tasks):
+            invalid_names = tasks.isna() | (tasks.str.strip() == '')
+        else:
+            invalid_names = ~tasks.map(lambda name: isinstance(name, str) and bool(name.strip())).astype(bool)
+        if invalid_names.any():
+            bad_tasks = tasks[invalid_names].head(max_items).tolist()
+            report.error('invalid_task_name', "Некорректные названия задач", _quoted(bad_tasks),
+                         count=int(invalid_names.sum()), tasks=bad_tasks)
+    
+    # ВЫВОД РЕЗУЛЬТАТОВ ВАЛИДАЦИИ
+    if report.warnings:
+        say("⚠️  ПРЕДУПРЕЖДЕНИЯ:")
+        for warning in report.warnings:
+            say(f"   • {warning}")
+    
+    if report.errors:
+        say("❌ ОШИБКИ:")
+        for error in report.errors:
+            say(f"   🚫 {error}")
+        return False, report, df
+    
+    say("✅ ВАЛИДАЦИЯ ПРОЙДЕНА УСПЕШНО!")
+    say(f"   • Задачи: {len(df)}")
+    say(f"   • Колонки: {', '.join(map(str, df.columns))}")
+    say(f"   • Период: {df['Start'].min().strftime('%d.%m.%Y')} - {df['End'].max().strftime('%d.%m.%Y') if 'End' in df.columns else 'N/A'}")
+    
+    return True, report, df
+
+def _validate_dependencies(df, project, report):
+    """Проверки колонки Dependencies по разобранному списку рёбер"""
+    max_items = report.max_items
+    if project is None:
+        project = ParsedProject.from_dataframe(df)
+    task_names = df['Task'].to_numpy()
+    deps_str = df['Dependencies'].astype(object).where(df['Dependencies'].notna(), '').astype(str)
+    
+    # Проверка на специальные символы
+    bad_chars = deps_str.str.contains(r'[{}[\]()]', regex=True)
+    if bad_chars.any():
+        bad_tasks = task_names[bad_chars.to_numpy()][:max_items]
+        examples = [f"'{task}': {deps}" for task, deps in zip(bad_tasks, deps_str[bad_chars].head(max_items))]
+        report.error('dependency_chars', "Некорректные символы в зависимостях", examples,
+                     count=int(bad_chars.sum()), tasks=bad_tasks)
+    
+    # Проверка на пустые элементы в списке
+    empty_items = deps_str.str.contains(',,', regex=False) | deps_str.str.startswith(',') | deps_str.str.endswith(',')
+    if empty_items.any():
+        bad_tasks = task_names[empty_items.to_numpy()][:max_items]
+        examples = [f"'{task}': {deps}" for task, deps in zip(bad_tasks, deps_str[empty_items].head(max_items))]
+        report.error('dependency_empty_item', "Пустые элементы в зависимостях", examples,
+                     count=int(empty_items.sum()), tasks=bad_tasks)
+    
+    if report.stopped:
+        return
+    
+    # Проверка существования зависимых задач
+    missing_rows, missing_names = project.missing_dependencies()
+    if missing_rows.size:
+        bad_tasks = task_names[missing_rows[:max_items]]
+        examples = [f"'{task}' → '{dep}'" for task, dep in zip(bad_tasks, missing_names[:max_items])]
+        report.error('missing_dependency', "Несуществующие зависимости", examples,
+                     count=int(missing_rows.size), tasks=bad_tasks)
+    
+    # Проверка самозависимостей
+    self_rows = project.self_dependency_rows()
+    if self_rows.size:
+        bad_tasks = task_names[self_rows[:max_items]]
+        report.error('self_dependency', "Самозависимости", _quoted(bad_tasks),
+                     count=int(self_rows.size), tasks=bad_tasks)
+    
+    if report.stopped:
+        return
+    
+    # Проверка циклических зависимостей (самозависимости уже учтены выше)
+    graph = project.graph
+    cycles = []
+    cycle_tasks = []
+    for component, cycle in find_cyclic_components(graph):
+        if component.size == 1:
+            continue
+        names = [str(name) for name in graph.tasks[cycle[:max_items]]]
+        if len(cycle) > max_items:
+            cycles.append(' → '.join(names + ['…']))
+        else:
+            cycles.append(' → '.join(names + [names[0]]))
+        cycle_tasks.append(names[0])
+    if cycles:
+        report.error('cyclic_dependency', "Циклические зависимости", cycles[:max_items],
+                     count=len(cycles), tasks=cycle_tasks)
+
+def parse_dependencies(deps_str):
+    """Парсит зависимости из строки с обработкой ошибок"""
+    if pd.isna(deps_str) or deps_str == '' or deps_str == 'nan':
+        return []
+    
+    try:
+        clean_str = str(deps_str).replace('"', '').replace("'", "").strip()
+        if not clean_str:
+            return []
+        
+        deps = [dep.strip() for dep in clean_str.split(',')]
+        return [dep for dep in deps if dep]
+    except Exception:
+        return []
+
+class ParsedProject:
+    """
+    Однократно разобранные зависимости проекта.
+
+    Хранит коды задач и типизированный список рёбер: для каждой ссылки
+    на зависимость — строку зависимой задачи, имя и код зависимости
+    (-1, если такой задачи нет). Все этапы расчета работают с этим объектом
+    вместо повторного разбора колонки Dependencies.
+    """
+
+    def __init__(self, tasks, row_codes, edge_rows, edge_names):
+        self.tasks = pd.Index(tasks)
+        self.n_tasks = len(self.tasks)
+        self.row_codes = np.asarray(row_codes, dtype=np.int64)
+        # Строка (позиция в DataFrame) задачи, у которой указана зависимость
+        self.edge_rows = np.asarray(edge_rows, dtype=np.int32)
+        self.edge_names = np.asarray(edge_names, dtype=object)
+        codes = self.tasks.get_indexer(self.edge_names) if len(self.edge_names) else np.empty(0)
+        self.edge_codes = np.asarray(codes, dtype=np.int32)
+        self._graph = None
+
+    @classmethod
+    def from_dataframe(cls, df):
+        """Векторный разбор колонок Task и Dependencies (split/explode вместо цикла по строкам)"""
+        row_codes, tasks = pd.factorize(df['Task'], use_na_sentinel=False)
+        
+        if 'Dependencies' not in df.columns:
+            return cls(tasks, row_codes, [], [])
+        
+        deps = df['Dependencies'].reset_index(drop=True)
+        deps = deps[deps.notna()].astype(str)
+        deps = deps[(deps != '') & (deps != 'nan')]
+        
+        tokens = (deps.str.replace('"', '', regex=False)
+                      .str.replace("'", '', regex=False)
+                      .str.split(',')
+                      .explode()
+                      .str.strip())
+        tokens = tokens[tokens.notna() & (tokens != '')]
+        
+        return cls(tasks, row_codes, tokens.index.to_numpy(), tokens.to_numpy(dtype=object))
+
+    @property
+    def known(self):
+        """Маска ссылок на существующие задачи"""
+        return self.edge_codes >= 0
+
+    @property
+    def src(self):
+        """Коды предшественников (только существующие задачи)"""
+        return self.edge_codes[self.known]
+
+    @property
+    def dst(self):
+        """Коды зависимых задач (только существующие задачи)"""
+        return self.row_codes[self.edge_rows[self.known]].astype(np.int32)
+
+    @property
+    def graph(self):
+        """CSR-граф задач (строится один раз)"""
+        if self._graph is None:
+            self._graph = TaskGraph(self.tasks, self.src, self.dst, self.row_codes)
+        return self._graph
+
+    def missing_dependencies(self):
+        """Пары (строка задачи, имя несуществующей зависимости)"""
+        missing = ~self.known
+        return self.edge_rows[missing], self.edge_names[missing]
+
+    def self_dependency_rows(self):
+        """Строки задач, которые зависят сами от себя"""
+        known = self.known
+        rows = self.edge_rows[known]
+        return np.unique(rows[self.row_codes[rows] == self.edge_codes[known]])
+
+def find_cyclic_dependencies(df, project=None):
+    """Находит все циклические зависимости (по одному циклу на компоненту сильной связности)"""
+    if project is None:
+        project = ParsedProject.from_dataframe(df)
+    graph = project.graph
+    
+    all_cycles = []
+    for _, cycle in find_cyclic_components(graph):
+        names = [str(name) for name in graph.tasks[cycle]]
+        all_cycles.append(' → '.join(names + [names[0]]))
+    
+    return all_cycles
+
+def build_dependency_graph(df, project=None):
+    """Строит полный граф зависимостей"""
+    if project is None:
+        project = ParsedProject.from_dataframe(df)
+    graph = project.graph
+    names = graph.tasks.tolist()
+    
+    # Зависимости — как в исходных данных (включая несуществующие задачи)
+    dependencies = {name: [] for name in names}
+    for row, dep in zip(project.edge_rows.tolist(), project.edge_names.tolist()):
+        dependencies[names[project.row_codes[row]]].append(dep)
+    
+    return {
+        name: {
+            'dependencies': dependencies[name],
+            'successors': [names[succ] for succ in graph.succ_idx[graph.succ_ptr[code]:graph.succ_ptr[code + 1]]]
+        }
+        for code, name in enumerate(names)
+    }
+
+# ========== РАБОЧИЙ КАЛЕНДАРЬ ==========
+
+class WorkCalendar:
+    """
+    Рабочие дни недели и праздники.
+
+    Расписание считается в рабочих днях от даты отсчета, а в даты смещения
+    переводятся один раз, векторно (numpy.busday_offset / busday_count).
+    weekmask — как в NumPy: '1111100' или 'Mon Tue Wed Thu Fri'.
+    По умолчанию все дни рабочие — календарные сутки, как без календаря.
+    """
+
+    def __init__(self, weekmask='1111111', holidays=()):
+        holidays = pd.to_datetime(pd.Index(list(holidays), dtype=object)).normalize()
+        self._calendar = np.busdaycalendar(weekmask=weekmask, holidays=holidays.to_numpy(dtype='datetime64[D]'))
+        self.weekmask = ''.join('1' if day else '0' for day in self._calendar.weekmask)
+        self.holidays = self._calendar.holidays
+        self.continuous = self.weekmask == '1111111' and not len(self.holidays)
+
+    def __reduce__(self):
+        # np.busdaycalendar не сериализуется: для пула процессов пересоздаем календарь
+        return WorkCalendar, (self.weekmask, [str(day) for day in self.holidays])
+
+    def __repr__(self):
+        # Используется и в ключах кэша, поэтому перечисляет все праздники
+        holidays = ', '.join(str(day) for day in self.holidays)
+        return f"WorkCalendar(weekmask='{self.weekmask}', holidays=[{holidays}])"
+
+    def origin(self, date):
+        """Дата отсчета: первый рабочий день не раньше date"""
+        date = pd.Timestamp(date)
+        if self.continuous:
+            return date
+        day = np.busday_offset(np.datetime64(date.normalize(), 'D'), 0, roll='forward', busdaycal=self._calendar)
+        return pd.Timestamp(day)
+
+    def to_offsets(self, dates, origin):
+        """Смещения дат от origin в рабочих днях (нерабочий день — как следующий рабочий)"""
+        if self.continuous:
+            return (np.asarray(dates) - np.datetime64(origin)) / np.timedelta64(1, 'D')
+        origin_day = np.datetime64(origin, 'D')
+        # Нерабочие дни перед origin (origin уже сдвинут вперед) — это сам origin
+        days = np.maximum(np.asarray(dates).astype('datetime64[D]'), origin_day)
+        return np.busday_count(origin_day, days, busdaycal=self._calendar)
+
+    def to_dates(self, offsets, origin):
+        """Даты начала по смещениям в рабочих днях; дробная часть — доля суток"""
+        offsets = np.asarray(offsets)
+        if self.continuous:
+            return origin + pd.to_timedelta(offsets, unit='D')
+        whole = np.floor(offsets)
+        origin_day = np.datetime64(origin, 'D')
+        days = np.busday_offset(origin_day, whole.astype(np.int64), roll='forward', busdaycal=self._calendar)
+        return origin + pd.to_timedelta((days - origin_day).astype(np.int64) + (offsets - whole), unit='D')
+
+    def to_finish_dates(self, finish, origin, start=None):
+        """
+        Даты окончания: конец последнего рабочего дня, а не начало следующего,
+        чтобы полоса задачи не растягивалась на выходные. У задач нулевой
+        длительности (finish == start) окончание совпадает с началом.
+        """
+        finish = np.asarray(finish)
+        if self.continuous:
+            return origin + pd.to_timedelta(finish, unit='D')
+        last_day = np.ceil(finish) - 1
+        dates = self.to_dates(last_day, origin) + pd.to_timedelta(finish - last_day, unit='D')
+        if start is not None:
+            dates = dates.where(finish > np.asarray(start), self.to_dates(start, origin))
+        return dates
+
+
+# Календарные сутки: календарь по умолчанию
+CALENDAR_DAYS = WorkCalendar()
+
+# ========== ВЫЧИСЛИТЕЛЬНОЕ ЯДРО CPM (МАССИВЫ NUMPY) ==========
+
+# Фронт меньше этого размера обрабатывается скалярным циклом:
+# на длинных цепочках накладные расходы numpy дороже самой работы
+_SCALAR_FRONTIER = 16
+
+
+def _build_csr(n, keys, values):
+    """Строит CSR-представление (indptr, indices) для рёбер keys → values"""
+    keys = np.asarray(keys, dtype=np.int64)
+    order = np.argsort(keys, kind='stable')
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(keys, minlength=n), out=indptr[1:])
+    return indptr, np.asarray(values, dtype=np.int32)[order]
+
+
+def _csr_gather(indptr, indices, nodes):
+    """Возвращает соседей всех узлов nodes одним массивом (без цикла Python)"""
+    starts = indptr[nodes]
+    counts = indptr[nodes + 1] - starts
+    total = int(counts.sum())
+    if total == 0:
+        return indices[:0]
+    offsets = np.repeat(starts - (np.cumsum(counts) - counts), counts)
+    return indices[offsets + np.arange(total)]
+
+
+def _wavefront_sort(indptr, indices, in_degree):
+    """
+    Алгоритм Кана по фронтам.
+
+    Возвращает топологический порядок и размеры фронтов (уровней). Задачи,
+    лежащие на циклах или за ними, в результат не попадают.
+    """
+    in_degree = in_degree.copy()
+    frontier = np.flatnonzero(in_degree == 0)
+    parts = []
+    sizes = []
+    narrow = []
+    scalar = None
+    # Узкие фронты ведут степени в списке Python (поэлементный доступ к массиву NumPy
+    # в цикле дорог); при смене режима переносятся только затронутые с тех пор задачи
+    degrees = None
+    wide_touched = []
+
+    while len(frontier):
+        sizes.append(len(frontier))
+
+        if len(frontier) < _SCALAR_FRONTIER:
+            # Узкие фронты обходим по спискам Python: CSR переводится в списки один раз
+            if scalar is None:
+                scalar = indptr.tolist(), indices.tolist()
+                degrees = in_degree.tolist()
+            elif wide_touched:
+                touched = np.concatenate(wide_touched)
+                for task, degree in zip(touched.tolist(), in_degree[touched].tolist()):
+                    degrees[task] = degree
+                wide_touched = []
+            ptr, idx = scalar
+            if not isinstance(frontier, list):
+                frontier = frontier.tolist()
+            # Подряд идущие узкие фронты — во внутреннем цикле без проверок внешнего
+            while True:
+                narrow.extend(frontier)
+                next_frontier = []
+                for task in frontier:
+                    for succ in idx[ptr[task]:ptr[task + 1]]:
+                        degrees[succ] -= 1
+                        if degrees[succ] == 0:
+                            next_frontier.append(succ)
+                frontier = next_frontier
+                if not frontier or len(frontier) >= _SCALAR_FRONTIER:
+                    break
+                sizes.append(len(frontier))
+        else:
+            if narrow:
+                # Степени изменились только у последователей задач узких фронтов
+                narrow = np.asarray(narrow, dtype=np.int64)
+                parts.append(narrow)
+                touched = _csr_gather(indptr, indices, narrow)
+                in_degree[touched] = [degrees[task] for task in touched.tolist()]
+                narrow = []
+            frontier = np.asarray(frontier, dtype=np.int64)
+            parts.append(frontier)
+            successors = _csr_gather(indptr, indices, frontier)
+            touched, counts = np.unique(successors, return_counts=True)
+            in_degree[touched] -= counts
+            if degrees is not None:
+                wide_touched.append(touched)
+            frontier = touched[in_degree[touched] == 0].astype(np.int64)
+
+    if narrow:
+        parts.append(np.asarray(narrow, dtype=np.int64))
+    order = np.concatenate(parts) if parts else np.empty(0, dtype=np.int64)
+    return order, np.asarray(sizes, dtype=np.int64)
+
+
+class TaskGraph:
+    """Граф задач: целочисленные коды задач и CSR-массивы предшественников/последователей"""
+
+    def __init__(self, task_names, src, dst, row_codes=None):
+        self.tasks = pd.Index(task_names)
+        self.n = len(self.tasks)
+        # Ребро src → dst: задача src должна завершиться до начала dst
+        self.src = np.asarray(src, dtype=np.int32)
+        self.dst = np.asarray(dst, dtype=np.int32)
+        # Код задачи для каждой строки исходного DataFrame
+        self.row_codes = np.arange(self.n) if row_codes is None else np.asarray(row_codes)
+        self.succ_ptr, self.succ_idx = _build_csr(self.n, self.src, self.dst)
+        self.pred_ptr, self.pred_idx = _build_csr(self.n, self.dst, self.src)
+        self.first_rows = np.unique(self.row_codes, return_index=True)[1]
+        self.in_degree = np.diff(self.pred_ptr)
+        self.out_degree = np.diff(self.succ_ptr)
+        self._layering = None
+
+    def task_values(self, column):
+        """Значения колонки DataFrame по кодам задач (первая строка каждой задачи)"""
+        return np.asarray(column)[self.first_rows]
+
+    def topological_order(self):
+        """Топологический порядок кодов задач"""
+        return self.layering().order
+
+    def layering(self):
+        """Топологическое разбиение графа на фронты (вычисляется один раз)"""
+        if self._layering is None:
+            self._forward_sort()
+            if self._layering is None:
+                raise ValueError("Граф зависимостей содержит цикл — топологический порядок не существует")
+        return self._layering
+
+    def _forward_sort(self):
+        """
+        Алгоритм Кана с начала графа: (порядок, размеры фронтов). Полный порядок
+        (граф ацикличен) запоминается — проверка циклов и расчет по фронтам
+        используют одну и ту же сортировку.
+        """
+        if self._layering is not None:
+            return self._layering.order, np.diff(self._layering.level_ptr)
+        order, sizes = _wavefront_sort(self.succ_ptr, self.succ_idx, self.in_degree)
+        if order.size == self.n:
+            self._layering = TopologicalLayering(order, sizes)
+        return order, sizes
+
+    def _is_deep(self):
+        """Узкий и глубокий граф (длинные цепочки) выгоднее считать скалярным циклом"""
+        return self.layering().n_levels * _SCALAR_FRONTIER > self.n
+
+
+class TopologicalLayering:
+    """
+    Топологический порядок задач, сгруппированный по фронтам (уровням).
+
+    Фронт k — задачи, у которых самая длинная цепочка предшественников
+    состоит из k задач. Все предшественники задачи лежат в более ранних
+    фронтах, поэтому каждый фронт можно обрабатывать одной векторной операцией.
+    """
+
+    def __init__(self, order, sizes):
+        n = len(order)
+        self.order = order
+        # order[level_ptr[k]:level_ptr[k + 1]] — задачи k-го фронта
+        self.level_ptr = np.zeros(len(sizes) + 1, dtype=np.int64)
+        np.cumsum(sizes, out=self.level_ptr[1:])
+        self.n_levels = len(sizes)
+        # Номер фронта и позиция в топологическом порядке для каждой задачи
+        self.level = np.empty(n, dtype=np.int64)
+        self.level[self.order] = np.repeat(np.arange(self.n_levels), np.diff(self.level_ptr))
+        self.rank = np.empty(n, dtype=np.int64)
+        self.rank[self.order] = np.arange(n)
+
+    def __iter__(self):
+        for k in range(self.n_levels):
+            yield self.tasks_at(k)
+
+    def tasks_at(self, k):
+        """Коды задач k-го фронта"""
+        return self.order[self.level_ptr[k]:self.level_ptr[k + 1]]
+
+
+def _tarjan_scc(n, indptr, indices):
+    """Итеративный алгоритм Тарьяна: компоненты сильной связности за O(V+E) без рекурсии"""
+    index = [-1] * n
+    lowlink = [0] * n
+    on_stack = [False] * n
+    stack = []
+    components = []
+    counter = 0
+
+    for root in range(n):
+        if index[root] != -1:
+            continue
+
+        index[root] = lowlink[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = True
+        work = [[root, indptr[root]]]
+
+        while work:
+            frame = work[-1]
+            task, pos = frame
+            if pos < indptr[task + 1]:
+                frame[1] += 1
+                neighbor = indices[pos]
+                if index[neighbor] == -1:
+                    index[neighbor] = lowlink[neighbor] = counter
+                    counter += 1
+                    stack.append(neighbor)
+                    on_stack[neighbor] = True
+                    work.append([neighbor, indptr[neighbor]])
+                elif on_stack[neighbor]:
+                    lowlink[task] = min(lowlink[task], index[neighbor])
+                continue
+
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                lowlink[parent] = min(lowlink[parent], lowlink[task])
+
+            if lowlink[task] == index[task]:
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack[member] = False
+                    component.append(member)
+                    if member == task:
+                        break
+                components.append(component)
+
+    return components
+
+
+def _representative_cycle(component, indptr, indices):
+    """Находит один цикл внутри компоненты поиском в ширину от её первой задачи"""
+    members = set(component)
+    root = min(component)
+    parent = {root: None}
+    queue = deque([root])
+
+    while queue:
+        task = queue.popleft()
+        for neighbor in indices[indptr[task]:indptr[task + 1]]:
+            if neighbor == root:
+                cycle = []
+                while task is not None:
+                    cycle.append(task)
+                    task = parent[task]
+                return cycle[::-1]
+            if neighbor in members and neighbor not in parent:
+                parent[neighbor] = task
+                queue.append(neighbor)
+
+    return [root]
+
+
+def find_cyclic_components(graph):
+    """
+    Находит все циклические компоненты графа.
+
+    Сначала векторно отсекаются задачи, не лежащие на циклах (алгоритм Кана
+    с начала и с конца графа), затем на остатке запускается алгоритм Тарьяна.
+    Если проход с начала упорядочил все задачи, циклов нет, а его порядок
+    остается в графе для layering(). Возвращает список пар (коды задач
+    компоненты, коды задач одного цикла); цикл идёт от задачи к её зависимостям.
+    """
+    order, _ = graph._forward_sort()
+    if order.size == graph.n:
+        return []
+    acyclic = np.zeros(graph.n, dtype=bool)
+    acyclic[order] = True
+    acyclic[_wavefront_sort(graph.pred_ptr, graph.pred_idx, graph.out_degree)[0]] = True
+
+    residual = np.flatnonzero(~acyclic)
+    if not residual.size:
+        return []
+
+    # Подграф из оставшихся задач с локальной нумерацией
+    local = np.full(graph.n, -1, dtype=np.int64)
+    local[residual] = np.arange(residual.size)
+    keep = (local[graph.src] >= 0) & (local[graph.dst] >= 0)
+    sub_ptr, sub_idx = _build_csr(residual.size, local[graph.dst[keep]], local[graph.src[keep]])
+    sub_ptr, sub_idx = sub_ptr.tolist(), sub_idx.tolist()
+
+    cyclic = []
+    for component in _tarjan_scc(residual.size, sub_ptr, sub_idx):
+        if len(component) == 1:
+            task = component[0]
+            if task not in sub_idx[sub_ptr[task]:sub_ptr[task + 1]]:
+                continue
+        cycle = _representative_cycle(component, sub_ptr, sub_idx)
+        cyclic.append((np.sort(residual[component]), residual[cycle]))
+
+    cyclic.sort(key=lambda item: item[0][0])
+    return cyclic
+
+
+def _edges_by_level(graph, key_nodes):
+    """Сортирует рёбра по фронту узла key_nodes; возвращает (src, dst, границы фронтов)"""
+    layering = graph.layering()
+    edge_level = layering.level[key_nodes]
+    edge_order = np.argsort(edge_level, kind='stable')
+    edge_ptr = np.searchsorted(edge_level[edge_order], np.arange(layering.n_levels + 1))
+    return graph.src[edge_order], graph.dst[edge_order], edge_ptr
+
+
+def _forward_pass(graph, durations, release):
+    """Прямой проход: ранние начало и окончание, фронт за фронтом"""
+    layering = graph.layering()
+    order, level_ptr = layering.order, layering.level_ptr
+
+    if graph._is_deep():
+        ptr, idx = graph.pred_ptr.tolist(), graph.pred_idx.tolist()
+        dur = durations.tolist()
+        early_start = release.tolist()
+        early_finish = [0] * graph.n
+        for task in order.tolist():
+            lo, hi = ptr[task], ptr[task + 1]
+            if hi - lo == 1:
+                early_start[task] = early_finish[idx[lo]]
+            elif hi > lo:
+                early_start[task] = max([early_finish[p] for p in idx[lo:hi]])
+            early_finish[task] = early_start[task] + dur[task]
+        return np.asarray(early_start, dtype=durations.dtype), np.asarray(early_finish, dtype=durations.dtype)
+
+    src, dst, edge_ptr = _edges_by_level(graph, graph.dst)
+    early_start = release.copy()
+    early_start[graph.in_degree > 0] = _lowest(durations.dtype)
+    early_finish = np.empty_like(early_start)
+
+    for level in range(len(level_ptr) - 1):
+        lo, hi = edge_ptr[level], edge_ptr[level + 1]
+        if hi > lo:
+            np.maximum.at(early_start, dst[lo:hi], early_finish[src[lo:hi]])
+        tasks = order[level_ptr[level]:level_ptr[level + 1]]
+        early_finish[tasks] = early_start[tasks] + durations[tasks]
+
+    return early_start, early_finish
+
+
+def _backward_pass(graph, durations, project_end):
+    """Обратный проход: поздние начало и окончание, от последнего фронта к первому"""
+    layering = graph.layering()
+    order, level_ptr = layering.order, layering.level_ptr
+
+    if graph._is_deep():
+        ptr, idx = graph.succ_ptr.tolist(), graph.succ_idx.tolist()
+        dur = durations.tolist()
+        late_finish = [project_end.item()] * graph.n
+        late_start = [0] * graph.n
+        for task in order[::-1].tolist():
+            lo, hi = ptr[task], ptr[task + 1]
+            if hi - lo == 1:
+                late_finish[task] = late_start[idx[lo]]
+            elif hi > lo:
+                late_finish[task] = min([late_start[s] for s in idx[lo:hi]])
+            late_start[task] = late_finish[task] - dur[task]
+        return np.asarray(late_start, dtype=durations.dtype), np.asarray(late_finish, dtype=durations.dtype)
+
+    src, dst, edge_ptr = _edges_by_level(graph, graph.src)
+    late_finish = np.full_like(durations, project_end)
+    late_finish[graph.out_degree > 0] = _highest(durations.dtype)
+    late_start = np.empty_like(late_finish)
+
+    for level in range(len(level_ptr) - 2, -1, -1):
+        lo, hi = edge_ptr[level], edge_ptr[level + 1]
+        if hi > lo:
+            np.minimum.at(late_finish, src[lo:hi], late_start[dst[lo:hi]])
+        tasks = order[level_ptr[level]:level_ptr[level + 1]]
+        late_start[tasks] = late_finish[tasks] - durations[tasks]
+
+    return late_start, late_finish
+
+
+def _lowest(dtype):
+    return np.iinfo(dtype).min if np.issubdtype(dtype, np.integer) else -np.inf
+
+
+def _highest(dtype):
+    return np.iinfo(dtype).max if np.issubdtype(dtype, np.integer) else np.inf
+
+
+def _as_offsets(durations, release=None):
+    """Приводит длительности и смещения к общему типу: целые дни, если возможно"""
+    durations = np.asarray(durations)
+    if np.issubdtype(durations.dtype, np.integer) or np.all(np.mod(durations, 1) == 0):
+        dtype = np.int64
+    else:
+        dtype = np.float64
+    release = np.zeros(len(durations)) if release is None else np.asarray(release)
+    return durations.astype(dtype), release.astype(dtype)
+
+
+def compute_cpm(graph, durations, release=None):
+    """
+    Метод критического пути над массивами.
+
+    durations и release (смещение начала задач без предшественников) заданы
+    в днях по кодам задач графа. Возвращает словарь массивов ES/EF/LS/LF/TF
+    и маску критических задач.
+    """
+    durations, release = _as_offsets(durations, release)
+
+    early_start, early_finish = _forward_pass(graph, durations, release)
+    project_end = early_finish.max() if graph.n else durations.dtype.type(0)
+    late_start, late_finish = _backward_pass(graph, durations, project_end)
+
+    total_float = late_start - early_start
+    return {
+        'early_start': early_start,
+        'early_finish': early_finish,
+        'late_start': late_start,
+        'late_finish': late_finish,
+        'total_float': total_float,
+        'free_float': _free_float(graph.src, graph.dst, early_start, early_finish, project_end),
+        'is_critical': np.isclose(total_float, 0),
+    }
+
+
+def _free_float(src, dst, early_start, early_finish, project_end):
+    """
+    Свободный резерв: на сколько задача может сдвинуться, не задержав ранний
+    старт ни одного последователя (у конечных задач — конец проекта).
+    """
+    free_float = (project_end - early_finish).astype(early_finish.dtype)
+    free_float[np.unique(src)] = _highest(early_finish.dtype)
+    np.minimum.at(free_float, src, early_start[dst] - early_finish[src])
+    return free_float
+
+
+def _cpm_inputs(df, graph, calendar=None):
+    """Длительности, начальные смещения (в рабочих днях) по кодам задач и дата отсчета"""
+    calendar = calendar or CALENDAR_DAYS
+    durations = graph.task_values(df['Duration'])
+    start_dates = graph.task_values(pd.to_datetime(df['Start']))
+    origin = calendar.origin(start_dates.min())
+    release = calendar.to_offsets(start_dates, origin)
+    return durations, release, origin
+
+
+def _assign_cpm_columns(df, graph, origin, cpm, calendar=None):
+    """Переводит смещения в даты и записывает все колонки CPM одним присваиванием"""
+    calendar = calendar or CALENDAR_DAYS
+    rows = graph.row_codes
+    early_start, late_start = cpm['early_start'][rows], cpm['late_start'][rows]
+    return df.assign(
+        Start=calendar.to_dates(early_start, origin),
+        End=calendar.to_finish_dates(cpm['early_finish'][rows], origin, early_start),
+        Late_Start=calendar.to_dates(late_start, origin),
+        Late_Finish=calendar.to_finish_dates(cpm['late_finish'][rows], origin, late_start),
+        Total_Float=cpm['total_float'][rows],
+        Free_Float=cpm['free_float'][rows],
+        Is_Critical=cpm['is_critical'][rows],
+    )
+
+
+def calculate_critical_path_with_dependencies(df, project=None, calendar=None):
+    """ПРАВИЛЬНЫЙ расчет критического пути с учетом зависимостей (calendar — WorkCalendar)"""
+    
+    if project is None:
+        project = ParsedProject.from_dataframe(df)
+    graph = project.graph
+    
+    durations, release, origin = _cpm_inputs(df, graph, calendar)
+    cpm = compute_cpm(graph, durations, release)
+    df = _assign_cpm_columns(df, graph, origin, cpm, calendar)
+    is_critical = cpm['is_critical']
+    
+    # Критический путь - задачи с нулевым резервом
+    critical_count = int(is_critical.sum())
+    if critical_count and get_verbosity() >= NORMAL:
+        paths = CriticalPaths(graph, cpm)
+        path_count = paths.count()
+        say(f"✅ Критический путь: {critical_count} задач, параллельных путей: {path_count:,}")
+        
+        # Первая из критических цепочек (остальные — CriticalPaths.paths())
+        chain = next(paths.paths(), [])
+        more = " → …" if len(chain) > MAX_PRINTED_ITEMS else ""
+        say(f"🔗 Цепочка: {' → '.join(map(str, chain[:MAX_PRINTED_ITEMS]))}{more}")
+    
+    return df
+
+# ========== КРИТИЧЕСКИЕ ПУТИ ==========
+
+class CriticalPaths:
+    """
+    Все критические и почти критические пути графа по результатам compute_cpm.
+
+    Критический путь идет от задачи без предшественников к конечной задаче
+    по «плотным» связям (ранний старт последователя равен раннему окончанию
+    предшественника) между задачами с нулевым резервом. Число таких путей
+    может расти экспоненциально, поэтому они считаются динамикой по
+    топологическому порядку, а перечисляются лениво — с полиномиальной
+    задержкой между соседними путями.
+    """
+
+    def __init__(self, graph, cpm):
+        self.graph = graph
+        self.cpm = cpm
+        early_start, early_finish = cpm['early_start'], cpm['early_finish']
+        critical = cpm['is_critical']
+        src, dst = graph.src, graph.dst
+        tight = critical[src] & critical[dst] & np.isclose(early_start[dst] - early_finish[src], 0)
+        self._succ_ptr, self._succ_idx = _build_csr(graph.n, src[tight], dst[tight])
+        self._pred_ptr, self._pred_idx = _build_csr(graph.n, dst[tight], src[tight])
+        self.starts = np.flatnonzero(critical & (graph.in_degree == 0))
+
+    def count(self):
+        """Число критических путей (целое Python без переполнения)"""
+        ptr, idx = self._pred_ptr.tolist(), self._pred_idx.tolist()
+        out_degree = np.diff(self._succ_ptr).tolist()
+        critical = self.cpm['is_critical']
+        order = self.graph.topological_order()
+        ways = {}
+        total = 0
+        for task in order[critical[order]].tolist():
+            lo, hi = ptr[task], ptr[task + 1]
+            ways[task] = sum([ways[p] for p in idx[lo:hi]]) if hi > lo else 1
+            if not out_degree[task]:
+                total += ways[task]
+        return total
+
+    def paths(self, limit=None):
+        """Лениво выдает критические пути (списки задач), не более limit"""
+        ptr, idx = self._succ_ptr.tolist(), self._succ_idx.tolist()
+        tasks = self.graph.tasks
+        produced = 0
+        for start in self.starts.tolist():
+            # Обход в глубину; у критической задачи всегда есть плотное продолжение
+            # до конца проекта, поэтому тупиков нет
+            path, cursors = [start], [ptr[start]]
+            while path:
+                task = path[-1]
+                if ptr[task] == ptr[task + 1]:
+                    yield list(tasks[path])
+                    produced += 1
+                    if limit is not None and produced >= limit:
+                        return
+                if cursors[-1] < ptr[task + 1]:
+                    succ = idx[cursors[-1]]
+                    cursors[-1] += 1
+                    path.append(succ)
+                    cursors.append(ptr[succ])
+                else:
+                    path.pop()
+                    cursors.pop()
+
+    def near_critical(self, k=10, max_float=None):
+        """
+        Лениво выдает до k путей (резерв, задачи) в порядке роста резерва.
+
+        Резерв пути — насколько цепочка короче проекта: конец проекта минус
+        окончание последней задачи, если бы задачи пути шли строго одна за
+        другой. Частичные пути раскрываются по точной оценке LF - окончание
+        цепочки, поэтому каждый следующий путь находится за O(длина × степень).
+        """
+        graph = self.graph
+        ptr, idx = graph.succ_ptr.tolist(), graph.succ_idx.tolist()
+        duration = (self.cpm['early_finish'] - self.cpm['early_start']).tolist()
+        late_finish = self.cpm['late_finish'].tolist()
+        early_finish = self.cpm['early_finish'].tolist()
+        # При равном резерве сначала раскрывается последний добавленный путь (обход в глубину)
+        counter = itertools.count(0, -1)
+
+        heap = []
+        for source in np.flatnonzero(graph.in_degree == 0).tolist():
+            slack = late_finish[source] - early_finish[source]
+            if max_float is None or slack <= max_float:
+                heap.append((slack, next(counter), source, early_finish[source], (source, None)))
+        heapq.heapify(heap)
+
+        produced = 0
+        while heap and produced < k:
+            slack, _, task, finish, link = heapq.heappop(heap)
+            if ptr[task] == ptr[task + 1]:
+                path = []
+                while link is not None:
+                    path.append(link[0])
+                    link = link[1]
+                yield slack, list(graph.tasks[path[::-1]])
+                produced += 1
+                continue
+            for succ in idx[ptr[task]:ptr[task + 1]]:
+                succ_finish = finish + duration[succ]
+                succ_slack = late_finish[succ] - succ_finish
+                if max_float is None or succ_slack <= max_float:
+                    heapq.heappush(heap, (succ_slack, next(counter), succ, succ_finish, (succ, link)))
+
+
+def find_critical_paths(df, project=None, calendar=None):
+    """CriticalPaths для расписания из DataFrame (те же входы, что у CPM)"""
+    if project is None:
+        project = ParsedProject.from_dataframe(df)
+    graph = project.graph
+    durations, release, _ = _cpm_inputs(df, graph, calendar)
+    return CriticalPaths(graph, compute_cpm(graph, durations, release))
+
+# ========== ИНКРЕМЕНТАЛЬНЫЙ ПЕРЕСЧЕТ («ЧТО ЕСЛИ») ==========
+
+class IncrementalSchedule:
+    """
+    Расписание с инкрементальным пересчетом после правок «что если».
+
+    Хранит ранние начала (ES) и «хвосты» задач — длину самой длинной цепочки
+    от окончания задачи до конца проекта. Поздние сроки выражаются через них:
+    LF = конец проекта - хвост. Поэтому правка длительности или зависимости
+    пересчитывает ES только в нисходящем конусе задачи, а хвосты — только
+    в восходящем, даже если меняется дата окончания проекта.
+    """
+
+    def __init__(self, df, project=None, calendar=None):
+        if project is None:
+            project = ParsedProject.from_dataframe(df)
+        graph = project.graph
+        self.graph = graph
+        self.df = df
+        self.calendar = calendar or CALENDAR_DAYS
+
+        durations, release, self.origin = _cpm_inputs(df, graph, self.calendar)
+        durations, release = _as_offsets(durations, release)
+        cpm = compute_cpm(graph, durations, release)
+        project_end = cpm['early_finish'].max() if graph.n else 0
+
+        # Скалярное состояние в списках Python: правки затрагивают единицы задач
+        self.duration = durations.tolist()
+        self.release = release.tolist()
+        self.early_start = cpm['early_start'].tolist()
+        self.tail = (project_end - cpm['late_finish']).tolist()
+        self.preds = [graph.pred_idx[graph.pred_ptr[i]:graph.pred_ptr[i + 1]].tolist() for i in range(graph.n)]
+        self.succs = [graph.succ_idx[graph.succ_ptr[i]:graph.succ_ptr[i + 1]].tolist() for i in range(graph.n)]
+        # Позиция в топологическом порядке; поддерживается при добавлении рёбер
+        self.rank = graph.layering().rank.tolist()
+        self._snapshot = self._derived()
+
+    def _code(self, task):
+        try:
+            return self.graph.tasks.get_loc(task)
+        except KeyError:
+            raise KeyError(f"Задача не найдена: '{task}'") from None
+
+    # ----- правки -----
+
+    def set_duration(self, task, duration):
+        """Меняет длительность задачи и возвращает сводку изменений"""
+        if not duration > 0:
+            raise ValueError(f"Длительность должна быть положительной: {duration}")
+        code = self._code(task)
+        self.duration[code] = duration
+        early = self._propagate_forward([code], force=True)
+        self._propagate_backward(self.preds[code])
+        return self._changes(early | {code})
+
+    def add_dependency(self, task, dependency):
+        """Добавляет зависимость task ← dependency; цикл вызывает ValueError"""
+        code, dep = self._code(task), self._code(dependency)
+        if dep in self.preds[code]:
+            return self._changes(set())
+        if dep == code:
+            raise ValueError(f"Самозависимость: '{task}'")
+        if self.rank[dep] > self.rank[code]:
+            self._reorder(dep, code)
+        self.preds[code].append(dep)
+        self.succs[dep].append(code)
+        early = self._propagate_forward([code])
+        self._propagate_backward([dep])
+        return self._changes(early)
+
+    def remove_dependency(self, task, dependency):
+        """Удаляет зависимость task ← dependency"""
+        code, dep = self._code(task), self._code(dependency)
+        if dep not in self.preds[code]:
+            raise KeyError(f"У задачи '{task}' нет зависимости '{dependency}'")
+        self.preds[code].remove(dep)
+        self.succs[dep].remove(code)
+        early = self._propagate_forward([code])
+        self._propagate_backward([dep])
+        return self._changes(early)
+
+    # ----- распространение -----
+
+    def _propagate_forward(self, seeds, force=False):
+        """Пересчитывает ES в нисходящем конусе seeds в топологическом порядке"""
+        heap = [(self.rank[code], code) for code in seeds]
+        heapq.heapify(heap)
+        queued = set(seeds)
+        changed = set()
+
+        while heap:
+            _, code = heapq.heappop(heap)
+            preds = self.preds[code]
+            if preds:
+                start = max([self.early_start[p] + self.duration[p] for p in preds])
+            else:
+                start = self.release[code]
+
+            if start != self.early_start[code]:
+                self.early_start[code] = start
+                changed.add(code)
+            elif not (force and code in seeds):
+                continue
+
+            for succ in self.succs[code]:
+                if succ not in queued:
+                    queued.add(succ)
+                    heapq.heappush(heap, (self.rank[succ], succ))
+
+        return changed
+
+    def _propagate_backward(self, seeds):
+        """Пересчитывает хвосты в восходящем конусе seeds в обратном топологическом порядке"""
+        heap = [(-self.rank[code], code) for code in seeds]
+        heapq.heapify(heap)
+        queued = set(seeds)
+
+        while heap:
+            _, code = heapq.heappop(heap)
+            succs = self.succs[code]
+            tail = max([self.tail[s] + self.duration[s] for s in succs]) if succs else 0
+            if tail == self.tail[code]:
+                continue
+            self.tail[code] = tail
+            for pred in self.preds[code]:
+                if pred not in queued:
+                    queued.add(pred)
+                    heapq.heappush(heap, (-self.rank[pred], pred))
+
+    def _reorder(self, source, target):
+        """
+        Локальное восстановление топологического порядка (алгоритм Пирса–Келли)
+        перед добавлением ребра source → target при rank[source] > rank[target].
+        """
+        lower, upper = self.rank[target], self.rank[source]
+
+        forward, stack = {target}, [target]
+        while stack:
+            for succ in self.succs[stack.pop()]:
+                if succ == source:
+                    raise ValueError("Зависимость создает цикл")
+                if succ not in forward and self.rank[succ] <= upper:
+                    forward.add(succ)
+                    stack.append(succ)
+
+        backward, stack = {source}, [source]
+        while stack:
+            for pred in self.preds[stack.pop()]:
+                if pred not in backward and self.rank[pred] >= lower:
+                    backward.add(pred)
+                    stack.append(pred)
+
+        # Те же позиции, но сначала вся «обратная» область, затем «прямая»
+        moved = sorted(backward, key=self.rank.__getitem__) + sorted(forward, key=self.rank.__getitem__)
+        slots = sorted(self.rank[code] for code in moved)
+        for code, slot in zip(moved, slots):
+            self.rank[code] = slot
+
+    # ----- результаты -----
+
+    def _derived(self):
+        """Векторный расчет ES/EF/LS/LF/TF по текущему состоянию"""
+        early_start = np.asarray(self.early_start)
+        duration = np.asarray(self.duration)
+        early_finish = early_start + duration
+        project_end = early_finish.max() if len(early_finish) else 0
+        late_finish = project_end - np.asarray(self.tail)
+        late_start = late_finish - duration
+        total_float = late_start - early_start
+        return {
+            'early_start': early_start,
+            'early_finish': early_finish,
+            'late_start': late_start,
+            'late_finish': late_finish,
+            'total_float': total_float,
+            'is_critical': np.isclose(total_float, 0),
+            'project_end': project_end,
+        }
+
+    def _changes(self, early_changed):
+        """Сводка изменений относительно предыдущего состояния"""
+        before, after = self._snapshot, self._derived()
+        self._snapshot = after
+        tasks = self.graph.tasks
+        late_changed = np.flatnonzero(~np.isclose(before['late_start'], after['late_start']))
+        critical_changed = np.flatnonzero(before['is_critical'] != after['is_critical'])
+        return {
+            'early_changed': tasks[sorted(early_changed)],
+            'late_changed': tasks[late_changed],
+            'critical_changed': tasks[critical_changed],
+            'project_end': self.calendar.to_finish_dates([after['project_end']], self.origin)[0],
+        }
+
+    def to_dataframe(self):
+        """Текущее расписание в формате calculate_critical_path_with_dependencies"""
+        df = self.df.copy()
+        rows = self.graph.row_codes
+        df['Duration'] = np.asarray(self.duration)[rows]
+        cpm = self._snapshot
+        # Связи меняются правками, поэтому свободный резерв считается по текущим спискам
+        src = np.repeat(np.arange(self.graph.n), [len(succs) for succs in self.succs])
+        dst = np.fromiter(itertools.chain.from_iterable(self.succs), dtype=np.int64, count=len(src))
+        free_float = _free_float(src, dst, cpm['early_start'], cpm['early_finish'], cpm['project_end'])
+        return _assign_cpm_columns(df, self.graph, self.origin, dict(cpm, free_float=free_float), self.calendar)
+
+# ========== АНАЛИЗ РИСКОВ (МОНТЕ-КАРЛО / PERT) ==========
+
+# Элементов в одной матрице (задачи × прогоны) на пакет: ограничивает память
+_RISK_BATCH_ELEMENTS = 2 ** 22
+
+
+def _reduce_plan(graph, key_nodes, value_nodes):
+    """
+    План групповых редукций по фронтам: для каждого фронта — задачи-цели,
+    отсортированные значения рёбер и границы групп для ufunc.reduceat.
+    """
+    layering = graph.layering()
+    edge_level = layering.level[key_nodes]
+    edge_order = np.lexsort((key_nodes, edge_level))
+    keys, values = key_nodes[edge_order], value_nodes[edge_order]
+    edge_ptr = np.searchsorted(edge_level[edge_order], np.arange(layering.n_levels + 1))
+
+    plan = []
+    for level in range(layering.n_levels):
+        lo, hi = edge_ptr[level], edge_ptr[level + 1]
+        targets, starts = np.unique(keys[lo:hi], return_index=True)
+        plan.append((layering.tasks_at(level), targets, values[lo:hi], starts))
+    return plan
+
+
+def _pert_samples(rng, optimistic, most_likely, pessimistic, n_samples):
+    """Выборка длительностей из бета-распределения PERT, матрица (задачи × прогоны)"""
+    width = pessimistic - optimistic
+    fixed = width <= 0
+    safe_width = np.where(fixed, 1.0, width)
+    alpha = 1 + 4 * (most_likely - optimistic) / safe_width
+    beta = 1 + 4 * (pessimistic - most_likely) / safe_width
+    samples = rng.beta(alpha[:, None], beta[:, None], size=(len(width), n_samples))
+    samples *= np.where(fixed, 0.0, width)[:, None]
+    samples += optimistic[:, None]
+    return samples
+
+
+def _simulate_batch(forward_plan, backward_plan, estimates, release, n_samples, seed):
+    """Один пакет прогонов: прямой и обратный проход по фронтам над матрицей длительностей"""
+    rng = np.random.default_rng(seed)
+    duration = _pert_samples(rng, *estimates, n_samples)
+
+    early_start = np.repeat(release[:, None], n_samples, axis=1)
+    for tasks, targets, preds, starts in forward_plan:
+        if targets.size:
+            early_finish = early_start[preds] + duration[preds]
+            early_start[targets] = np.maximum.reduceat(early_finish, starts, axis=0)
+
+    project_end = (early_start + duration).max(axis=0)
+
+    late_finish = np.repeat(project_end[None, :], len(release), axis=0)
+    for tasks, targets, succs, starts in reversed(backward_plan):
+        if targets.size:
+            late_start = late_finish[succs] - duration[succs]
+            late_finish[targets] = np.minimum.reduceat(late_start, starts, axis=0)
+
+    slack = late_finish - duration - early_start
+    critical = np.abs(slack) <= 1e-9 * np.maximum(project_end, 1.0)
+    return project_end, critical.sum(axis=1)
+
+
+_risk_context = None
+
+
+def _init_risk_worker(context):
+    global _risk_context
+    _risk_context = context
+
+
+def _simulate_pooled(n_samples, seed):
+    return _simulate_batch(*_risk_context, n_samples, seed)
+
+
+def simulate_schedule_risk(df, project=None, n_samples=10000, percentiles=(10, 50, 80, 90),
+                           n_workers=None, seed=None, calendar=None):
+    """
+    Анализ рисков расписания методом Монте-Карло по трехточечным оценкам PERT.
+
+    Использует колонки Optimistic / MostLikely / Pessimistic (недостающие
+    оценки заменяются на Duration). Прогоны считаются пакетами матриц
+    (задачи × прогоны); при n_workers > 1 пакеты распределяются по пулу
+    процессов. Возвращает словарь: длительности проекта по прогонам,
+    даты окончания по перцентилям и индекс критичности каждой задачи.
+    """
+    if project is None:
+        project = ParsedProject.from_dataframe(df)
+    graph = project.graph
+
+    calendar = calendar or CALENDAR_DAYS
+    base_duration, release, origin = _cpm_inputs(df, graph, calendar)
+    base_duration = base_duration.astype(np.float64)
+    estimate = lambda column: (graph.task_values(pd.to_numeric(df[column], errors='coerce'))
+                               if column in df.columns else np.full(graph.n, np.nan))
+    most_likely = np.where(np.isnan(estimate('MostLikely')), base_duration, estimate('MostLikely'))
+    optimistic = np.fmin(np.where(np.isnan(estimate('Optimistic')), most_likely, estimate('Optimistic')), most_likely)
+    pessimistic = np.fmax(np.where(np.isnan(estimate('Pessimistic')), most_likely, estimate('Pessimistic')), most_likely)
+    estimates = (optimistic, most_likely, pessimistic)
+    release = release.astype(np.float64)
+
+    forward_plan = _reduce_plan(graph, graph.dst, graph.src)
+    backward_plan = _reduce_plan(graph, graph.src, graph.dst)
+
+    batch_size = max(1, min(n_samples, _RISK_BATCH_ELEMENTS // max(graph.n, 1)))
+    sizes = [batch_size] * (n_samples // batch_size)
+    if n_samples % batch_size:
+        sizes.append(n_samples % batch_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    context = (forward_plan, backward_plan, estimates, release)
+
+    if n_workers and n_workers > 1 and len(sizes) > 1:
+        # Пул импортируется только когда нужен: ядро остается легким для скриптов
+        from concurrent.futures import ProcessPoolExecutor
+        
+        # План и оценки передаются в процесс один раз, в задачах — только размер и seed
+        with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_risk_worker,
+                                 initargs=(context,)) as pool:
+            results = list(pool.map(_simulate_pooled, sizes, seeds))
+    else:
+        results = [_simulate_batch(*context, size, batch_seed) for size, batch_seed in zip(sizes, seeds)]
+
+    completion = np.concatenate([project_end for project_end, _ in results])
+    critical_counts = sum(counts for _, counts in results)
+
+    completion_dates = pd.Series(
+        calendar.to_finish_dates(np.percentile(completion, percentiles), origin),
+        index=pd.Index(percentiles, name='Percentile'), name='Completion'
+    )
+    criticality = pd.Series(critical_counts / n_samples, index=graph.tasks, name='Criticality')
+
+    say(f"🎲 Монте-Карло: {n_samples} прогонов, {graph.n} задач")
+    for percentile, date in completion_dates.items():
+        say(f"   • P{percentile}: {date.strftime('%d.%m.%Y')}")
+
+    return {
+        'completion_days': completion,
+        'completion_dates': completion_dates,
+        'criticality': criticality,
+    }
+
+# ========== РЕСУРСНОЕ ВЫРАВНИВАНИЕ ==========
+
+def _priority_total_float(df, graph, cpm):
+    """Меньший полный резерв — раньше"""
+    return cpm['total_float']
+
+
+def _priority_column(df, graph, cpm):
+    """Больший приоритет из колонки Priority — раньше"""
+    if 'Priority' not in df.columns:
+        return np.zeros(graph.n)
+    priority = graph.task_values(pd.to_numeric(df['Priority'], errors='coerce'))
+    return -np.nan_to_num(priority.astype(np.float64), nan=-np.inf)
+
+
+def _priority_longest_path(df, graph, cpm):
+    """Более длинный оставшийся путь до конца проекта — раньше"""
+    return cpm['late_start'] - cpm['early_finish'].max()
+
+
+PRIORITY_RULES = {
+    'total_float': _priority_total_float,
+    'priority': _priority_column,
+    'longest_path': _priority_longest_path,
+}
+
+
+class _CapacityProfile:
+    """Ступенчатая функция доступных ресурсов во времени (смещения в рабочих днях)"""
+
+    def __init__(self, capacity, origin, calendar=CALENDAR_DAYS):
+        if isinstance(capacity, pd.Series):
+            capacity = capacity.sort_index()
+            index = capacity.index
+            if isinstance(index, pd.DatetimeIndex):
+                offsets = calendar.to_offsets(index, origin)
+            else:
+                offsets = np.asarray(index, dtype=np.float64)
+            self.times = [-np.inf] + list(offsets[1:])
+            self.values = capacity.astype(np.float64).tolist()
+        else:
+            self.times = [-np.inf]
+            self.values = [float(capacity)]
+        self.maximum = max(self.values)
+
+    def minimum(self, start, end):
+        """Минимальная доступная мощность на интервале [start, end)"""
+        lo = bisect.bisect_right(self.times, start) - 1
+        hi = max(bisect.bisect_left(self.times, end), lo + 1)
+        return min(self.values[lo:hi])
+
+    def next_change(self, time):
+        """Ближайший момент изменения мощности после time (или None)"""
+        pos = bisect.bisect_right(self.times, time)
+        return self.times[pos] if pos < len(self.times) else None
+
+
+# Пустой узел дерева потребностей: больше любого ключа (приоритет, раннее начало, код), код)
+_NO_TASK = ((np.inf, np.inf, np.inf), -1)
+
+
+class _DemandQueues:
+    """
+    Готовые задачи по величине потребности: куча на каждое значение Workers
+    и дерево отрезков над отсортированными значениями, где узел хранит лучший
+    (минимальный) ключ поддерева. Лучшая задача с потребностью не выше
+    заданной находится за O(log D), D — число разных потребностей.
+    """
+
+    def __init__(self, demand):
+        self.values = np.unique(demand).tolist()
+        self.leaf_of = np.searchsorted(self.values, demand).tolist()
+        self.size = 1 << max(len(self.values) - 1, 0).bit_length()
+        self.queues = [[] for _ in self.values]
+        self.tree = [_NO_TASK] * (2 * self.size)
+        self.blocked = []
+        self.count = 0
+
+    def __bool__(self):
+        return self.count > 0
+
+    def _set_leaf(self, leaf, entry):
+        node = leaf + self.size
+        self.tree[node] = entry
+        node //= 2
+        while node:
+            self.tree[node] = min(self.tree[2 * node], self.tree[2 * node + 1])
+            node //= 2
+
+    def push(self, entry, code):
+        leaf = self.leaf_of[code]
+        queue = self.queues[leaf]
+        heapq.heappush(queue, entry)
+        self.count += 1
+        if queue[0] is entry:
+            self._set_leaf(leaf, entry)
+
+    def pop(self, code):
+        leaf = self.leaf_of[code]
+        queue = self.queues[leaf]
+        heapq.heappop(queue)
+        self.count -= 1
+        self._set_leaf(leaf, queue[0] if queue else _NO_TASK)
+
+    def best(self, limit):
+        """Лучшая (ключ, код) среди куч с потребностью не выше limit, или None"""
+        lo, hi = self.size, bisect.bisect_right(self.values, limit) + self.size
+        best = _NO_TASK
+        while lo < hi:
+            if lo & 1:
+                best = min(best, self.tree[lo])
+                lo += 1
+            if hi & 1:
+                hi -= 1
+                best = min(best, self.tree[hi])
+            lo //= 2
+            hi //= 2
+        return None if best is _NO_TASK else best
+
+    def block(self, code):
+        """Временно скрывает кучу задачи (ее лучшей задаче не хватает мощности на интервале)"""
+        leaf = self.leaf_of[code]
+        self.blocked.append(leaf)
+        self._set_leaf(leaf, _NO_TASK)
+
+    def unblock(self):
+        for leaf in self.blocked:
+            queue = self.queues[leaf]
+            self._set_leaf(leaf, queue[0] if queue else _NO_TASK)
+        self.blocked.clear()
+
+
+def level_resources(df, capacity, project=None, priority='total_float', calendar=None):
+    """
+    Ресурсное выравнивание: расписание, в котором сумма Workers работающих
+    задач не превышает capacity.
+
+    capacity — число или pd.Series «дата (или смещение в днях) → мощность».
+    priority — имя правила из PRIORITY_RULES или функция (df, graph, cpm),
+    возвращающая ключи по кодам задач (меньший ключ — раньше).
+
+    Схема генерации — параллельная (parallel SGS), а не последовательная:
+    последовательная ставит задачи по одной в самый ранний момент, где
+    мощности хватает на всю длительность, и требует поиска свободного окна
+    в профиле загрузки, который при переменной мощности не укладывается
+    в O(n log n). Параллельная идет по событиям (завершение, готовность,
+    рост мощности) и в каждый момент запускает готовые задачи по приоритету;
+    расписание так же допустимо по ресурсам и связям и не содержит
+    искусственных простоев.
+
+    Готовые задачи лежат в кучах по величине потребности под деревом отрезков
+    (_DemandQueues): выбор следующей задачи — O(log D), D — число разных
+    потребностей, общий расчет при постоянной мощности — O(n log n). При
+    переменной мощности лучшая задача, которой не хватает мощности до своего
+    окончания, скрывает свою кучу до следующего события — каждая такая
+    проверка стоит еще O(log D).
+    """
+    if project is None:
+        project = ParsedProject.from_dataframe(df)
+    graph = project.graph
+
+    calendar = calendar or CALENDAR_DAYS
+    durations, release, origin = _cpm_inputs(df, graph, calendar)
+    durations, release = _as_offsets(durations, release)
+    cpm = compute_cpm(graph, durations, release)
+    rule = PRIORITY_RULES[priority] if isinstance(priority, str) else priority
+    keys = np.asarray(rule(df, graph, cpm), dtype=np.float64)
+
+    profile = _CapacityProfile(capacity, origin, calendar)
+    if 'Workers' in df.columns:
+        demand = np.nan_to_num(graph.task_values(pd.to_numeric(df['Workers'], errors='coerce')).astype(np.float64))
+    else:
+        demand = np.zeros(graph.n)
+    oversized = demand > profile.maximum
+    if oversized.any():
+        say(f"⚠️  Задач с потребностью больше мощности: {int(oversized.sum())} — выполняются на всей мощности")
+        demand = np.minimum(demand, profile.maximum)
+
+    demand, duration = demand.tolist(), durations.tolist()
+    order_key = list(zip(keys.tolist(), cpm['early_start'].tolist(), range(graph.n)))
+    succ_ptr, succ_idx = graph.succ_ptr.tolist(), graph.succ_idx.tolist()
+    waiting = graph.in_degree.tolist()
+    ready_at = release.tolist()
+
+    start = [0] * graph.n
+    finish = [0] * graph.n
+    pending = [(ready_at[code], code) for code in range(graph.n) if waiting[code] == 0]
+    heapq.heapify(pending)
+    ready = _DemandQueues(demand)
+    running = []
+    used = 0.0
+    done = 0
+    time = pending[0][0] if pending else 0
+
+    while done < graph.n:
+        # Завершаем задачи и освобождаем ресурсы
+        while running and running[0][0] <= time:
+            end, code = heapq.heappop(running)
+            used -= demand[code]
+            done += 1
+            for succ in succ_idx[succ_ptr[code]:succ_ptr[code + 1]]:
+                ready_at[succ] = max(ready_at[succ], end)
+                waiting[succ] -= 1
+                if waiting[succ] == 0:
+                    heapq.heappush(pending, (ready_at[succ], succ))
+
+        # Задачи, у которых завершены все предшественники, становятся готовыми
+        while pending and pending[0][0] <= time:
+            _, code = heapq.heappop(pending)
+            ready.push((order_key[code], code), code)
+
+        # Запускаем готовые задачи по приоритету, пока хватает ресурсов
+        while ready:
+            best = ready.best(profile.minimum(time, time) - used + 1e-9)
+            if best is None:
+                break
+            _, code = best
+            need = demand[code]
+            if used + need > profile.minimum(time, time + duration[code]) + 1e-9:
+                ready.block(code)
+                continue
+            ready.pop(code)
+            start[code], finish[code] = time, time + duration[code]
+            used += need
+            heapq.heappush(running, (finish[code], code))
+        ready.unblock()
+
+        # Следующее событие: завершение, готовность или рост мощности
+        events = []
+        if running:
+            events.append(running[0][0])
+        if pending:
+            events.append(pending[0][0])
+        if ready and profile.next_change(time) is not None:
+            events.append(profile.next_change(time))
+        if not events:
+            if done < graph.n:
+                raise ValueError("Недостаточно ресурсов: часть задач невозможно запланировать")
+            break
+        time = min(events)
+
+    start, finish = np.asarray(start), np.asarray(finish)
+    rows = graph.row_codes
+    delay = start - cpm['early_start']
+    leveled = df.assign(
+        Start=calendar.to_dates(start[rows], origin),
+        End=calendar.to_finish_dates(finish[rows], origin, start[rows]),
+        Resource_Delay=delay[rows],
+    )
+
+    say(f"👷 Ресурсное выравнивание: окончание {leveled['End'].max().strftime('%d.%m.%Y')}, "
+          f"сдвинуто задач: {int((delay > 0).sum())}")
+    return leveled
+
+# ========== ИЕРАРХИЯ РАБОТ (WBS) ==========
+
+# Уровни пути группы: "Этап 1/Фундамент"; коды вида 1.2.3 — тоже путь (1 → 1.2 → 1.2.3)
+WBS_SEPARATOR = '/'
+_OUTLINE_CODE = r'\d+(?:\.\d+)+'
+
+
+class WbsTree:
+    """
+    Дерево суммарных задач, построенное по колонке WBS.
+
+    В колонке — путь родительской группы задачи: имя ("Фундамент"), путь
+    через '/' ("Этап 1/Фундамент") или код структуры работ ("1.2"). Группы
+    не обязаны быть строками таблицы: каждый префикс пути — узел дерева.
+    Узлы нумеруются кодами; ancestors[строка, d] — код предка задачи
+    на глубине d (-1, если путь короче).
+    """
+
+    def __init__(self, paths):
+        # Разбор строк — только по различным путям, строки таблицы получают их коды
+        path_codes, paths = pd.factorize(pd.Series(paths).reset_index(drop=True), use_na_sentinel=False)
+        paths = pd.Series(paths, dtype=object)
+        if pd.api.types.is_numeric_dtype(paths.infer_objects()):
+            # Коды, прочитанные числами: 1.0 → "1", 2.1 → "2.1"
+            paths = paths.map(lambda value: f"{value:g}" if pd.notna(value) else '')
+        text = paths.where(paths.notna(), '').astype(str).str.strip()
+        outline = text.str.fullmatch(_OUTLINE_CODE).to_numpy(dtype=bool)
+        segments = text.where(~outline, text.str.replace('.', WBS_SEPARATOR, regex=False))
+        segments = segments.str.split(rf'\s*{re.escape(WBS_SEPARATOR)}\s*', regex=True)
+        path_depth = np.where(text == '', 0, segments.str.len()).astype(np.int64)
+        self.max_depth = int(path_depth.max()) if len(paths) else 0
+        
+        # Ключ узла — путь до него включительно; один factorize на все уровни
+        members, keys = [], []
+        for depth in range(self.max_depth):
+            has = np.flatnonzero(path_depth > depth)
+            members.append(has)
+            prefix = segments.iloc[has].str.slice(0, depth + 1).str.join(WBS_SEPARATOR)
+            # Код 1.2 остается кодом и в имени узла
+            keys.append(prefix.where(~outline[has], prefix.str.replace(WBS_SEPARATOR, '.', regex=False))
+                        .to_numpy(dtype=object))
+        codes, names = pd.factorize(np.concatenate(keys) if keys else np.empty(0, dtype=object))
+        
+        self.names = pd.Index(names)
+        self.n_nodes = len(self.names)
+        path_ancestors = np.full((len(paths), self.max_depth), -1, dtype=np.int64)
+        self.depth = np.empty(self.n_nodes, dtype=np.int64)
+        self.parent = np.full(self.n_nodes, -1, dtype=np.int64)
+        # Цепочка предков каждого узла (включая сам узел)
+        self.chains = np.full((self.n_nodes, self.max_depth), -1, dtype=np.int64)
+        offset = 0
+        for depth, has in enumerate(members):
+            node = codes[offset:offset + has.size]
+            offset += has.size
+            path_ancestors[has, depth] = node
+            self.depth[node] = depth
+            if depth:
+                self.parent[node] = path_ancestors[has, depth - 1]
+            self.chains[node, :depth + 1] = path_ancestors[has, :depth + 1]
+        
+        self.row_depth = path_depth[path_codes]
+        self.ancestors = path_ancestors[path_codes]
+        
+        # Подпись узла — последний уровень пути (код 1.2 — целиком)
+        self.labels = pd.Series(np.asarray(names, dtype=object)).str.rsplit(WBS_SEPARATOR, n=1).str[-1].to_numpy(dtype=object)
+    
+    @classmethod
+    def from_dataframe(cls, df):
+        """Дерево по колонке WBS; без нее — дерево без узлов"""
+        return cls(df['WBS'] if 'WBS' in df.columns else pd.Series('', index=df.index))
+
+
+def rollup_wbs(df, tree=None):
+    """
+    Суммарные задачи: начало — самое раннее у потомков, окончание — самое
+    позднее, критическая — если критичен хотя бы один потомок, резерв —
+    минимальный. Все уровни считаются одной группировкой пар (задача, предок).
+    """
+    tree = tree or WbsTree.from_dataframe(df)
+    rows, depths = np.nonzero(tree.ancestors >= 0)
+    pairs = pd.DataFrame({
+        'node': tree.ancestors[rows, depths],
+        'Start': df['Start'].to_numpy()[rows],
+        'End': df['End'].to_numpy()[rows],
+        'Is_Critical': df['Is_Critical'].to_numpy(dtype=bool)[rows],
+    })
+    if 'Total_Float' in df.columns:
+        pairs['Total_Float'] = df['Total_Float'].to_numpy()[rows]
+    
+    agg = {'Start': 'min', 'End': 'max', 'Is_Critical': 'any'}
+    if 'Total_Float' in pairs.columns:
+        agg['Total_Float'] = 'min'
+    grouped = pairs.groupby('node', sort=True)
+    summary = grouped.agg(agg).reindex(np.arange(tree.n_nodes))
+    summary.insert(0, 'Task', tree.labels)
+    summary.insert(1, 'WBS', np.where(tree.parent >= 0, tree.names.to_numpy()[np.maximum(tree.parent, 0)], ''))
+    summary['Duration'] = (summary['End'] - summary['Start']) / pd.Timedelta(days=1)
+    summary['Tasks'] = grouped.size().reindex(np.arange(tree.n_nodes)).to_numpy()
+    summary['Level'] = tree.depth + 1
+    summary['Is_Summary'] = True
+    return summary.reset_index(drop=True)
+
+
+def wbs_outline(df, level=1, tree=None, indent='   '):
+    """
+    Иерархическое представление для отрисовки: суммарные задачи до глубины
+    level и отдельные задачи, лежащие не глубже нее. Суммарные задачи
+    уровня level свернуты — размер результата зависит от выбранного уровня,
+    а не от общего числа задач. Строки идут в порядке структуры: группа,
+    затем ее содержимое по дате начала; названия сдвинуты по уровню.
+    """
+    if level < 1:
+        raise ValueError(f"Уровень WBS должен быть не меньше 1: {level}")
+    tree = tree or WbsTree.from_dataframe(df)
+    summary = rollup_wbs(df, tree)
+    
+    nodes = np.flatnonzero(tree.depth < level)
+    rows = np.flatnonzero(tree.row_depth < level)
+    width = min(level, tree.max_depth + 1)
+    
+    # Цепочка «предок или сам элемент» по уровням: у отдельных задач — собственный код после узлов
+    chains = np.full((nodes.size + rows.size, width), -1, dtype=np.int64)
+    depth_cols = min(width, tree.max_depth)
+    chains[:nodes.size, :depth_cols] = tree.chains[nodes, :depth_cols]
+    chains[nodes.size:, :depth_cols] = tree.ancestors[rows, :depth_cols]
+    chains[nodes.size + np.arange(rows.size), tree.row_depth[rows]] = tree.n_nodes + rows
+    
+    # Внутри группы — по началу, затем по коду; группа раньше своего содержимого (-inf)
+    starts = np.concatenate([summary['Start'].to_numpy(dtype='datetime64[ns]'),
+                             pd.to_datetime(df['Start']).to_numpy(dtype='datetime64[ns]')]).view(np.int64)
+    keys = []
+    for column in range(width - 1, -1, -1):
+        uid = chains[:, column]
+        keys += [uid, np.where(uid >= 0, starts[np.maximum(uid, 0)], np.iinfo(np.int64).min)]
+    order = np.lexsort(keys)
+    
+    collapsed = tree.depth[nodes] + 1 == level
+    summary_rows = summary.iloc[nodes].assign(
+        Task=[indent * depth + ('▸ ' if fold else '▾ ') + str(label)
+              for depth, fold, label in zip(tree.depth[nodes], collapsed, summary['Task'].to_numpy()[nodes])],
+    )
+    task_rows = df.iloc[rows].assign(
+        Task=[indent * depth + str(task) for depth, task in zip(tree.row_depth[rows], df['Task'].to_numpy()[rows])],
+        Level=tree.row_depth[rows] + 1,
+        Is_Summary=False,
+    )
+    outline = pd.concat([summary_rows, task_rows], ignore_index=True)
+    return outline.iloc[order].reset_index(drop=True)
+
+def print_detailed_analysis(df):
+    """Детальный анализ проекта"""
+    if get_verbosity() < NORMAL:
+        return
+    
+    critical_tasks = df[df['Is_Critical']]
+    total_duration = (df['End'].max() - df['Start'].min()).days
+    
+    say("\n" + "="*50)
+    say("📊 АНАЛИЗ ПРОЕКТА")
+    say("="*50)
+    
+    say(f"Всего задач: {len(df)}")
+    say(f"Критических задач: {len(critical_tasks)}")
+    say(f"Общая длительность: {total_duration} дней")
+    say(f"Период: {df['Start'].min().strftime('%d.%m.%Y')} - {df['End'].max().strftime('%d.%m.%Y')}")
+    
+    say("\n🔴 КРИТИЧЕСКИЕ ЗАДАЧИ:")
+    if len(critical_tasks) > 0:
+        for task in critical_tasks.head(MAX_PRINTED_ITEMS).itertuples():
+            deps_info = f" ← {task.Dependencies}" if hasattr(task, 'Dependencies') and pd.notna(task.Dependencies) else ""
+            workers_info = f" [{task.Workers}ч]" if hasattr(task, 'Workers') else ""
+            say(f"   • {task.Task} - {task.Duration} дней{workers_info}{deps_info}")
+        if len(critical_tasks) > MAX_PRINTED_ITEMS:
+            say(f"   … и ещё {len(critical_tasks) - MAX_PRINTED_ITEMS}")
+
+# ========== ЗАГРУЗКА ФАЙЛОВ ПРОЕКТА ==========
+
+# Строк в выборке для определения структуры и строк в одном куске CSV
+INGEST_SAMPLE_ROWS = 1000
+INGEST_CHUNK_ROWS = 250_000
+# Колонки, которые нужны этапам после валидации, хотя маппер их не определяет
+INGEST_EXTRA_COLUMNS = ('Priority',)
+# Текстовые поля читаются строками явно, чтобы pandas не гадал тип
+_TEXT_FIELDS = ('Dependencies', 'Start', 'WBS')
+_ARROW_SUFFIXES = ('.feather', '.arrow', '.ipc')
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError("Для Parquet/Arrow файлов нужен pyarrow: pip install pyarrow") from e
+    return pyarrow
+
+
+def _excel_engine():
+    """
+    Движок чтения .xlsx: python-calamine (разбор на Rust, в разы быстрее),
+    иначе openpyxl в режиме read-only — оба читают лист построчно.
+    """
+    if importlib.util.find_spec('python_calamine') is not None:
+        return 'calamine'
+    if importlib.util.find_spec('openpyxl') is None:
+        raise ImportError("Для Excel файлов нужен python-calamine или openpyxl: pip install python-calamine")
+    return 'openpyxl'
+
+
+def _excel_source(source):
+    """Путь или байты книги: файловый объект читается один раз (байты передаются в рабочие процессы)"""
+    if hasattr(source, 'read'):
+        _rewind(source)
+        return source.read()
+    return source
+
+
+@contextlib.contextmanager
+def _open_workbook(source):
+    """Книга без загрузки дерева объектов: (имена листов, функция «лист → итератор строк»)"""
+    if _excel_engine() == 'calamine':
+        from python_calamine import CalamineWorkbook
+        workbook = (CalamineWorkbook.from_filelike(BytesIO(source)) if isinstance(source, bytes)
+                    else CalamineWorkbook.from_path(source))
+        try:
+            yield list(workbook.sheet_names), lambda sheet: workbook.get_sheet_by_name(sheet).iter_rows()
+        finally:
+            workbook.close()
+    else:
+        import openpyxl
+        workbook = openpyxl.load_workbook(BytesIO(source) if isinstance(source, bytes) else source,
+                                          read_only=True, data_only=True)
+        try:
+            yield list(workbook.sheetnames), lambda sheet: workbook[sheet].iter_rows(values_only=True)
+        finally:
+            workbook.close()
+
+
+def list_excel_sheets(source):
+    """Имена листов книги Excel по порядку"""
+    with _open_workbook(_excel_source(source)) as (names, _):
+        return names
+
+
+def select_sheets(names, sheets=None):
+    """
+    Отбирает листы: None — первый; число — номер листа; строка — имя или
+    шаблон (fnmatch, например 'Проект*'); re.Pattern — регулярное выражение;
+    список — объединение. Возвращает имена в порядке книги.
+    """
+    if sheets is None:
+        sheets = 0
+    patterns = sheets if isinstance(sheets, (list, tuple)) else [sheets]
+    selected = set()
+    for pattern in patterns:
+        if isinstance(pattern, int):
+            if not -len(names) <= pattern < len(names):
+                raise ValueError(f"В книге {len(names)} листов, нет листа с номером {pattern}")
+            selected.add(names[pattern])
+        elif isinstance(pattern, re.Pattern):
+            selected.update(name for name in names if pattern.search(name))
+        else:
+            selected.update(name for name in names if name == pattern or fnmatch.fnmatchcase(name, pattern))
+    if not selected:
+        raise ValueError(f"Не найдено листов по {sheets!r}; листы книги: {', '.join(names)}")
+    return [name for name in names if name in selected]
+
+
+def _read_excel_sheet(source, sheet, usecols='auto', sample_rows=INGEST_SAMPLE_ROWS):
+    """
+    Один лист в потоковом режиме: заголовок и первые sample_rows строк
+    определяют нужные колонки, остальные строки сразу урезаются до них.
+    """
+    with _open_workbook(source) as (_, sheet_rows):
+        rows = sheet_rows(sheet)
+        header = next(rows, ())
+        columns = [f"Unnamed: {i}" if name in (None, '') else str(name) for i, name in enumerate(header)]
+        sample_values = list(itertools.islice(rows, sample_rows))
+        sample = _excel_types(pd.DataFrame([_excel_picker(list(range(len(columns))))(row) for row in sample_values],
+                                           columns=columns))
+        
+        mapping = detect_ingest_columns(sample) if usecols == 'auto' and len(sample) else None
+        keep = ([i for i, column in enumerate(columns) if column in mapping.values()] if mapping
+                else list(range(len(columns))) if usecols in ('auto', None)
+                else [i for i, column in enumerate(columns) if column in usecols])
+        
+        pick = _excel_picker(keep)
+        data = [pick(row) for row in sample_values]
+        data.extend(map(pick, rows))
+    
+    df = _excel_types(pd.DataFrame(data, columns=[columns[i] for i in keep]))
+    if mapping:
+        # Как и в CSV: названия, зависимости и WBS — строками (числовые коды задач тоже)
+        for field in ('Task', 'Dependencies', 'WBS'):
+            column = mapping.get(field)
+            if column in df.columns:
+                df[column] = df[column].map(_excel_text)
+    return df
+
+
+def _excel_picker(keep):
+    """Функция «строка → нужные ячейки»; хвост строки короче заголовка — None"""
+    if not keep:
+        return lambda row: ()
+    getter, last = operator.itemgetter(*keep), max(keep)
+    if len(keep) == 1:
+        return lambda row: (getter(row),) if len(row) > last else (None,)
+    return lambda row: getter(row) if len(row) > last else tuple(row[i] if i < len(row) else None for i in keep)
+
+
+def _excel_types(df):
+    """
+    Типы колонок листа как у pandas: пустые строки ('' у calamine) — пропуски,
+    полностью пустые строки листа отбрасываются, целые числа, записанные
+    как float, — int64, даты — datetime64.
+    """
+    for column in df.columns:
+        if df[column].dtype == object or pd.api.types.is_string_dtype(df[column]):
+            df[column] = df[column].mask(df[column] == '')
+    df = df.dropna(how='all').reset_index(drop=True)
+    for column in df.columns:
+        values = df[column].infer_objects()
+        if values.dtype == object:
+            present = values.dropna()
+            if len(present) and present.map(lambda value: isinstance(value, datetime.date)).all():
+                values = pd.to_datetime(values)
+        if values.dtype == np.float64 and values.notna().all() and np.all(np.mod(values.to_numpy(), 1) == 0):
+            values = values.astype(np.int64)
+        df[column] = values
+    return df
+
+
+def _excel_text(value):
+    """Значение ячейки строкой: 12.0 → '12', пустая ячейка остается пустой"""
+    if isinstance(value, str):
+        return value
+    if pd.isna(value):
+        return None
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def read_excel_projects(source, sheets='*', usecols='auto', workers=None, sample_rows=INGEST_SAMPLE_ROWS):
+    """
+    Несколько листов книги — по проекту на лист: {имя листа: DataFrame}.
+    sheets — как в select_sheets (по умолчанию все листы). Листы читаются
+    параллельно в пуле процессов; каждый процесс читает свой лист потоком.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    
+    source = _excel_source(source)
+    names = select_sheets(list_excel_sheets(source), sheets)
+    workers = min(workers or os.cpu_count() or 1, len(names))
+    say(f"📗 ЛИСТОВ: {len(names)}, ПРОЦЕССОВ: {workers}")
+    if workers == 1:
+        frames = [_read_excel_sheet(source, name, usecols, sample_rows) for name in names]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            frames = list(executor.map(_read_excel_sheet, itertools.repeat(source), names,
+                                       itertools.repeat(usecols), itertools.repeat(sample_rows)))
+    return dict(zip(names, frames))
+
+
+def _read_sample(source, suffix, rows):
+    """Первые rows строк файла — для определения структуры"""
+    if suffix == '.csv':
+        return pd.read_csv(source, nrows=rows)
+    pa = _import_pyarrow()
+    if suffix == '.parquet':
+        parquet = pa.parquet.ParquetFile(source)
+        batch = next(parquet.iter_batches(batch_size=rows), None)
+        return (batch or parquet.schema_arrow.empty_table()).to_pandas()
+    reader = pa.ipc.open_file(pa.memory_map(source) if isinstance(source, str) else source)
+    if reader.num_record_batches == 0:
+        return reader.schema.empty_table().to_pandas()
+    return reader.get_batch(0).slice(0, rows).to_pandas()
+
+
+def _rewind(source):
+    if hasattr(source, 'seek'):
+        source.seek(0)
+
+
+def detect_ingest_columns(sample):
+    """
+    Определяет по выборке, какие колонки нужны: найденные маппером поля
+    и INGEST_EXTRA_COLUMNS. Возвращает {поле: колонка} или None.
+    """
+    with verbosity(QUIET):
+        field_mapping = SmartFieldMapper.detect_fields_with_logic(sample)
+    if not field_mapping:
+        return None
+    
+    mapping = {field: column for field, column in field_mapping.items() if column}
+    extras = {str(name).lower() for name in INGEST_EXTRA_COLUMNS}
+    for column in sample.columns:
+        if str(column).lower() in extras and column not in mapping.values():
+            mapping[str(column)] = column
+    return mapping
+
+
+def _read_csv_typed(source, usecols, mapping, chunk_rows):
+    """CSV по кускам: только нужные колонки, текстовые поля — явно строками"""
+    dtypes = {mapping[field]: 'str' for field in ('Task',) + _TEXT_FIELDS if field in mapping}
+    chunks = pd.read_csv(source, usecols=usecols, dtype=dtypes, chunksize=chunk_rows)
+    return pd.concat(chunks, ignore_index=True)
+
+
+def read_project_file(source, suffix=None, usecols='auto', chunk_rows=INGEST_CHUNK_ROWS,
+                      sample_rows=INGEST_SAMPLE_ROWS, sheet=None):
+    """
+    Загружает CSV, Excel, Parquet или Arrow (Feather) файл проекта.
+
+    source — путь или файловый объект (тогда нужен suffix, например '.csv').
+    При usecols='auto' структура определяется по первым sample_rows строкам
+    и читаются только нужные колонки; CSV читается кусками по chunk_rows строк,
+    задачи, зависимости и даты — явно строками. usecols=None читает все колонки.
+    Книга .xlsx читается потоком (openpyxl, read-only); sheet — имя, шаблон
+    или номер листа (по умолчанию первый), несколько листов — read_excel_projects.
+    """
+    suffix = (suffix or os.path.splitext(str(source))[1]).lower()
+    if suffix in ('.xlsx', '.xlsm'):
+        source = _excel_source(source)
+        names = select_sheets(list_excel_sheets(source), sheet)
+        if len(names) > 1:
+            say(f"⚠️ Под {sheet!r} подходит листов: {len(names)}, читаю '{names[0]}' "
+                f"(все листы — read_excel_projects)")
+        return _read_excel_sheet(source, names[0], usecols, sample_rows)
+    if suffix == '.xls':
+        return pd.read_excel(source, sheet_name=sheet or 0)
+    if suffix not in ('.csv', '.parquet') + _ARROW_SUFFIXES:
+        raise ValueError(f"Неподдерживаемый формат файла: {source}")
+    
+    sample = _read_sample(source, suffix, sample_rows)
+    _rewind(source)
+    mapping = detect_ingest_columns(sample) if len(sample) else None
+    if mapping is None:
+        # Структура не распознана — читаем как есть, ошибки покажет валидация
+        if suffix == '.csv':
+            return pd.read_csv(source)
+        return pd.read_parquet(source) if suffix == '.parquet' else pd.read_feather(source)
+    
+    if usecols == 'auto':
+        usecols = [column for column in sample.columns if column in mapping.values()]
+    elif usecols is None:
+        usecols = list(sample.columns)
+    
+    if suffix == '.csv':
+        return _read_csv_typed(source, usecols, mapping, chunk_rows)
+    
+    if suffix == '.parquet':
+        return pd.read_parquet(source, columns=usecols)
+    return pd.read_feather(source, columns=usecols)
+
+# ========== РАСЧЕТ РАСПИСАНИЯ ==========
+
+def build_schedule(df, profile=None, calendar=None):
+    """
+    Валидация и расчет расписания без отрисовки.
+    Возвращает (df_with_critical, df_sorted, errors); при ошибках валидации
+    первые два элемента — None. profile — PipelineProfile для замеров этапов,
+    calendar — WorkCalendar (длительности в рабочих днях).
+    """
+    is_valid, errors, df_validated, inverse_mapping, project = validate_and_map_data(df, profile=profile, return_project=True)
+    
+    if not is_valid:
+        return None, None, errors
+    
+    say("🔄 РАСЧЕТ КРИТИЧЕСКОГО ПУТИ И ДАТ...")
+    
+    # Один разбор зависимостей и одна топологическая сортировка на все этапы
+    graph = project.graph
+    counts = {'rows': len(df_validated), 'edges': len(project.edge_rows)}
+    
+    # Правильно рассчитываем даты с учетом зависимостей
+    with timed_stage(profile, 'dates', **counts):
+        df_with_dates = calculate_realistic_dates(df_validated, project=project, calendar=calendar)
+    
+    # Рассчитываем критический путь
+    with timed_stage(profile, 'cpm', **counts):
+        df_with_critical = calculate_critical_path_with_dependencies(df_with_dates, project=project,
+                                                                     calendar=calendar)
+    
+    # Сортируем задачи по дате начала, при равенстве — в топологическом порядке
+    with timed_stage(profile, 'sort', rows=len(df_with_critical)):
+        topo_rank = graph.layering().rank[graph.row_codes]
+        df_sorted = df_with_critical.iloc[np.lexsort((topo_rank, df_with_critical['Start'].to_numpy()))]
+    
+    return df_with_critical, df_sorted, errors
@@ -0,0 +1,269 @@
+"""
+Автономный HTML-просмотрщик расписания.
+
+Один файл без внешних зависимостей и сети: расписание встроено компактным
+колоночным JSON (по массиву на поле, даты — смещениями в днях), а браузер
+рисует на canvas только видимые строки и видимый отрезок времени. Прокрутка
+виртуальная, масштаб — Ctrl + колесо или кнопками, поэтому и проект на
+100 тыс. задач открывается плавно, а PNG/PDF для него не нужны.
+"""
+import html
+import json
+
+import numpy as np
+import pandas as pd
+
+from gantt_core import say
+
+# ========== ДАННЫЕ ДЛЯ ПРОСМОТРЩИКА ==========
+
+def _day_offsets(values, origin):
+    """Смещения дат от origin в днях: целые, если дробной части нет"""
+    days = np.round((pd.to_datetime(values) - origin).to_numpy() / np.timedelta64(1, 'D'), 4)
+    if np.all(days == np.floor(days)):
+        return days.astype(np.int64).tolist()
+    return days.tolist()
+
+
+def schedule_payload(df_sorted):
+    """Колоночное представление расписания для просмотрщика (порядок строк — как в df_sorted)"""
+    origin = df_sorted['Start'].min().normalize() if len(df_sorted) else pd.Timestamp.today().normalize()
+    critical = df_sorted['Is_Critical'].to_numpy(dtype=bool)
+    payload = {
+        'origin': origin.strftime('%Y-%m-%d'),
+        'task': df_sorted['Task'].astype(str).tolist(),
+        'start': _day_offsets(df_sorted['Start'], origin),
+        'end': _day_offsets(df_sorted['End'], origin),
+        # Строка из 0/1 вдвое компактнее массива чисел
+        'critical': ''.join(np.where(critical, '1', '0').tolist()),
+    }
+    if 'Total_Float' in df_sorted.columns:
+        payload['float'] = np.round(df_sorted['Total_Float'].to_numpy(dtype=np.float64), 2).tolist()
+    if 'Workers' in df_sorted.columns:
+        payload['workers'] = pd.to_numeric(df_sorted['Workers'], errors='coerce').fillna(0).tolist()
+    if 'Dependencies' in df_sorted.columns:
+        payload['deps'] = df_sorted['Dependencies'].fillna('').astype(str).tolist()
+    return payload
+
+
+def export_html(df_sorted, html_path, title='Диаграмма Ганта'):
+    """Пишет автономный HTML-просмотрщик расписания и возвращает путь к нему"""
+    data = json.dumps(schedule_payload(df_sorted), ensure_ascii=False, separators=(',', ':'))
+    # Внутри <script> последовательность "</" закрыла бы тег
+    data = data.replace('</', '<\\/')
+    page = _TEMPLATE.replace('__TITLE__', html.escape(title)).replace('__DATA__', data)
+    with open(html_path, 'w', encoding='utf-8') as f:
+        f.write(page)
+    say(f"🌐 HTML просмотрщик сохранен: {html_path}")
+    return html_path
+
+# ========== ШАБЛОН СТРАНИЦЫ ==========
+
+_TEMPLATE = """<!DOCTYPE html>
+<html lang="ru">
+<head>
+<meta charset="utf-8">
+<title>__TITLE__</title>
+<style>
+  html, body { margin: 0; height: 100%; font: 13px system-ui, sans-serif; color: #2c3e50; }
+  body { display: flex; flex-direction: column; }
+  header { display: flex; gap: 12px; align-items: center; padding: 8px 12px;
+           background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; flex-wrap: wrap; }
+  header h1 { font-size: 16px; margin: 0 12px 0 0; }
+  header input[type=search] { padding: 3px 6px; width: 200px; }
+  header button { padding: 2px 10px; }
+  #stats { margin-left: auto; opacity: 0.9; }
+  #view { position: relative; flex: 1; overflow: hidden; }
+  #chart { position: absolute; left: 0; top: 0; pointer-events: none; }
+  #scroller { position: absolute; inset: 0; overflow: auto; }
+  #tip { position: fixed; display: none; background: rgba(44, 62, 80, 0.95); color: white; padding: 6px 8px;
+         border-radius: 4px; pointer-events: none; white-space: pre; font-size: 12px; z-index: 2; }
+</style>
+</head>
+<body>
+<header>
+  <h1>📊 __TITLE__</h1>
+  <input id="search" type="search" placeholder="Поиск задачи (Enter — следующая)">
+  <label><input id="onlyCritical" type="checkbox"> только критические</label>
+  <button id="zoomIn" title="Ctrl + колесо мыши">＋</button>
+  <button id="zoomOut">－</button>
+  <button id="fit">весь проект</button>
+  <span id="stats"></span>
+</header>
+<div id="view"><canvas id="chart"></canvas><div id="scroller"><div id="spacer"></div></div></div>
+<div id="tip"></div>
+<script type="application/json" id="gantt-data">__DATA__</script>
+<script>
+(function () {
+  'use strict';
+  const D = JSON.parse(document.getElementById('gantt-data').textContent);
+  const N = D.task.length, DAY = 86400000, ORIGIN = Date.parse(D.origin + 'T00:00:00Z');
+  const ROW = 22, HEAD = 34, NAMES = 220, PAD = 40;
+  const CRITICAL = 'rgba(231, 76, 60, 0.9)', NORMAL = 'rgba(52, 152, 219, 0.7)';
+  const TICK_STEPS = [1, 2, 7, 14, 30, 61, 91, 182, 365, 730, 1826];
+
+  const scroller = document.getElementById('scroller');
+  const spacer = document.getElementById('spacer'), canvas = document.getElementById('chart');
+  const tip = document.getElementById('tip'), ctx = canvas.getContext('2d');
+
+  let minDay = Infinity, maxDay = -Infinity, criticalCount = 0;
+  for (let k = 0; k < N; k++) {
+    if (D.start[k] < minDay) minDay = D.start[k];
+    if (D.end[k] > maxDay) maxDay = D.end[k];
+    if (D.critical.charCodeAt(k) === 49) criticalCount++;
+  }
+  if (!N) { minDay = 0; maxDay = 1; }
+  minDay -= 1; maxDay += 1;
+
+  // rows — индексы показываемых задач; виртуальная прокрутка идет по ним
+  let rows = new Int32Array(N).map((_, k) => k);
+  let pxPerDay = 1, highlight = -1, searchFrom = 0, pending = false;
+
+  const pad2 = (v) => String(v).padStart(2, '0');
+  function formatDate(days) {
+    const d = new Date(ORIGIN + days * DAY);
+    return pad2(d.getUTCDate()) + '.' + pad2(d.getUTCMonth() + 1) + '.' + d.getUTCFullYear();
+  }
+  const isCritical = (k) => D.critical.charCodeAt(k) === 49;
+  const duration = (k) => Math.round((D.end[k] - D.start[k]) * 100) / 100;
+
+  function layout() {
+    spacer.style.width = (NAMES + (maxDay - minDay) * pxPerDay + PAD) + 'px';
+    spacer.style.height = (HEAD + rows.length * ROW + PAD) + 'px';
+    schedule();
+  }
+
+  function fit() {
+    pxPerDay = Math.max((scroller.clientWidth - NAMES - PAD) / (maxDay - minDay), 0.01);
+    layout();
+    scroller.scrollLeft = 0;
+  }
+
+  function zoom(factor, anchorX) {
+    const x = anchorX === undefined ? (scroller.clientWidth - NAMES) / 2 : anchorX - NAMES;
+    const day = (scroller.scrollLeft + x) / pxPerDay;
+    pxPerDay = Math.min(Math.max(pxPerDay * factor, 0.01), 400);
+    layout();
+    scroller.scrollLeft = day * pxPerDay - x;
+  }
+
+  function schedule() {
+    if (!pending) { pending = true; requestAnimationFrame(draw); }
+  }
+
+  function draw() {
+    pending = false;
+    const w = scroller.clientWidth, h = scroller.clientHeight, dpr = window.devicePixelRatio || 1;
+    if (canvas.width !== Math.round(w * dpr) || canvas.height !== Math.round(h * dpr)) {
+      canvas.width = Math.round(w * dpr); canvas.height = Math.round(h * dpr);
+      canvas.style.width = w + 'px'; canvas.style.height = h + 'px';
+    }
+    ctx.setTransform(dpr, 0, 0, dpr, 0, 0);
+    ctx.clearRect(0, 0, w, h);
+    const sx = scroller.scrollLeft, sy = scroller.scrollTop;
+    const dayAt = (x) => minDay + (sx + x - NAMES) / pxPerDay;
+    const xOf = (day) => NAMES + (day - minDay) * pxPerDay - sx;
+
+    // Сетка и шкала времени: шаг делений не меньше 80 пикселей
+    const step = TICK_STEPS.find((s) => s * pxPerDay >= 80) || TICK_STEPS[TICK_STEPS.length - 1];
+    ctx.font = '11px system-ui, sans-serif';
+    ctx.textBaseline = 'middle';
+    for (let day = Math.ceil(dayAt(NAMES) / step) * step; day <= dayAt(w); day += step) {
+      const x = xOf(day);
+      ctx.fillStyle = '#ecf0f1'; ctx.fillRect(x, HEAD, 1, h - HEAD);
+      ctx.fillStyle = '#7f8c8d'; ctx.fillText(formatDate(day), x + 3, HEAD / 2);
+    }
+
+    // Только видимые строки
+    const first = Math.max(0, Math.floor(sy / ROW));
+    const last = Math.min(rows.length, Math.ceil((sy + h - HEAD) / ROW) + 1);
+    for (let i = first; i < last; i++) {
+      const k = rows[i], y = HEAD + i * ROW - sy;
+      if (k === highlight) { ctx.fillStyle = '#fff3cd'; ctx.fillRect(0, y, w, ROW); }
+      const x0 = Math.max(xOf(D.start[k]), NAMES), x1 = Math.min(xOf(D.end[k]), w);
+      if (x1 >= x0 && x1 >= NAMES) {
+        ctx.fillStyle = isCritical(k) ? CRITICAL : NORMAL;
+        ctx.fillRect(x0, y + 4, Math.max(x1 - x0, 1), ROW - 8);
+        const label = duration(k) + 'д';
+        if (x1 - x0 > ctx.measureText(label).width + 6) {
+          ctx.fillStyle = 'white'; ctx.fillText(label, x0 + 3, y + ROW / 2);
+        }
+      }
+    }
+
+    // Колонка названий и шапка поверх полос
+    ctx.fillStyle = '#f8f9fa'; ctx.fillRect(0, HEAD, NAMES, h - HEAD);
+    ctx.fillStyle = '#dfe6e9'; ctx.fillRect(NAMES - 1, 0, 1, h);
+    for (let i = first; i < last; i++) {
+      const k = rows[i], y = HEAD + i * ROW - sy;
+      if (y + ROW < HEAD) continue;
+      if (k === highlight) { ctx.fillStyle = '#fff3cd'; ctx.fillRect(0, y, NAMES - 1, ROW); }
+      ctx.fillStyle = isCritical(k) ? '#c0392b' : '#2c3e50';
+      let name = D.task[k];
+      while (name.length > 1 && ctx.measureText(name).width > NAMES - 12) name = name.slice(0, -2) + '…';
+      ctx.fillText(name, 6, y + ROW / 2);
+    }
+    ctx.fillStyle = 'white'; ctx.fillRect(0, 0, NAMES, HEAD);
+    ctx.fillStyle = '#2c3e50'; ctx.fillText('Задача', 6, HEAD / 2);
+    ctx.fillStyle = '#dfe6e9'; ctx.fillRect(0, HEAD - 1, w, 1);
+  }
+
+  function describe(k) {
+    const lines = [D.task[k] + (isCritical(k) ? '  ● критическая' : ''),
+                   'Начало: ' + formatDate(D.start[k]), 'Конец: ' + formatDate(D.end[k]),
+                   'Длительность: ' + duration(k) + ' дн.'];
+    if (D.float) lines.push('Резерв: ' + D.float[k] + ' дн.');
+    if (D.workers && D.workers[k]) lines.push('Рабочих: ' + D.workers[k]);
+    if (D.deps && D.deps[k]) lines.push('Зависит от: ' + (D.deps[k].length > 120 ? D.deps[k].slice(0, 119) + '…' : D.deps[k]));
+    return lines.join('\\n');
+  }
+
+  scroller.addEventListener('scroll', schedule, { passive: true });
+  window.addEventListener('resize', schedule);
+  scroller.addEventListener('wheel', (event) => {
+    if (!event.ctrlKey) return;
+    event.preventDefault();
+    zoom(event.deltaY < 0 ? 1.25 : 0.8, event.clientX - scroller.getBoundingClientRect().left);
+  }, { passive: false });
+  scroller.addEventListener('mousemove', (event) => {
+    const rect = scroller.getBoundingClientRect(), y = event.clientY - rect.top;
+    const i = Math.floor((y - HEAD + scroller.scrollTop) / ROW);
+    if (y < HEAD || i < 0 || i >= rows.length) { tip.style.display = 'none'; return; }
+    tip.textContent = describe(rows[i]);
+    tip.style.left = (event.clientX + 14) + 'px'; tip.style.top = (event.clientY + 14) + 'px';
+    tip.style.display = 'block';
+  });
+  scroller.addEventListener('mouseleave', () => { tip.style.display = 'none'; });
+
+  document.getElementById('zoomIn').onclick = () => zoom(1.5);
+  document.getElementById('zoomOut').onclick = () => zoom(1 / 1.5);
+  document.getElementById('fit').onclick = fit;
+  document.getElementById('onlyCritical').onchange = (event) => {
+    const all = new Int32Array(N).map((_, k) => k);
+    rows = event.target.checked ? all.filter(isCritical) : all;
+    searchFrom = 0;
+    layout();
+  };
+  document.getElementById('search').addEventListener('keydown', (event) => {
+    if (event.key !== 'Enter' || !event.target.value) return;
+    const query = event.target.value.toLowerCase();
+    for (let step = 0; step < rows.length; step++) {
+      const i = (searchFrom + step) % rows.length, k = rows[i];
+      if (D.task[k].toLowerCase().includes(query)) {
+        highlight = k; searchFrom = i + 1;
+        scroller.scrollTop = Math.max(i * ROW - scroller.clientHeight / 3, 0);
+        scroller.scrollLeft = Math.max((D.start[k] - minDay) * pxPerDay - 40, 0);
+        schedule();
+        return;
+      }
+    }
+  });
+
+  document.getElementById('stats').textContent = N.toLocaleString('ru-RU') + ' задач · критических: ' +
+    criticalCount.toLocaleString('ru-RU') + ' · ' + formatDate(minDay + 1) + ' – ' + formatDate(maxDay - 1);
+  fit();
+})();
+</script>
+</body>
+</html>
+"""
@@ -0,0 +1,287 @@
+"""
+Портфель проектов с общим пулом ресурсов.
+
+Каждый проект — своя таблица; задачи получают пространство имен
+«проект::задача», а зависимость вида «Другой::Задача» — это связь между
+проектами. Расчет идет в два этапа:
+
+    1. по проектам (параллельно, в пуле процессов): распознавание колонок,
+       валидация, разбор зависимостей и собственный CPM проекта (он нужен
+       только для standalone_end в summary — срока проекта без соседей).
+       Результат запоминается по хэшу содержимого — после правки одного
+       проекта пересчитывается только он;
+    2. по портфелю: одно векторное CPM по склеенным массивам рёбер всех
+       проектов плюс межпроектные связи и, при заданной мощности,
+       выравнивание по общему полю Workers. Этот этап всегда глобальный:
+       межпроектная связь может сдвинуть любую задачу, поэтому результаты
+       CPM отдельных проектов в нем не переиспользуются, и каждый вызов
+       schedule() заново считает весь граф портфеля.
+"""
+from concurrent.futures import ProcessPoolExecutor
+import hashlib
+import os
+
+import numpy as np
+import pandas as pd
+
+from gantt_core import (
+    ParsedProject, SmartFieldMapper, validate_and_map_data, find_cyclic_components,
+    calculate_critical_path_with_dependencies, level_resources, compute_cpm, _cpm_inputs, read_project_file,
+    read_excel_projects,
+    say, verbosity, QUIET, MAX_PRINTED_ITEMS,
+)
+
+PORTFOLIO_SEPARATOR = '::'
+SUMMARY_COLUMNS = ['project', 'tasks', 'critical', 'start', 'end', 'standalone_end', 'delay_days']
+
+# ========== ЭТАП ПРОЕКТА ==========
+
+def _project_key(df):
+    """Хэш содержимого таблицы проекта: повторная подача без изменений не пересчитывается"""
+    hasher = hashlib.sha256()
+    hasher.update(repr([(str(column), str(dtype)) for column, dtype in df.dtypes.items()]).encode())
+    hasher.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return hasher.hexdigest()
+
+
+def _split_external(df, separator):
+    """
+    Убирает из колонки зависимостей ссылки на другие проекты.
+    Возвращает (таблица только с внутренними зависимостями, [(задача, внешняя ссылка)]).
+    """
+    mapping = SmartFieldMapper.detect_fields_with_logic(df) or {}
+    task_column, deps_column = mapping.get('Task'), mapping.get('Dependencies')
+    if not task_column or not deps_column:
+        return df, []
+
+    deps = df[deps_column]
+    has_external = deps.notna() & deps.astype(str).str.contains(separator, regex=False)
+    if not has_external.any():
+        return df, []
+
+    tokens = (deps[has_external].astype(str)
+              .str.replace('"', '', regex=False).str.replace("'", '', regex=False)
+              .str.split(',').explode().str.strip())
+    tokens = tokens[tokens.notna() & (tokens != '')]
+    external = tokens.str.contains(separator, regex=False)
+    links = list(zip(df.loc[tokens.index[external], task_column].astype(str), tokens[external]))
+
+    local = tokens[~external].groupby(level=0).agg(','.join)
+    df = df.copy()
+    df[deps_column] = df[deps_column].astype(object)
+    df.loc[has_external, deps_column] = local.reindex(deps.index[has_external]).fillna('').to_numpy()
+    return df, links
+
+
+def _join_dependencies(n_rows, edge_rows, edge_names):
+    """Строки колонки Dependencies из рёбер (строка задачи, имя зависимости)"""
+    order = np.argsort(edge_rows, kind='stable')
+    rows, names = edge_rows[order], edge_names[order].tolist()
+    starts = np.flatnonzero(np.diff(rows, prepend=-1)).tolist()
+    ends = starts[1:] + [len(rows)]
+    deps = np.full(n_rows, '', dtype=object)
+    deps[rows[starts]] = [','.join(names[start:end]) for start, end in zip(starts, ends)]
+    return deps
+
+
+def prepare_project(name, df, separator=PORTFOLIO_SEPARATOR, calendar=None):
+    """
+    Этап одного проекта (выполняется в рабочем процессе): валидация без
+    межпроектных ссылок, собственный CPM и таблица с именами «проект::задача».
+    Возвращает словарь; при ошибках 'df' — None, а 'errors' — их описания.
+    """
+    with verbosity(QUIET):
+        df_local, links = _split_external(df, separator)
+        is_valid, report, df_valid, _, project = validate_and_map_data(df_local, return_project=True)
+        if not is_valid:
+            return {'name': name, 'df': None, 'errors': [f"{name}: {error}" for error in report.errors]}
+
+        # Некорректные даты начала (предупреждение валидации) — проект стартует сегодня
+        df_valid['Start'] = df_valid['Start'].fillna(pd.Timestamp.now().normalize())
+
+        # Собственный план проекта — без межпроектных связей и общего пула ресурсов
+        graph = project.graph
+        durations, release, origin = _cpm_inputs(df_valid, graph, calendar)
+        finish = compute_cpm(graph, durations, release)['early_finish']
+        standalone_end = calendar.to_finish_dates([finish.max()], origin)[0] if calendar is not None \
+            else origin + pd.Timedelta(days=float(finish.max()))
+
+    prefix = f"{name}{separator}"
+    tasks = df_valid['Task'].astype(str)
+    edge_rows = project.edge_rows.astype(np.int64)
+    edge_names = prefix + pd.Series(project.edge_names, dtype=object).astype(str)
+    if links:
+        task_rows = pd.Index(tasks).get_indexer([task for task, _ in links])
+        edge_rows = np.concatenate([edge_rows, task_rows])
+        edge_names = pd.concat([edge_names, pd.Series([link for _, link in links], dtype=object)],
+                               ignore_index=True)
+
+    edge_names = edge_names.to_numpy(dtype=object)
+    df_named = df_valid.assign(
+        Project=name,
+        Task=(prefix + tasks).to_numpy(dtype=object),
+        Dependencies=_join_dependencies(len(df_valid), edge_rows, edge_names),
+    )
+    return {'name': name, 'df': df_named, 'edge_rows': edge_rows, 'edge_names': edge_names,
+            'standalone_end': standalone_end, 'errors': []}
+
+# ========== ПОРТФЕЛЬ ==========
+
+class Portfolio:
+    """
+    Набор проектов с межпроектными связями и общим пулом рабочих.
+
+        portfolio = Portfolio({'alpha': df_a, 'beta': df_b}, workers=8)
+        df_with_critical, df_sorted, errors = portfolio.schedule(capacity=40)
+        portfolio.set_project('beta', df_b_changed)   # пересчитается только beta
+        portfolio.schedule(capacity=40)
+
+    Имена проектов не должны содержать разделитель (по умолчанию '::').
+    """
+
+    def __init__(self, projects=None, separator=PORTFOLIO_SEPARATOR, workers=None, calendar=None):
+        self.separator = separator
+        self.workers = workers
+        self.calendar = calendar
+        self._tables = {}
+        # Результаты этапа проекта: имя -> (хэш таблицы, результат prepare_project)
+        self._prepared = {}
+        # Последнее успешное расписание портфеля (для summary)
+        self._last = None
+        for name, df in (projects or {}).items():
+            self.set_project(name, df)
+
+    @classmethod
+    def from_files(cls, paths, **kwargs):
+        """Портфель из файлов проектов; имя проекта — имя файла без расширения"""
+        return cls({os.path.splitext(os.path.basename(path))[0]: read_project_file(path) for path in paths},
+                   **kwargs)
+
+    @classmethod
+    def from_excel(cls, source, sheets='*', read_workers=None, **kwargs):
+        """Портфель из книги Excel: проект на лист, имя проекта — имя листа (см. read_excel_projects)"""
+        return cls(read_excel_projects(source, sheets, workers=read_workers), **kwargs)
+
+    @property
+    def projects(self):
+        return list(self._tables)
+
+    def set_project(self, name, df):
+        """Добавляет или заменяет проект; расчет откладывается до schedule()"""
+        name = str(name)
+        if self.separator in name:
+            raise ValueError(f"Имя проекта не должно содержать '{self.separator}': {name}")
+        self._tables[name] = df
+
+    def remove_project(self, name):
+        self._tables.pop(name, None)
+        self._prepared.pop(name, None)
+
+    def _refresh(self):
+        """Этап проекта для новых и изменившихся проектов — параллельно в пуле процессов"""
+        stale = []
+        for name, df in self._tables.items():
+            key = _project_key(df)
+            if name not in self._prepared or self._prepared[name][0] != key:
+                stale.append((name, key))
+        if not stale:
+            return []
+
+        args = [(name, self._tables[name], self.separator, self.calendar) for name, _ in stale]
+        workers = min(self.workers or os.cpu_count() or 1, len(stale))
+        if workers == 1:
+            results = [prepare_project(*arg) for arg in args]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(prepare_project, *zip(*args)))
+
+        for (name, key), result in zip(stale, results):
+            self._prepared[name] = (key, result)
+        return [name for name, _ in stale]
+
+    def _merge(self):
+        """Склеивает проекты в одну таблицу и один ParsedProject без повторного разбора строк"""
+        parts = [self._prepared[name][1] for name in self._tables]
+        frames, rows, names = [], [], []
+        offset = 0
+        for part in parts:
+            frames.append(part['df'])
+            rows.append(part['edge_rows'] + offset)
+            names.append(part['edge_names'])
+            offset += len(part['df'])
+        merged = pd.concat(frames, ignore_index=True)
+        row_codes, tasks = pd.factorize(merged['Task'])
+        edge_rows = np.concatenate(rows) if rows else np.empty(0, dtype=np.int64)
+        edge_names = np.concatenate(names) if names else np.empty(0, dtype=object)
+        return merged, ParsedProject(tasks, row_codes, edge_rows, edge_names)
+
+    def schedule(self, capacity=None, priority='total_float'):
+        """
+        Расписание портфеля: (df_with_critical, df_sorted, errors), как у build_schedule.
+
+        capacity — общая мощность пула (число или pd.Series «дата → мощность»):
+        тогда задачи сдвигаются так, чтобы сумма Workers не превышала ее
+        (колонка Resource_Delay). Критический путь — по плану без выравнивания.
+
+        Кэшируется только этап проекта; CPM портфеля (и выравнивание)
+        при каждом вызове считается заново по всему склеенному графу.
+        """
+        self._last = None
+        if not self._tables:
+            return None, None, ["Портфель пуст"]
+
+        recomputed = self._refresh()
+        say(f"📁 ПОРТФЕЛЬ: {len(self._tables)} проектов, пересчитано: {len(recomputed)}")
+
+        errors = [error for name in self._tables for error in self._prepared[name][1]['errors']]
+        if any(self._prepared[name][1]['df'] is None for name in self._tables):
+            return None, None, errors
+
+        merged, project = self._merge()
+
+        missing_rows, missing_names = project.missing_dependencies()
+        if missing_rows.size:
+            examples = [f"'{task}' → '{dep}'" for task, dep in
+                        zip(merged['Task'].to_numpy()[missing_rows[:MAX_PRINTED_ITEMS]], missing_names)]
+            errors.append(f"Несуществующие межпроектные зависимости ({missing_rows.size}): {', '.join(examples)}")
+        cycles = find_cyclic_components(project.graph)
+        if cycles:
+            names = [' → '.join(map(str, project.graph.tasks[cycle[:MAX_PRINTED_ITEMS]]))
+                     for _, cycle in cycles[:MAX_PRINTED_ITEMS]]
+            errors.append(f"Циклы между проектами ({len(cycles)}): {'; '.join(names)}")
+        if errors:
+            return None, None, errors
+
+        df_with_critical = calculate_critical_path_with_dependencies(merged, project=project,
+                                                                     calendar=self.calendar)
+        if capacity is not None:
+            df_with_critical = level_resources(df_with_critical, capacity, project=project,
+                                               priority=priority, calendar=self.calendar)
+
+        # Одна шкала времени: проекты в порядке добавления, внутри — по началу и топологии
+        project_rank = pd.Categorical(df_with_critical['Project'], categories=list(self._tables)).codes
+        topo_rank = project.graph.layering().rank[project.graph.row_codes]
+        df_sorted = df_with_critical.iloc[np.lexsort((topo_rank, df_with_critical['Start'].to_numpy(),
+                                                      project_rank))]
+        self._last = df_with_critical
+        return df_with_critical, df_sorted, errors
+
+    def summary(self, df_with_critical=None):
+        """
+        Сводка по проектам: сроки в портфеле против собственного плана проекта.
+        Без аргумента — по последнему успешному schedule().
+        """
+        df = self._last if df_with_critical is None else df_with_critical
+        if df is None:
+            raise ValueError("Расписание портфеля еще не рассчитано — сначала вызовите schedule()")
+        grouped = df.groupby('Project', sort=False)
+        summary = pd.DataFrame({
+            'project': list(grouped.groups),
+            'tasks': grouped.size().to_numpy(),
+            'critical': grouped['Is_Critical'].sum().to_numpy().astype(int),
+            'start': grouped['Start'].min().to_numpy(),
+            'end': grouped['End'].max().to_numpy(),
+        })
+        summary['standalone_end'] = [self._prepared[name][1]['standalone_end'] for name in summary['project']]
+        summary['delay_days'] = (summary['end'] - summary['standalone_end']) / pd.Timedelta(days=1)
+        return summary[SUMMARY_COLUMNS]
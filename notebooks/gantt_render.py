@@ -0,0 +1,465 @@
+"""
+Отрисовка диаграммы Ганта и PDF-отчеты (matplotlib).
+"""
+import matplotlib.pyplot as plt
+from matplotlib.patches import Patch
+from matplotlib.collections import PolyCollection
+import matplotlib.colors as mcolors
+import matplotlib.dates as mdates
+from matplotlib.backends.backend_pdf import PdfPages
+from matplotlib.figure import Figure
+import numpy as np
+import pandas as pd
+import os
+import shutil
+import sys
+
+from gantt_core import build_schedule, print_detailed_analysis, say, timed_stage, wbs_outline
+from gantt_html import export_html
+
+# ========== ОТРИСОВКА ДИАГРАММЫ ==========
+
+CRITICAL_COLOR, CRITICAL_ALPHA = '#e74c3c', 0.9
+NORMAL_COLOR, NORMAL_ALPHA = '#3498db', 0.7
+# Суммарные задачи WBS — тонкие темные полосы
+SUMMARY_COLOR, CRITICAL_SUMMARY_COLOR, SUMMARY_ALPHA = '#2c3e50', '#922b21', 0.95
+
+# Подписи и деления оси Y для всех задач только на небольших диаграммах
+_MAX_TICK_LABELS = 200
+_MAX_BAR_LABELS = 2000
+# Начиная с этого количества полос коллекция растеризуется в векторных форматах (PDF)
+_RASTERIZE_BARS = 5000
+
+
+def _bar_labels(df):
+    """Подписи полос: длительность и число рабочих"""
+    labels = df['Duration'].astype(np.float64).astype(np.int64).astype(str) + 'д'
+    if 'Workers' in df.columns:
+        workers = pd.to_numeric(df['Workers'], errors='coerce')
+        has_workers = workers > 0
+        workers_text = workers.map(lambda value: f"{value:g}")
+        labels = labels.where(~has_workers, labels + '(' + workers_text + 'ч)')
+    return labels
+
+
+def draw_gantt_bars(ax, df_sorted, fontsize=8, xlim=None):
+    """
+    Рисует все задачи одной коллекцией PolyCollection.
+
+    Задачи располагаются по числовым позициям снизу вверх в порядке df_sorted.
+    Подписи ставятся только на полосы, в которые они помещаются по ширине
+    в пикселях (и не больше _MAX_BAR_LABELS штук). xlim задает общую ось
+    времени (в числах дат matplotlib) для нескольких страниц. Строки
+    с Is_Summary (см. wbs_outline) рисуются тонкими суммарными полосами.
+    """
+    n = len(df_sorted)
+    y = np.arange(n, dtype=np.float64)
+    left = mdates.date2num(df_sorted['Start'].to_numpy())
+    right = mdates.date2num(df_sorted['End'].to_numpy())
+    half = 0.3
+    summary = (df_sorted['Is_Summary'].to_numpy(dtype=bool) if 'Is_Summary' in df_sorted.columns
+               else np.zeros(n, dtype=bool))
+    heights = np.where(summary, half / 2, half)
+
+    verts = np.empty((n, 4, 2))
+    verts[:, 0, 0] = verts[:, 1, 0] = left
+    verts[:, 2, 0] = verts[:, 3, 0] = right
+    verts[:, 0, 1] = verts[:, 3, 1] = y - heights
+    verts[:, 1, 1] = verts[:, 2, 1] = y + heights
+
+    critical = df_sorted['Is_Critical'].to_numpy(dtype=bool)
+    colors = np.where(critical[:, None],
+                      mcolors.to_rgba(CRITICAL_COLOR, CRITICAL_ALPHA),
+                      mcolors.to_rgba(NORMAL_COLOR, NORMAL_ALPHA))
+    if summary.any():
+        colors[summary] = np.where(critical[summary, None],
+                                   mcolors.to_rgba(CRITICAL_SUMMARY_COLOR, SUMMARY_ALPHA),
+                                   mcolors.to_rgba(SUMMARY_COLOR, SUMMARY_ALPHA))
+
+    bars = PolyCollection(verts, facecolors=colors, edgecolors='white',
+                          linewidths=1 if n <= _MAX_TICK_LABELS else 0)
+    bars.set_rasterized(n >= _RASTERIZE_BARS)
+    ax.add_collection(bars)
+
+    if xlim is not None:
+        ax.set_xlim(*xlim)
+    elif n:
+        pad = max((right.max() - left.min()) * 0.02, 0.5)
+        ax.set_xlim(left.min() - pad, right.max() + pad)
+    ax.set_ylim(-0.5 - half, n - 0.5 + half)
+    ax.xaxis_date()
+
+    # Деления оси Y: все названия на небольших диаграммах, иначе — выборочно
+    step = max(1, int(np.ceil(n / _MAX_TICK_LABELS)))
+    ticks = np.arange(0, n, step)
+    ax.set_yticks(ticks)
+    ax.set_yticklabels(df_sorted['Task'].to_numpy()[ticks].astype(str),
+                       fontsize=fontsize if step == 1 else max(fontsize - 2, 5))
+
+    # Подписи только там, где хватает места по ширине полосы
+    labels = _bar_labels(df_sorted).to_numpy()
+    fig = ax.figure
+    px_per_x = ax.transData.transform([(1, 0)])[0, 0] - ax.transData.transform([(0, 0)])[0, 0]
+    bar_px = (right - left) * px_per_x
+    text_px = np.char.str_len(labels.astype(str)) * fontsize * 0.65 * fig.dpi / 72
+    bar_height_px = 2 * half * ax.bbox.height / max(n, 1)
+    fits = (bar_px >= text_px) & (bar_height_px >= fontsize * fig.dpi / 72) & ~summary
+    for index in np.flatnonzero(fits)[:_MAX_BAR_LABELS]:
+        ax.text((left[index] + right[index]) / 2, y[index], labels[index],
+                ha='center', va='center', fontweight='bold', fontsize=fontsize, color='white')
+
+    return bars
+
+# ========== ПОСТРАНИЧНЫЙ PDF-ОТЧЕТ ==========
+
+_PAGE_LANDSCAPE = (11.69, 8.27)
+_PAGE_PORTRAIT = (8.27, 11.69)
+# Страница PDF с текстом стоит ~0.2-0.6 с: у больших проектов постраничные диаграмма
+# и таблица — только по критическим задачам (не больше PDF_MAX_TASKS), полный список — в CSV/HTML
+PDF_MAX_TASKS = 1000
+
+
+def _summary_text(df, max_critical=40):
+    """Текст страницы с общей информацией о проекте"""
+    critical_tasks = df[df['Is_Critical']]
+    total_duration = (df['End'].max() - df['Start'].min()).days
+    lines = [
+        "ДИАГРАММА ГАНТА - АНАЛИЗ ПРОЕКТА",
+        "=" * 50,
+        "",
+        "ОБЩАЯ ИНФОРМАЦИЯ:",
+        f"• Всего задач: {len(df)}",
+        f"• Критических задач: {len(critical_tasks)}",
+        f"• Общая длительность: {total_duration} дней",
+        f"• Период выполнения: {df['Start'].min().strftime('%d.%m.%Y')} - {df['End'].max().strftime('%d.%m.%Y')}",
+        "",
+        "КРИТИЧЕСКИЙ ПУТЬ:",
+    ]
+    for task in critical_tasks.head(max_critical).itertuples():
+        workers_info = f" ({task.Workers}ч)" if hasattr(task, 'Workers') and task.Workers > 0 else ""
+        lines.append(f"• {task.Task} - {task.Duration} дней{workers_info}")
+    if len(critical_tasks) > max_critical:
+        lines.append(f"… и ещё {len(critical_tasks) - max_critical} (см. таблицу задач)")
+    return '\n'.join(lines)
+
+
+def _table_lines(df):
+    """Строки таблицы задач фиксированной ширины"""
+    def cut(values, width):
+        values = values.astype(str)
+        return values.where(values.str.len() <= width, values.str.slice(0, width - 1) + '…').str.ljust(width)
+
+    workers = (df['Workers'].map(lambda value: f"{value:g}" if pd.notna(value) else '') if 'Workers' in df.columns
+               else pd.Series('', index=df.index))
+    deps = df['Dependencies'].fillna('') if 'Dependencies' in df.columns else pd.Series('', index=df.index)
+    return (cut(df['Task'], 16) + ' '
+            + cut(df['Duration'].map(lambda value: f"{value:g}"), 6) + ' '
+            + cut(workers, 6) + ' '
+            + df['Start'].dt.strftime('%d.%m.%Y') + ' '
+            + df['End'].dt.strftime('%d.%m.%Y') + ' '
+            + np.where(df['Is_Critical'], '●', ' ') + ' '
+            + cut(deps, 30)).tolist()
+
+
+def export_paginated_pdf(df_sorted, pdf_path, overview_fig=None, rows_per_page=40, table_rows_per_page=90,
+                         max_tasks=PDF_MAX_TASKS):
+    """
+    Постраничный PDF: обзорная диаграмма, сводка, диаграмма по rows_per_page
+    задач на страницу с общей осью времени и таблица всех задач.
+
+    Если задач больше max_tasks, постраничные диаграмма и таблица строятся
+    только по критическим задачам (первые max_tasks из них) — время отчета
+    ограничено независимо от размера проекта; max_tasks=None снимает предел.
+    Страницы строятся по одной и сразу закрываются, поэтому пиковая память
+    не зависит от количества задач.
+    """
+    detail, scope = df_sorted, 'ВСЕ ЗАДАЧИ'
+    if max_tasks is not None and len(df_sorted) > max_tasks:
+        detail = df_sorted[df_sorted['Is_Critical'].to_numpy(dtype=bool)].iloc[:max_tasks]
+        scope = 'КРИТИЧЕСКИЕ ЗАДАЧИ'
+        say(f"📄 Задач больше {max_tasks:,}: в постраничной части PDF только критические ({len(detail):,})")
+    n = len(detail)
+    left = mdates.date2num(df_sorted['Start'].min())
+    right = mdates.date2num(df_sorted['End'].max())
+    pad = max((right - left) * 0.02, 0.5)
+    xlim = (left - pad, right + pad)
+    header = f"{'Задача':<16} {'Длит.':<6} {'Раб.':<6} {'Начало':<10} {'Конец':<10} К Зависимости"
+
+    with PdfPages(pdf_path) as pdf:
+        if overview_fig is not None:
+            pdf.savefig(overview_fig, bbox_inches='tight')
+
+        fig = Figure(figsize=_PAGE_PORTRAIT)
+        summary = _summary_text(df_sorted)
+        if detail is not df_sorted:
+            summary += (f"\n\nЗадач больше {max_tasks:,}: на следующих страницах только критические задачи"
+                        f" ({n:,}).\nПолный список — в CSV расписания или HTML просмотрщике.")
+        fig.text(0.08, 0.95, summary, fontsize=9, va='top', fontfamily='monospace')
+        pdf.savefig(fig)
+
+        # Диаграмма по страницам (для маленьких проектов хватает обзорной)
+        if overview_fig is None or n > rows_per_page:
+            pages = max(1, int(np.ceil(n / rows_per_page)))
+            for page in range(pages):
+                chunk = detail.iloc[page * rows_per_page:(page + 1) * rows_per_page]
+                fig = Figure(figsize=_PAGE_LANDSCAPE)
+                ax = fig.add_subplot()
+                draw_gantt_bars(ax, chunk, xlim=xlim)
+                title = "ДИАГРАММА ГАНТА" if detail is df_sorted else "КРИТИЧЕСКИЙ ПУТЬ"
+                ax.set_title(f"{title} — стр. {page + 1}/{pages}", fontweight='bold')
+                ax.grid(axis='x', alpha=0.3)
+                ax.tick_params(axis='x', labelrotation=45)
+                # Фиксированные поля вместо tight_layout: одинаковая геометрия страниц и без лишних замеров текста
+                fig.subplots_adjust(left=0.16, right=0.98, top=0.94, bottom=0.12)
+                pdf.savefig(fig)
+
+        # Таблица задач
+        pages = max(1, int(np.ceil(n / table_rows_per_page)))
+        for page in range(pages):
+            chunk = detail.iloc[page * table_rows_per_page:(page + 1) * table_rows_per_page]
+            fig = Figure(figsize=_PAGE_PORTRAIT)
+            text = '\n'.join([f"{scope} — стр. {page + 1}/{pages}", header, '-' * len(header)] + _table_lines(chunk))
+            fig.text(0.05, 0.97, text, fontsize=7, va='top', fontfamily='monospace')
+            pdf.savefig(fig)
+
+    return pdf_path
+
+
+def render_gantt_figure(fig, df_sorted):
+    """Рисует диаграмму Ганта на готовой фигуре (pyplot или matplotlib.figure.Figure)"""
+    ax = fig.add_subplot()
+    
+    # Все полосы — одной коллекцией
+    draw_gantt_bars(ax, df_sorted)
+    
+    # Настройка
+    ax.set_xlabel('Дата')
+    ax.set_ylabel('Задачи')
+    ax.set_title('ДИАГРАММА ГАНТА С КРИТИЧЕСКИМ ПУТЕМ', fontweight='bold')
+    ax.grid(axis='x', alpha=0.3)
+    ax.tick_params(axis='x', labelrotation=45)
+    
+    # Легенда
+    legend_elements = [
+        Patch(facecolor=CRITICAL_COLOR, alpha=CRITICAL_ALPHA, label='Критический путь'),
+        Patch(facecolor=NORMAL_COLOR, alpha=NORMAL_ALPHA, label='Обычные задачи')
+    ]
+    if 'Is_Summary' in df_sorted.columns:
+        legend_elements.append(Patch(facecolor=SUMMARY_COLOR, alpha=SUMMARY_ALPHA, label='Суммарные задачи (WBS)'))
+    ax.legend(handles=legend_elements, loc='upper right')
+    
+    fig.tight_layout()
+    return ax
+
+
+# ========== ОТКЛОНЕНИЯ ОТ БАЗОВОГО ПЛАНА ==========
+
+BASELINE_COLOR, SLIP_COLOR, GAIN_COLOR = '#95a5a6', '#e74c3c', '#27ae60'
+# На диаграмме отклонений — задачи с наибольшим сдвигом окончания
+VARIANCE_MAX_ROWS = 200
+
+
+def _bar_verts(left, right, bottom, top):
+    verts = np.empty((len(left), 4, 2))
+    verts[:, 0, 0] = verts[:, 1, 0] = left
+    verts[:, 2, 0] = verts[:, 3, 0] = right
+    verts[:, 0, 1] = verts[:, 3, 1] = bottom
+    verts[:, 1, 1] = verts[:, 2, 1] = top
+    return verts
+
+
+def render_variance_figure(fig, diff, max_rows=VARIANCE_MAX_ROWS):
+    """
+    Диаграмма отклонений (результат compare_schedules): для каждой задачи —
+    серая полоса базового плана и под ней текущая, красная при сдвиге
+    окончания позже и зеленая при сдвиге раньше. Берутся max_rows задач
+    с наибольшим по модулю сдвигом, по порядку базового начала.
+    """
+    rows = diff.dropna(subset=['Baseline_Start', 'Start'])
+    rows = rows.iloc[np.argsort(-rows['Finish_Variance'].abs().to_numpy(), kind='stable')[:max_rows]]
+    rows = rows.sort_values('Baseline_Start', kind='stable')
+    n = len(rows)
+    y = np.arange(n, dtype=np.float64)
+    
+    ax = fig.add_subplot()
+    base_left = mdates.date2num(rows['Baseline_Start'].to_numpy())
+    base_right = mdates.date2num(rows['Baseline_End'].to_numpy())
+    left = mdates.date2num(rows['Start'].to_numpy())
+    right = mdates.date2num(rows['End'].to_numpy())
+    ax.add_collection(PolyCollection(_bar_verts(base_left, base_right, y + 0.05, y + 0.35),
+                                     facecolors=BASELINE_COLOR, edgecolors='none'))
+    variance = rows['Finish_Variance'].to_numpy()
+    colors = np.where((variance > 0)[:, None], mcolors.to_rgba(SLIP_COLOR, CRITICAL_ALPHA),
+                      np.where((variance < 0)[:, None], mcolors.to_rgba(GAIN_COLOR, CRITICAL_ALPHA),
+                               mcolors.to_rgba(NORMAL_COLOR, NORMAL_ALPHA)))
+    ax.add_collection(PolyCollection(_bar_verts(left, right, y - 0.35, y - 0.05), facecolors=colors,
+                                     edgecolors='none'))
+    
+    if n:
+        lo, hi = min(base_left.min(), left.min()), max(base_right.max(), right.max())
+        pad = max((hi - lo) * 0.02, 0.5)
+        ax.set_xlim(lo - pad, hi + pad)
+    ax.set_ylim(-0.6, n - 0.4)
+    ax.xaxis_date()
+    step = max(1, int(np.ceil(n / _MAX_TICK_LABELS)))
+    ticks = np.arange(0, n, step)
+    ax.set_yticks(ticks)
+    ax.set_yticklabels([f"{task} ({value:+g} дн.)" for task, value in
+                        zip(rows['Task'].to_numpy()[ticks], variance[ticks])], fontsize=7)
+    
+    ax.set_xlabel('Дата')
+    ax.set_title(f"ОТКЛОНЕНИЯ ОТ БАЗОВОГО ПЛАНА (задач: {n} из {len(diff)} изменившихся)", fontweight='bold')
+    ax.grid(axis='x', alpha=0.3)
+    ax.tick_params(axis='x', labelrotation=45)
+    ax.legend(handles=[
+        Patch(facecolor=BASELINE_COLOR, label='Базовый план'),
+        Patch(facecolor=SLIP_COLOR, alpha=CRITICAL_ALPHA, label='Окончание позже'),
+        Patch(facecolor=GAIN_COLOR, alpha=CRITICAL_ALPHA, label='Окончание раньше'),
+    ], loc='upper right')
+    fig.tight_layout()
+    return ax
+
+
+def save_variance_chart(diff, png_path, max_rows=VARIANCE_MAX_ROWS):
+    """Сохраняет диаграмму отклонений в PNG (фигура без pyplot)"""
+    directory = os.path.dirname(png_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    fig = Figure(figsize=(16, max(6, min(max_rows, len(diff)) * 0.12 + 2)))
+    render_variance_figure(fig, diff, max_rows)
+    fig.savefig(png_path, dpi=150, bbox_inches='tight')
+    say(f"💾 Диаграмма отклонений сохранена: {png_path}")
+    return png_path
+
+
+def _show_png(path):
+    """Показывает готовую картинку в ноутбуке вместо повторной отрисовки"""
+    display_module = sys.modules.get('IPython.display')
+    if display_module is not None:
+        display_module.display(display_module.Image(filename=path))
+
+
+def _artifact_names(variant=None):
+    """Имена PNG и PDF в кэше; variant — вид диаграммы того же расписания (например, 'wbs2')"""
+    suffix = f"-{variant}" if variant else ''
+    return f"chart{suffix}.png", f"report{suffix}.pdf"
+
+
+def save_chart_files(df_sorted, png_path=None, pdf_path=None, cache=None, cache_key=None, fig=None,
+                     profile=None, variant=None):
+    """
+    Сохраняет PNG и PDF. Файлы, уже лежащие в кэше под cache_key, копируются
+    оттуда; остальные отрисовываются (на fig или на новой фигуре без pyplot)
+    и кладутся в кэш. Возвращает фигуру или None, если отрисовка не понадобилась.
+    profile — PipelineProfile для замеров этапов render, savefig и pdf;
+    variant отделяет в кэше разные виды диаграммы одного расписания.
+    """
+    png_name, pdf_name = _artifact_names(variant)
+    for name, path in ((png_name, png_path), (pdf_name, pdf_path)):
+        if path is None:
+            continue
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        cached = cache.artifact(cache_key, name) if cache is not None else None
+        if cached is not None:
+            shutil.copyfile(cached, path)
+        else:
+            if fig is None:
+                with timed_stage(profile, 'render', rows=len(df_sorted)):
+                    fig = Figure(figsize=(16, 10))
+                    render_gantt_figure(fig, df_sorted)
+            if name == png_name:
+                with timed_stage(profile, 'savefig', rows=len(df_sorted)):
+                    fig.savefig(path, dpi=300, bbox_inches='tight')
+            else:
+                with timed_stage(profile, 'pdf', rows=len(df_sorted)):
+                    export_paginated_pdf(df_sorted, path, overview_fig=fig)
+            if cache is not None:
+                cache.store_artifact(cache_key, name, path)
+        
+        if name == png_name:
+            say(f"💾 Диаграмма сохранена: {path}")
+        else:
+            say(f"📄 PDF отчет сохранен: {path}")
+    return fig
+
+
+def create_gantt_chart(df, save_path=None, save_pdf=False, cache=None, cache_key=None, profile=None,
+                       calendar=None, save_html=False, wbs_level=None):
+    """
+    Основная функция для создания диаграммы Ганта
+
+    cache — ScheduleCache (см. gantt_cache): повторный вызов с теми же данными
+    берет расписание и готовые PNG/PDF с диска. cache_key — готовый ключ,
+    например по байтам загруженного файла; по умолчанию — по содержимому df.
+    profile — PipelineProfile: время, пик памяти и объемы по каждому этапу.
+    calendar — WorkCalendar (рабочие дни и праздники), длительности в рабочих днях.
+    save_html — еще и автономный HTML-просмотрщик рядом с PNG (см. gantt_html).
+    wbs_level — иерархический вид по колонке WBS: суммарные задачи до этой
+    глубины, глубже — свернуты (см. wbs_outline); HTML остается полным.
+    Объем вывода задается set_verbosity / verbosity.
+    """
+    cached = None
+    if cache is not None:
+        with timed_stage(profile, 'cache', rows=len(df)):
+            cache_key = cache_key or cache.key_for_frame(df, calendar=calendar)
+            cached = cache.get(cache_key)
+    
+    if cached is not None:
+        say("⚡ РАСПИСАНИЕ ВЗЯТО ИЗ КЭША")
+        df_with_critical, df_sorted = cached
+    else:
+        df_with_critical, df_sorted, errors = build_schedule(df, profile=profile, calendar=calendar)
+        
+        if df_with_critical is None:
+            say("❌ Ошибки валидации:")
+            for error in errors:
+                say(f"   - {error}")
+            return None
+        
+        if cache is not None:
+            cache.put(cache_key, df_with_critical, df_sorted)
+    
+    pdf_path = None
+    if save_pdf:
+        pdf_path = save_path.replace('.png', '.pdf') if save_path else 'gantt_chart.pdf'
+    
+    # Уровень детализации: на диаграмме — суммарные задачи WBS вместо всех строк
+    df_chart, variant = df_sorted, None
+    if wbs_level is not None:
+        if 'WBS' in df_with_critical.columns:
+            with timed_stage(profile, 'wbs', rows=len(df_with_critical)):
+                df_chart, variant = wbs_outline(df_with_critical, wbs_level), f"wbs{wbs_level}"
+            say(f"🗂️ WBS, уровень {wbs_level}: {len(df_chart)} строк вместо {len(df_sorted)}")
+        else:
+            say("⚠️ Колонка WBS не найдена — диаграмма строится по всем задачам")
+    
+    png_name, pdf_name = _artifact_names(variant)
+    cached_png = cache.artifact(cache_key, png_name) if cached is not None else None
+    if cached_png is not None and (pdf_path is None or cache.artifact(cache_key, pdf_name)):
+        # Все уже отрисовано — только копируем файлы и показываем готовую картинку
+        save_chart_files(df_chart, save_path, pdf_path, cache, cache_key, variant=variant)
+        _show_png(cached_png)
+    else:
+        # Создаем диаграмму
+        say("🎨 ПОСТРОЕНИЕ ДИАГРАММЫ...")
+        with timed_stage(profile, 'render', rows=len(df_chart)):
+            fig = plt.figure(figsize=(16, 10))
+            render_gantt_figure(fig, df_chart)
+        
+        # Сохранение PNG и PDF
+        save_chart_files(df_chart, save_path, pdf_path, cache, cache_key, fig=fig, profile=profile,
+                         variant=variant)
+        
+        plt.show()
+    
+    if save_html:
+        with timed_stage(profile, 'html', rows=len(df_sorted)):
+            export_html(df_sorted, save_path.replace('.png', '.html') if save_path else 'gantt_chart.html')
+    
+    # Анализ
+    print_detailed_analysis(df_with_critical)
+    
+    return df_with_critical
@@ -0,0 +1,309 @@
+"""
+Интерфейс для Jupyter: загрузка файла кнопкой и построение диаграммы.
+
+Расчет и отрисовка идут в фоновом потоке: ноутбук не блокируется, прогресс
+по этапам появляется в окне вывода, а повторное нажатие кнопки отменяет
+устаревший запуск.
+"""
+import os
+import threading
+import traceback
+from datetime import datetime
+from io import BytesIO
+
+from IPython.display import display, FileLink, HTML, Image
+import ipywidgets as widgets
+
+from gantt_core import (build_schedule, read_project_file, PipelineProfile, verbosity, QUIET, MAX_PRINTED_ITEMS,
+                        WbsTree, wbs_outline)
+from gantt_cache import default_cache
+from gantt_html import export_html
+from gantt_render import save_chart_files
+
+# ========== ФОНОВОЕ ПОСТРОЕНИЕ ==========
+
+# Названия этапов конвейера в прогрессе
+_STAGE_LABELS = {
+    'read': 'чтение файла',
+    'cache': 'поиск в кэше',
+    'mapping': 'распознавание колонок',
+    'parse': 'разбор зависимостей',
+    'validation': 'валидация',
+    'dates': 'расчет дат',
+    'cpm': 'критический путь',
+    'sort': 'сортировка',
+    'wbs': 'суммарные задачи WBS',
+    'render': 'отрисовка',
+    'savefig': 'сохранение PNG',
+    'pdf': 'PDF отчет',
+    'html': 'HTML просмотрщик',
+}
+
+# Больше задач — только HTML-просмотрщик, без PNG и PDF
+STATIC_CHART_MAX_TASKS = 5000
+
+
+class _Superseded(Exception):
+    """Запуск отменен более новым нажатием кнопки"""
+
+
+class _BackgroundJob:
+    """
+    Одно построение диаграммы в фоновом потоке.
+
+    Вывод идет через потокобезопасные append_* у widgets.Output (print из
+    потока попал бы в случайную ячейку). Отмена срабатывает на ближайшей
+    границе этапа; после отмены запуск больше ничего не выводит.
+    """
+
+    def __init__(self, output):
+        self.output = output
+        self.cancelled = threading.Event()
+        self._lock = threading.Lock()
+        self.thread = None
+
+    def start(self, target, *args):
+        self.thread = threading.Thread(target=self._run, args=(target,) + args, daemon=True)
+        self.thread.start()
+
+    def running(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def _run(self, target, *args):
+        try:
+            # Собственный вывод ядра в этом потоке не нужен — прогресс идет через emit
+            with verbosity(QUIET):
+                target(self, *args)
+        except _Superseded:
+            pass
+        except Exception as e:
+            self.emit(f"❌ ОШИБКА: {e}\n{traceback.format_exc()}", stream='stderr')
+
+    def cancel(self):
+        with self._lock:
+            self.cancelled.set()
+
+    def check(self):
+        """Прерывает запуск, если он уже отменен"""
+        if self.cancelled.is_set():
+            raise _Superseded()
+
+    def emit(self, text, stream='stdout'):
+        with self._lock:
+            if self.cancelled.is_set():
+                return
+            if stream == 'stderr':
+                self.output.append_stderr(text + '\n')
+            else:
+                self.output.append_stdout(text + '\n')
+
+    def show(self, obj):
+        with self._lock:
+            if not self.cancelled.is_set():
+                self.output.append_display_data(obj)
+
+    def on_stage(self, record):
+        """Callback PipelineProfile: строка прогресса после каждого этапа"""
+        self.check()
+        label = _STAGE_LABELS.get(record['stage'], record['stage'])
+        self.emit(f"   ✔ {label}: {record['seconds']:.2f} с")
+
+
+def _uploaded_file(value):
+    """(имя, байты) из значения FileUpload: словарь в ipywidgets 7, кортеж в ipywidgets 8"""
+    uploaded_file = list(value.values())[0] if isinstance(value, dict) else value[0]
+    return uploaded_file['name'], bytes(uploaded_file['content'])
+
+
+def _wbs_chart(df_with_critical):
+    """Самый подробный уровень WBS, который помещается в STATIC_CHART_MAX_TASKS строк, или None"""
+    tree = WbsTree.from_dataframe(df_with_critical)
+    best = None
+    for level in range(1, tree.max_depth + 1):
+        outline = wbs_outline(df_with_critical, level, tree)
+        if len(outline) > STATIC_CHART_MAX_TASKS:
+            break
+        best = level, outline
+    return best
+
+
+def _build_chart(job, filename, content, sheet=None):
+    """Тело фонового запуска: загрузка, расчет, PNG и PDF, вывод результата (sheet — лист книги Excel)"""
+    job.emit(f"📁 ОБРАБАТЫВАЮ ФАЙЛ: {filename}")
+    job.emit("=" * 50)
+    profile = PipelineProfile(callback=job.on_stage, trace_memory=False)
+    
+    with profile.stage('read') as record:
+        suffix = os.path.splitext(filename)[1].lower()
+        df = read_project_file(BytesIO(content), suffix=suffix, sheet=sheet)
+        record['rows'] = len(df)
+    
+    job.emit(f"✅ ФАЙЛ ЗАГРУЖЕН! ЗАДАЧ: {len(df)}")
+    # Большую таблицу целиком не показываем — форматирование само по себе дорого
+    job.emit("\n📊 СОДЕРЖИМОЕ ФАЙЛА:")
+    job.show(df.head(MAX_PRINTED_ITEMS))
+    if len(df) > MAX_PRINTED_ITEMS:
+        job.emit(f"   … и ещё {len(df) - MAX_PRINTED_ITEMS} строк")
+    
+    # Тот же файл второй раз не пересчитывается и не перерисовывается
+    job.emit("\n🔄 РАСЧЕТ РАСПИСАНИЯ...")
+    cache = default_cache()
+    with profile.stage('cache', rows=len(df)):
+        cache_key = cache.key_for_bytes(content, suffix=suffix, sheet=sheet)
+        cached = cache.get(cache_key)
+    
+    if cached is not None:
+        job.emit("⚡ РАСПИСАНИЕ ВЗЯТО ИЗ КЭША")
+        df_with_critical, df_sorted = cached
+    else:
+        df_with_critical, df_sorted, errors = build_schedule(df, profile=profile)
+        if df_with_critical is None:
+            job.emit("❌ Ошибки валидации:")
+            for error in errors:
+                job.emit(f"   - {error}")
+            return
+        cache.put(cache_key, df_with_critical, df_sorted)
+    job.check()
+    
+    # Создаем папку и имена для результатов
+    os.makedirs('../figs', exist_ok=True)
+    save_name = f"gantt_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    save_path = f'../figs/{save_name}.png'
+    pdf_path = f'../figs/{save_name}.pdf'
+    html_path = f'../figs/{save_name}.html'
+    
+    # PNG и PDF на тысячах задач нечитаемы и долго строятся — тогда суммарные задачи WBS или только HTML
+    df_chart, variant = df_sorted, None
+    if len(df_sorted) > STATIC_CHART_MAX_TASKS and 'WBS' in df_with_critical.columns:
+        with profile.stage('wbs', rows=len(df_with_critical)):
+            fitting = _wbs_chart(df_with_critical)
+        if fitting is not None:
+            level, df_chart = fitting
+            variant = f"wbs{level}"
+            job.emit(f"🗂️ Задач больше {STATIC_CHART_MAX_TASKS}: диаграмма по WBS до уровня {level} "
+                     f"({len(df_chart)} строк)")
+    static = len(df_chart) <= STATIC_CHART_MAX_TASKS
+    job.emit("\n🎨 СОЗДАЮ ДИАГРАММУ...")
+    if static:
+        save_chart_files(df_chart, save_path, pdf_path, cache, cache_key, profile=profile, variant=variant)
+    else:
+        job.emit(f"💡 Задач больше {STATIC_CHART_MAX_TASKS}: PNG и PDF пропущены, открой HTML просмотрщик")
+    with profile.stage('html', rows=len(df_sorted)):
+        export_html(df_sorted, html_path, title=filename)
+    job.check()
+    
+    critical = int(df_with_critical['Is_Critical'].sum())
+    job.emit("\n✅ ДИАГРАММА УСПЕШНО СОЗДАНА!")
+    job.emit(f"🔥 Критических задач: {critical} из {len(df_with_critical)}")
+    job.emit(f"📅 Период: {df_with_critical['Start'].min().strftime('%d.%m.%Y')} - "
+             f"{df_with_critical['End'].max().strftime('%d.%m.%Y')}")
+    
+    # Ссылки на файлы вместо встраивания их содержимого: ноутбук остается легким
+    if static:
+        job.show(Image(filename=save_path))
+        job.show(FileLink(save_path, result_html_prefix="📊 PNG: "))
+        job.show(FileLink(pdf_path, result_html_prefix="📄 PDF: "))
+    job.show(FileLink(html_path, result_html_prefix="🌐 ПРОСМОТРЩИК: "))
+
+# ========== ФУНКЦИЯ ДЛЯ ЗАГРУЗКИ ФАЙЛА В NOTEBOOK ==========
+
+def upload_file_and_create_gantt():
+    """
+    ЗАГРУЗКА ФАЙЛА ПРЯМО В NOTEBOOK - ПОЯВИТСЯ КНОПКА ВЫБОРА ФАЙЛА
+    """
+    # Создаем виджет загрузки файла
+    uploader = widgets.FileUpload(
+        accept='.csv,.xlsx,.parquet',  # принимаем CSV, Excel и Parquet
+        multiple=False,       # только один файл
+        description='📁 ВЫБЕРИ ФАЙЛ',
+        style={'description_width': 'initial'}
+    )
+    
+    # Настройки
+    project_name = widgets.Text(
+        value='Мой проект',
+        placeholder='Введите название проекта',
+        description='Название:',
+        style={'description_width': 'initial'}
+    )
+    
+    # Лист книги Excel: имя или шаблон
+    sheet_name = widgets.Text(
+        value='',
+        placeholder='первый лист',
+        description='Лист Excel:',
+        style={'description_width': 'initial'}
+    )
+    
+    # Кнопка создания
+    create_btn = widgets.Button(
+        description='🚀 ПОСТРОИТЬ ДИАГРАММУ',
+        button_style='success',
+        icon='rocket',
+        layout=widgets.Layout(width='300px', height='40px')
+    )
+    
+    output = widgets.Output()
+    current = {'job': None}
+    
+    def on_create_click(b):
+        # Новый запуск вытесняет незавершенный: тот остановится на границе этапа
+        previous = current['job']
+        superseded = previous is not None and previous.running()
+        if previous is not None:
+            previous.cancel()
+        output.clear_output()
+        
+        if not uploader.value:
+            output.append_stdout("❌ СНАЧАЛА ВЫБЕРИ ФАЙЛ!\n")
+            return
+        
+        filename, content = _uploaded_file(uploader.value)
+        if os.path.splitext(filename)[1].lower() not in ('.csv', '.xlsx', '.parquet'):
+            output.append_stdout("❌ НЕПОДДЕРЖИВАЕМЫЙ ФОРМАТ ФАЙЛА\n")
+            return
+        
+        job = _BackgroundJob(output)
+        current['job'] = job
+        if superseded:
+            job.emit("⏹️ Предыдущий запуск отменен")
+        job.start(_build_chart, filename, content, sheet_name.value.strip() or None)
+    
+    create_btn.on_click(on_create_click)
+    
+    # Показываем интерфейс
+    display(HTML("""
+    <div style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); 
+                padding: 20px; border-radius: 10px; color: white; text-align: center;">
+        <h1>📊 ДИАГРАММЫ ГАНТА</h1>
+        <p>Загрузи файл с данными проекта и получи диаграмму с критическим путем</p>
+    </div>
+    """))
+    
+    display(HTML("<h3>📁 ЗАГРУЗИ ФАЙЛ ПРОЕКТА:</h3>"))
+    display(uploader)
+    display(project_name)
+    display(sheet_name)
+    display(create_btn)
+    display(output)
+
+# ========== БЫСТРЫЙ СТАРТ ==========
+
+def quick_upload():
+    """
+    ПРОСТО ЗАПУСТИ ЭТУ ФУНКЦИЮ И ВЫБЕРИ ФАЙЛ
+    """
+    print("🚀 БЫСТРЫЙ СТАРТ - ЗАГРУЗКА ФАЙЛА")
+    print("=" * 50)
+    print("📋 Поддерживаемые форматы: CSV, Excel, Parquet")
+    print("📋 Пример структуры CSV файла:")
+    print("""
+Task,Duration,Dependencies,Workers
+A,5,,2
+B,3,A,1
+C,4,A,3
+D,2,B,2
+    """)
+    print()
+    
+    upload_file_and_create_gantt()
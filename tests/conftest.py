@@ -0,0 +1,17 @@
+import os
+import sys
+
+import pytest
+
+# Модули лежат в notebooks/ и импортируются как в ноутбуке — по имени
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'notebooks'))
+
+from gantt_core import SmartFieldMapper, verbosity, QUIET  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def quiet():
+    """Без отчетов say() и без запомненных раскладок между тестами"""
+    SmartFieldMapper._layout_memo.clear()
+    with verbosity(QUIET):
+        yield
@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+
+from gantt_baseline import DIFF_COLUMNS, compare_schedules
+
+
+def _schedule(rows):
+    """rows: задача -> (начало, окончание, резерв, критическая)"""
+    return pd.DataFrame([
+        {'Task': task, 'Start': pd.Timestamp(start), 'End': pd.Timestamp(end), 'Total_Float': total_float,
+         'Is_Critical': critical}
+        for task, (start, end, total_float, critical) in rows.items()
+    ])
+
+
+BASELINE = _schedule({
+    'a': ('2024-01-01', '2024-01-03', 0, True),
+    'b': ('2024-01-03', '2024-01-05', 2, False),
+    'c': ('2024-01-03', '2024-01-08', 0, True),
+    'old': ('2024-01-01', '2024-01-02', 5, False),
+})
+CURRENT = _schedule({
+    'a': ('2024-01-01', '2024-01-03', 0, True),
+    'b': ('2024-01-04', '2024-01-08', 0, True),
+    'c': ('2024-01-03', '2024-01-08', 0, True),
+    'new': ('2024-01-08', '2024-01-09', 0, True),
+})
+
+
+def test_statuses_and_variances():
+    diff = compare_schedules(BASELINE, CURRENT).set_index('Task')
+    assert list(compare_schedules(BASELINE, CURRENT).columns) == DIFF_COLUMNS
+    assert diff['Status'].to_dict() == {'b': 'changed', 'new': 'added', 'old': 'removed'}
+
+    b = diff.loc['b']
+    assert (b['Start_Variance'], b['Finish_Variance'], b['Float_Variance']) == (1, 3, -2)
+    assert b['Became_Critical'] and not b['Left_Critical']
+    assert pd.isna(diff.loc['new', 'Baseline_Start']) and pd.isna(diff.loc['old', 'End'])
+    assert not diff.loc[['new', 'old'], 'Became_Critical'].any()
+
+
+def test_rows_ordered_by_finish_slip():
+    diff = compare_schedules(BASELINE, CURRENT)
+    variance = diff['Finish_Variance'].dropna().to_numpy()
+    np.testing.assert_array_equal(variance, np.sort(variance)[::-1])
+    assert diff['Finish_Variance'].isna().to_numpy()[len(variance):].all()
+
+
+def test_unchanged_rows_and_tolerance():
+    diff = compare_schedules(BASELINE, CURRENT, changed_only=False).set_index('Task')
+    assert diff.loc[['a', 'c'], 'Status'].eq('unchanged').all()
+
+    shifted = BASELINE.assign(Start=BASELINE['Start'] + pd.Timedelta(hours=6),
+                              End=BASELINE['End'] + pd.Timedelta(hours=6))
+    assert compare_schedules(BASELINE, shifted, tolerance_days=0.5).empty
+    assert len(compare_schedules(BASELINE, shifted)) == len(BASELINE)
+
+
+def test_csv_roundtrip_has_no_changes(tmp_path):
+    path = tmp_path / 'schedule.csv'
+    BASELINE.to_csv(path, index=False)
+    assert compare_schedules(BASELINE, pd.read_csv(path)).empty
@@ -0,0 +1,37 @@
+import os
+
+import pandas as pd
+import pytest
+
+from gantt_cache import ScheduleCache
+
+pytest.importorskip('pyarrow')
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ScheduleCache(str(tmp_path))
+
+
+def _schedule(index):
+    return pd.DataFrame({
+        'Task': ['a', 'b', 'c'],
+        'Start': pd.to_datetime(['2024-01-03', '2024-01-01', '2024-01-02']),
+    }, index=index)
+
+
+@pytest.mark.parametrize('index', [[0, 1, 2], [0, 0, 1]])
+def test_roundtrip_keeps_sort_order(cache, index):
+    df = _schedule(index)
+    df_sorted = df.iloc[[1, 2, 0]]
+    cache.put('key', df, df_sorted)
+    df_cached, sorted_cached = cache.get('key')
+    pd.testing.assert_frame_equal(df_cached, df)
+    pd.testing.assert_frame_equal(sorted_cached, df_sorted)
+
+
+def test_unwritable_column_skips_caching(cache):
+    df = _schedule([0, 1, 2]).assign(Notes=[1, 'x', None])
+    cache.put('key', df, df)
+    assert cache.get('key') is None
+    assert not [name for name in os.listdir(cache.root) if name.startswith('.tmp-')]
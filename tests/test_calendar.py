@@ -0,0 +1,51 @@
+import pickle
+
+import numpy as np
+import pandas as pd
+
+from gantt_core import WorkCalendar, calculate_critical_path_with_dependencies
+
+# Пн 1 января 2024; среда 3 января — праздник
+WORKWEEK = WorkCalendar('1111100', holidays=['2024-01-03'])
+MONDAY = pd.Timestamp('2024-01-01')
+
+
+def test_origin_rolls_forward_to_working_day():
+    assert WORKWEEK.origin('2024-01-06') == pd.Timestamp('2024-01-08')
+    assert WORKWEEK.origin('2024-01-03') == pd.Timestamp('2024-01-04')
+    assert WORKWEEK.origin(MONDAY) == MONDAY
+
+
+def test_offsets_skip_weekends_and_holidays():
+    dates = pd.to_datetime(['2024-01-01', '2024-01-02', '2024-01-04', '2024-01-05', '2024-01-06', '2024-01-08'])
+    np.testing.assert_array_equal(WORKWEEK.to_offsets(dates.to_numpy(), MONDAY), [0, 1, 2, 3, 4, 4])
+    expected = pd.to_datetime(['2024-01-01', '2024-01-02', '2024-01-04', '2024-01-05', '2024-01-08'])
+    assert list(WORKWEEK.to_dates(np.arange(5), MONDAY)) == list(expected)
+
+
+def test_finish_is_end_of_last_working_day():
+    # 3 рабочих дня с понедельника: пн, вт, чт (среда — праздник) — окончание в конце четверга
+    assert WORKWEEK.to_finish_dates([3], MONDAY)[0] == pd.Timestamp('2024-01-05')
+    # 4 рабочих дня заканчиваются в пятницу, а не переползают на выходные
+    assert WORKWEEK.to_finish_dates([4], MONDAY)[0] == pd.Timestamp('2024-01-06')
+    # Задача нулевой длительности заканчивается в момент начала
+    assert WORKWEEK.to_finish_dates([2], MONDAY, start=[2])[0] == pd.Timestamp('2024-01-04')
+
+
+def test_schedule_in_working_days():
+    df = pd.DataFrame({'Task': ['Фундамент', 'Стены'], 'Duration': [4, 2], 'Start': MONDAY,
+                       'Dependencies': ['', 'Фундамент']})
+    df_with_critical = calculate_critical_path_with_dependencies(df, calendar=WORKWEEK).set_index('Task')
+    assert df_with_critical.loc['Фундамент', 'End'] == pd.Timestamp('2024-01-06')
+    # Следующая задача начинается в понедельник после выходных
+    assert df_with_critical.loc['Стены', 'Start'] == pd.Timestamp('2024-01-08')
+    assert df_with_critical.loc['Стены', 'End'] == pd.Timestamp('2024-01-10')
+
+
+def test_continuous_calendar_and_pickling():
+    every_day = WorkCalendar()
+    assert every_day.continuous
+    assert every_day.to_finish_dates([4], MONDAY)[0] == pd.Timestamp('2024-01-05')
+    restored = pickle.loads(pickle.dumps(WORKWEEK))
+    assert repr(restored) == repr(WORKWEEK)
+    np.testing.assert_array_equal(restored.holidays, WORKWEEK.holidays)
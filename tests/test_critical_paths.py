@@ -0,0 +1,57 @@
+import itertools
+
+import pandas as pd
+import pytest
+
+from gantt_core import find_critical_paths
+
+
+def _diamonds(k, slow_branch=None):
+    """k ромбов подряд: в каждом две равные ветви, поэтому критических путей 2**k"""
+    tasks, durations, deps = ['S'], [1], ['']
+    previous = 'S'
+    for i in range(k):
+        for branch in 'ab':
+            tasks.append(f"{branch}{i}")
+            durations.append(3 if (i, branch) != slow_branch else 1)
+            deps.append(previous)
+        tasks.append(f"J{i}")
+        durations.append(1)
+        deps.append(f"a{i},b{i}")
+        previous = f"J{i}"
+    return pd.DataFrame({'Task': tasks, 'Duration': durations, 'Start': '2024-01-01', 'Dependencies': deps})
+
+
+@pytest.mark.parametrize('k', [0, 1, 5, 10])
+def test_count_equals_number_of_enumerated_paths(k):
+    critical = find_critical_paths(_diamonds(k))
+    paths = list(critical.paths())
+    assert critical.count() == len(paths) == 2 ** k
+    assert len({tuple(path) for path in paths}) == len(paths)
+
+
+def test_paths_follow_dependencies_and_limit():
+    df = _diamonds(4)
+    edges = {(dep, task) for task, deps in zip(df['Task'], df['Dependencies']) for dep in deps.split(',') if dep}
+    critical = find_critical_paths(df)
+    for path in critical.paths():
+        assert path[0] == 'S' and path[-1] == 'J3'
+        assert all(pair in edges for pair in itertools.pairwise(path))
+    assert len(list(critical.paths(limit=3))) == 3
+
+
+def test_shorter_branch_is_not_critical():
+    critical = find_critical_paths(_diamonds(3, slow_branch=(1, 'b')))
+    paths = list(critical.paths())
+    assert critical.count() == len(paths) == 4
+    assert all('b1' not in path for path in paths)
+
+
+def test_near_critical_paths_in_order_of_float():
+    critical = find_critical_paths(_diamonds(3, slow_branch=(1, 'b')))
+    ranked = list(critical.near_critical(k=8))
+    floats = [slack for slack, _ in ranked]
+    assert floats == sorted(floats)
+    assert floats[:4] == [0, 0, 0, 0]
+    assert floats[4] == 2 and 'b1' in ranked[4][1]
+    assert len(list(critical.near_critical(k=8, max_float=0))) == 4
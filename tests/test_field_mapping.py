@@ -0,0 +1,47 @@
+import pandas as pd
+import pytest
+
+from gantt_core import SmartFieldMapper, validate_and_map_data
+
+
+def _frame(columns):
+    data = {'Task': ['Фундамент', 'Стены', 'Крыша']}
+    for column in columns:
+        data[column] = [2, 3, 4]
+    data['Start'] = ['2024-01-01'] * 3
+    return pd.DataFrame(data)
+
+
+@pytest.mark.parametrize('header', ['Dur', 'Duration', 'duration', 'Длительность'])
+def test_duration_headers_map_to_duration(header):
+    mapping = SmartFieldMapper.detect_fields_with_logic(_frame([header]), use_memo=False)
+    assert mapping['Duration'] == header
+    assert 'Optimistic' not in mapping and 'Pessimistic' not in mapping
+
+
+def test_short_headers_are_not_pert_estimates():
+    mapping = SmartFieldMapper.detect_fields_with_logic(_frame(['min', 'max', 'Duration']), use_memo=False)
+    assert mapping['Duration'] == 'Duration'
+    assert not {'Optimistic', 'MostLikely', 'Pessimistic'} & set(mapping)
+
+
+def test_pert_headers_keep_their_fields():
+    df = _frame(['Optimistic duration', 'Most likely', 'Max_Dur', 'Duration'])
+    mapping = SmartFieldMapper.detect_fields_with_logic(df, use_memo=False)
+    assert mapping['Optimistic'] == 'Optimistic duration'
+    assert mapping['MostLikely'] == 'Most likely'
+    assert mapping['Pessimistic'] == 'Max_Dur'
+    assert mapping['Duration'] == 'Duration'
+
+
+def test_dur_file_validates():
+    is_valid, report = validate_and_map_data(_frame(['Dur']))[:2]
+    assert is_valid, report.errors
+
+
+def test_validation_returns_four_values_unless_project_requested():
+    df = _frame(['Duration'])
+    assert len(validate_and_map_data(df)) == 4
+    *_, project = validate_and_map_data(df, return_project=True)
+    assert project.graph.n == 3
+    assert len(validate_and_map_data(pd.DataFrame({'x': [1.0]}))) == 4
@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import gantt_core
+from gantt_core import ParsedProject, find_cyclic_components
+
+
+def _graph(dependencies):
+    df = pd.DataFrame({'Task': list(dependencies), 'Duration': 1,
+                       'Dependencies': [','.join(deps) for deps in dependencies.values()]})
+    return ParsedProject.from_dataframe(df).graph
+
+
+def test_cycle_check_order_is_reused_by_layering(monkeypatch):
+    graph = _graph({'a': [], 'b': ['a'], 'c': ['a'], 'd': ['b', 'c']})
+    assert find_cyclic_components(graph) == []
+
+    def no_sort(*args):
+        raise AssertionError("повторная топологическая сортировка")
+
+    monkeypatch.setattr(gantt_core, '_wavefront_sort', no_sort)
+    layering = graph.layering()
+    rank = layering.rank
+    assert (rank[graph.src] < rank[graph.dst]).all()
+    assert layering.n_levels == 3
+    assert find_cyclic_components(graph) == []
+
+
+def test_cycle_is_reported_and_has_no_layering():
+    graph = _graph({'a': ['c'], 'b': ['a'], 'c': ['b'], 'd': ['c'], 'e': []})
+    cycles = find_cyclic_components(graph)
+    assert len(cycles) == 1
+    component, cycle = cycles[0]
+    assert sorted(graph.tasks[component]) == ['a', 'b', 'c']
+    assert sorted(graph.tasks[cycle]) == ['a', 'b', 'c']
+    with pytest.raises(ValueError):
+        graph.layering()
+
+
+def test_long_chain_order():
+    n = 5000
+    graph = _graph({f"T{i}": [f"T{i - 1}"] if i else [] for i in range(n)})
+    assert find_cyclic_components(graph) == []
+    np.testing.assert_array_equal(graph.tasks[graph.topological_order()], [f"T{i}" for i in range(n)])
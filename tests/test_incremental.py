@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from gantt_core import IncrementalSchedule, TaskGraph, compute_cpm
+
+
+def _project(n=60, seed=0):
+    rng = np.random.default_rng(seed)
+    deps = [','.join(f"T{j}" for j in sorted(set(rng.integers(0, i, size=rng.integers(0, 3)).tolist())))
+            if i else '' for i in range(n)]
+    return pd.DataFrame({'Task': [f"T{i}" for i in range(n)], 'Duration': rng.integers(1, 9, n),
+                         'Start': '2024-01-01', 'Dependencies': deps})
+
+
+def _assert_matches_full_recompute(schedule):
+    """Состояние после правок совпадает с CPM с нуля по текущим связям и длительностям"""
+    src = np.repeat(np.arange(len(schedule.succs)), [len(succs) for succs in schedule.succs])
+    dst = np.array([succ for succs in schedule.succs for succ in succs], dtype=np.int64)
+    graph = TaskGraph(schedule.graph.tasks, src, dst)
+    full = compute_cpm(graph, np.asarray(schedule.duration), np.asarray(schedule.release))
+    state = schedule._derived()
+    for key in ('early_start', 'early_finish', 'late_start', 'late_finish', 'total_float', 'is_critical'):
+        np.testing.assert_allclose(state[key], full[key], err_msg=key)
+    # Поддерживаемый порядок остается топологическим
+    rank = np.asarray(schedule.rank)
+    assert (rank[src] < rank[dst]).all()
+    assert sorted(schedule.rank) == list(range(len(rank)))
+
+
+def test_random_edits_match_full_recompute():
+    df = _project()
+    schedule = IncrementalSchedule(df)
+    tasks = list(schedule.graph.tasks)
+    rng = np.random.default_rng(1)
+    for _ in range(300):
+        kind = rng.integers(0, 3)
+        task, other = (tasks[i] for i in rng.choice(len(tasks), 2, replace=False))
+        if kind == 0:
+            schedule.set_duration(task, int(rng.integers(1, 15)))
+        elif kind == 1:
+            try:
+                schedule.add_dependency(task, other)
+            except ValueError:
+                continue
+        else:
+            code = schedule.graph.tasks.get_loc(task)
+            if not schedule.preds[code]:
+                continue
+            schedule.remove_dependency(task, tasks[rng.choice(schedule.preds[code])])
+        _assert_matches_full_recompute(schedule)
+
+
+def test_backward_edge_reorders_without_cycle():
+    # T3 → T0 против исходного порядка: нужен перенос рангов (Пирс–Келли)
+    df = pd.DataFrame({'Task': ['T0', 'T1', 'T2', 'T3'], 'Duration': [1, 2, 3, 4], 'Start': '2024-01-01',
+                       'Dependencies': ['', 'T0', 'T1', '']})
+    schedule = IncrementalSchedule(df)
+    changes = schedule.add_dependency('T0', 'T3')
+    assert set(changes['early_changed']) == {'T0', 'T1', 'T2'}
+    assert changes['project_end'] == pd.Timestamp('2024-01-11')
+    _assert_matches_full_recompute(schedule)
+
+
+def test_cycle_is_rejected_and_state_kept():
+    df = pd.DataFrame({'Task': ['a', 'b', 'c'], 'Duration': 1, 'Start': '2024-01-01',
+                       'Dependencies': ['', 'a', 'b']})
+    schedule = IncrementalSchedule(df)
+    with pytest.raises(ValueError):
+        schedule.add_dependency('a', 'c')
+    assert schedule.preds[0] == []
+    _assert_matches_full_recompute(schedule)
@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from gantt_core import PRIORITY_RULES, ParsedProject, level_resources
+
+ORIGIN = pd.Timestamp('2024-01-01')
+
+
+def _project(n=200, seed=0):
+    rng = np.random.default_rng(seed)
+    deps = [','.join(f"T{j}" for j in sorted(set(rng.integers(0, i, size=rng.integers(0, 3)).tolist())))
+            if i else '' for i in range(n)]
+    return pd.DataFrame({'Task': [f"T{i}" for i in range(n)], 'Duration': rng.integers(1, 6, n),
+                         'Start': ORIGIN, 'Dependencies': deps, 'Workers': rng.integers(1, 5, n),
+                         'Priority': rng.integers(0, 10, n)})
+
+
+def _days(dates):
+    return ((pd.to_datetime(dates) - ORIGIN) / pd.Timedelta(days=1)).to_numpy()
+
+
+def _capacity_at(capacity, days):
+    if not isinstance(capacity, pd.Series):
+        return np.full(len(days), float(capacity))
+    offsets = _days(capacity.index)
+    return capacity.to_numpy(dtype=float)[np.searchsorted(offsets, days, side='right') - 1]
+
+
+def _assert_feasible(df, leveled, capacity):
+    start, end = _days(leveled['Start']), _days(leveled['End'])
+    np.testing.assert_allclose(end - start, df['Duration'])
+
+    # Связи: задача начинается не раньше окончания своих зависимостей
+    graph = ParsedProject.from_dataframe(df).graph
+    rows = graph.first_rows
+    assert (start[rows][graph.dst] >= end[rows][graph.src] - 1e-9).all()
+
+    # Мощность: в каждый момент начала задачи или смены мощности нагрузка не выше лимита
+    changes = _days(capacity.index) if isinstance(capacity, pd.Series) else []
+    moments = np.unique(np.concatenate([start, changes]))
+    running = (start[None, :] <= moments[:, None]) & (moments[:, None] < end[None, :])
+    load = running.astype(float) @ df['Workers'].to_numpy(dtype=float)
+    assert (load <= _capacity_at(capacity, moments) + 1e-9).all()
+
+
+@pytest.mark.parametrize('priority', sorted(PRIORITY_RULES))
+def test_constant_capacity_is_respected(priority):
+    df = _project()
+    leveled = level_resources(df, 6, priority=priority)
+    _assert_feasible(df, leveled, 6)
+    assert (leveled['Resource_Delay'] >= 0).all()
+    assert leveled['Resource_Delay'].gt(0).any()
+
+
+def test_time_varying_capacity_is_respected():
+    df = _project(seed=1)
+    capacity = pd.Series([6, 4, 9], index=pd.to_datetime(['2024-01-01', '2024-01-20', '2024-02-15']))
+    _assert_feasible(df, level_resources(df, capacity), capacity)
+
+
+def test_ample_capacity_keeps_cpm_dates():
+    df = _project(seed=2)
+    leveled = level_resources(df, df['Workers'].sum())
+    assert (leveled['Resource_Delay'] == 0).all()
+
+
+def test_priority_rule_decides_who_waits():
+    # Две независимые задачи, мощности хватает на одну: раньше идет задача с большим Priority
+    df = pd.DataFrame({'Task': ['a', 'b'], 'Duration': [3, 3], 'Start': ORIGIN, 'Dependencies': '',
+                       'Workers': [2, 2], 'Priority': [1, 5]})
+    leveled = level_resources(df, 2, priority='priority').set_index('Task')
+    assert leveled.loc['b', 'Start'] == ORIGIN
+    assert leveled.loc['a', 'Start'] == ORIGIN + pd.Timedelta(days=3)
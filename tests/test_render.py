@@ -0,0 +1,34 @@
+import re
+
+import matplotlib
+import pandas as pd
+import pytest
+
+matplotlib.use('Agg')
+
+from gantt_core import build_schedule  # noqa: E402
+from gantt_render import export_paginated_pdf  # noqa: E402
+
+
+@pytest.fixture
+def schedule():
+    n = 120
+    df = pd.DataFrame({'Task': [f"Задача {i}" for i in range(n)], 'Duration': 2, 'Start': '2024-01-01',
+                       # Цепочка из первых 10 задач критическая, остальные — короткие ответвления
+                       'Dependencies': [''] + [f"Задача {i - 1}" if i < 10 else 'Задача 0' for i in range(1, n)]})
+    return build_schedule(df)[1]
+
+
+def _pages(path):
+    with open(path, 'rb') as f:
+        return len(re.findall(rb'/Type\s*/Page\b', f.read()))
+
+
+def test_large_project_pages_cover_only_critical_tasks(schedule, tmp_path):
+    full = export_paginated_pdf(schedule, str(tmp_path / 'full.pdf'), rows_per_page=40, table_rows_per_page=90,
+                                max_tasks=None)
+    capped = export_paginated_pdf(schedule, str(tmp_path / 'capped.pdf'), rows_per_page=40, table_rows_per_page=90,
+                                  max_tasks=50)
+    # Сводка + 3 страницы диаграммы + 2 страницы таблицы против сводки + 1 + 1 по критическим
+    assert _pages(full) == 6
+    assert _pages(capped) == 3